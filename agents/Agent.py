@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import List, TypedDict, Protocol, Any, Literal
-from errors import InstructionError
+from typing import List, TypedDict, Protocol, Any, Literal, Tuple
+from errors import AgentException, InstructionError
 from pydantic import BaseModel, ValidationError
 from logger import get_logger
+from cache import SQLiteCache
 from logging import Handler
+from dotenv import load_dotenv
+import asyncio
 import json
+import os
+import threading
 
 
 class PromptBuilder(Protocol):
@@ -54,6 +59,25 @@ class Message(TypedDict):
 
 
 class Agent(ABC):
+    """Prompts an llm with the instructions of a method.
+
+    `run` blocks until the response is generated, `arun` is its coroutine
+    variant. One instance can be called concurrently from several threads or
+    tasks, e.g. for independent prune calls: at most `AGENT_MAX_CONCURRENCY`
+    calls of each variant are sent at once, further calls wait for a free slot.
+
+    With `use_context`, providers that keep a context (`AgentGoogle`) send it
+    along: a call sees the context as it was when the call started, and its
+    messages are appended once it is answered.
+
+    Responses can be cached in a local SQLite file (`AGENT_CACHE_PATH`), keyed
+    by model, sampling options, prompts, response format and context (see
+    `cache_lookup`). The
+    `AGENT_CACHE_MODE` is `off`, `read-through` (misses are generated and
+    stored) or `replay-only` (misses raise an error, no llm is called), e.g.
+    to re-run an evaluation after a change of the parsers or metrics.
+    """
+
     def __init__(
         self,
         model: str,
@@ -62,11 +86,32 @@ class Agent(ABC):
         log_path: str | Handler = None,
         use_context: bool = False,
     ):
+        load_dotenv()
         self.model = model
         self.instructions = instructions
         self.logger = get_logger(__name__, log_path)
+        self.log_lock = threading.Lock()
         self.use_context = use_context
         self.response_schema = response_schema
+        # sampling options of the provider, part of the cache key
+        self.options = {}
+        self.context = []
+        self.context_lock = threading.Lock()
+        self.max_concurrency = int(os.getenv("AGENT_MAX_CONCURRENCY", 4))
+        self.limit = threading.BoundedSemaphore(self.max_concurrency)
+        self.async_limit = None
+        self.async_loop = None
+        self.cache_mode = os.getenv("AGENT_CACHE_MODE", "off")
+        if self.cache_mode not in ["off", "read-through", "replay-only"]:
+            raise ValueError(f"Unknown cache mode: {self.cache_mode}")
+        self.cache = (
+            SQLiteCache(
+                os.getenv("AGENT_CACHE_PATH", "./agent_cache.sqlite"),
+                max_bytes=int(float(os.getenv("AGENT_CACHE_MAX_MB", 0)) * 2**20),
+            )
+            if self.cache_mode != "off"
+            else None
+        )
 
     @abstractmethod
     def run(self, instruction: InstructionKey, prompt: str, **kwargs) -> str:
@@ -76,15 +121,114 @@ class Agent(ABC):
         pass
 
     @abstractmethod
+    async def arun(self, instruction: InstructionKey, prompt: str, **kwargs) -> str:
+        """Coroutine variant of `run`, which awaits the response without blocking
+        a thread, so that many calls can be in flight at once:
+        ```
+        answers = await asyncio.gather(
+            *(agent.arun("pick_relationships", prompt, **kwargs) for kwargs in paths)
+        )
+        ```
+        """
+        pass
+
     def flush_context(self):
         """
         Resets the context of the agent.
         """
-        pass
+        with self.context_lock:
+            self.context = []
+
+    def get_context(self) -> list:
+        """Returns a copy of the context, which stays unchanged by concurrent calls."""
+        with self.context_lock:
+            return list(self.context)
+
+    def add_context(self, items: list):
+        with self.context_lock:
+            self.context.extend(items)
+
+    def get_async_limit(self) -> asyncio.Semaphore:
+        """Returns the semaphore limiting the concurrent `arun` calls. Like all
+        asyncio primitives it is bound to the event loop, so a new one is created
+        if the agent is used from another loop (e.g. several `asyncio.run`).
+        """
+        loop = asyncio.get_running_loop()
+        if self.async_limit is None or self.async_loop is not loop:
+            self.async_limit = asyncio.Semaphore(self.max_concurrency)
+            self.async_loop = loop
+        return self.async_limit
+
+    def cache_lookup(
+        self,
+        instruction: InstructionKey,
+        messages: List[Message],
+        context: list = None,
+    ) -> Tuple[str | None, str | None]:
+        """Returns the cache key of a call and the cached response, if any. The
+        key covers everything the response depends on: the model, the sampling
+        `options`, the exact system and user prompt, the response format and the
+        context sent along.
+        """
+        if not self.cache:
+            return None, None
+        fmt = self.get_format(instruction)
+        if isinstance(fmt, type) and issubclass(fmt, BaseModel):
+            fmt = fmt.model_json_schema()
+        key = SQLiteCache.hash_key(
+            type(self).__name__,
+            self.model,
+            messages[0]["content"],
+            messages[1]["content"],
+            json.dumps(fmt, sort_keys=True),
+            json.dumps(context or [], sort_keys=True, default=self.dump_context),
+            json.dumps(self.options, sort_keys=True),
+            normalize=False,
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return key, cached
+        if self.cache_mode == "replay-only":
+            raise AgentException(
+                f"Cache miss in replay-only mode for {instruction}: {messages[1]['content']}"
+            )
+        return key, None
+
+    def cache_store(self, key: str | None, content: str):
+        if self.cache:
+            self.cache.set(key, content)
+
+    @staticmethod
+    def dump_context(item: Any):
+        """Serializes provider specific context items for the cache key."""
+        if isinstance(item, BaseModel):
+            return item.model_dump(mode="json", exclude_none=True)
+        return str(item)
+
+    def build_messages(
+        self, instruction: InstructionKey, prompt: str, **kwargs
+    ) -> List[Message]:
+        """Returns the system and user message of `instruction`."""
+        return [
+            Message(
+                role="system",
+                content=self.instructions["system"][instruction](**kwargs),
+                instruction=instruction,
+            ),
+            Message(
+                role="user",
+                content=self.instructions["user"][instruction](prompt=prompt, **kwargs),
+                instruction=instruction,
+            ),
+        ]
 
     def log(self, messages: List[Message]):
-        for message in messages:
-            self.logger.info(json.dumps(message, ensure_ascii=False))
+        """Logs the messages as consecutive lines, also when calls run
+        concurrently, so that every answer follows its prompt in the history.
+        """
+        with self.log_lock:
+            for message in messages:
+                self.logger.info(json.dumps(message, ensure_ascii=False))
 
     def get_format(self, instruction: InstructionKey) -> ResponseFormat:
         """Retrieves the corresponding format definition from the `self.schema` dict"""
@@ -21,55 +21,93 @@ class AgentGoogle(Agent):
             super().__init__(
                 model, instructions, response_schema, log_path, use_context
             )
+            self.options = {"temperature": 0}
             api_key = os.getenv("GOOGLE_API_KEY")
             self.client = genai.Client(api_key=api_key)
-            self.context = []
         except Exception as e:
             raise AgentException(e)
 
-    def run(self, instruction, prompt, **kwargs):
-        try:
-            response_format = self.get_format(instruction)
-            system_message = Message(
-                role="system",
-                content=self.instructions["system"][instruction](**kwargs),
-                instruction=instruction,
-            )
-            user_message = Message(
-                role="user",
-                content=self.instructions["user"][instruction](prompt=prompt, **kwargs),
-                instruction=instruction,
-            )
-
-            config = genai.types.GenerateContentConfig(
-                temperature=0,
-                response_mime_type="application/json" if response_format else None,
-                response_schema=response_format,
-                system_instruction=system_message["content"],
-            )
-            chat = self.client.chats.create(
-                model=self.model,
-                config=config,
-                history=self.context if self.use_context else [],
-            )
-
-            self.log([system_message, user_message])
+    def chat_kwargs(self, instruction, messages, context) -> dict:
+        response_format = self.get_format(instruction)
+        config = genai.types.GenerateContentConfig(
+            temperature=self.options["temperature"],
+            response_mime_type="application/json" if response_format else None,
+            response_schema=response_format,
+            system_instruction=messages[0]["content"],
+        )
+        return {
+            "model": self.model,
+            "config": config,
+            "history": context,
+        }
 
-            response_obj = chat.send_message(user_message["content"])
+    def complete(self, instruction, messages, content, turns=None) -> str:
+        response = Message(
+            role="assistant",
+            content=content,
+            instruction=instruction,
+        )
+        self.log(messages + [response])
 
-            response = Message(
-                role="assistant",
-                content=response_obj.text,
-                instruction=instruction,
+        if self.use_context:
+            # cached responses have no chat, their turns are rebuilt
+            self.add_context(
+                turns
+                or [
+                    genai.types.Content(
+                        role="user",
+                        parts=[genai.types.Part(text=messages[1]["content"])],
+                    ),
+                    genai.types.Content(
+                        role="model", parts=[genai.types.Part(text=content)]
+                    ),
+                ]
             )
-            self.log([response])
 
-            if self.use_context:
-                self.context = chat.get_history()
+        return response["content"]
 
-            return response["content"]
+    def run(self, instruction, prompt, **kwargs):
+        try:
+            messages = self.build_messages(instruction, prompt, **kwargs)
+            context = self.get_context() if self.use_context else []
+            key, content = self.cache_lookup(instruction, messages, context)
+            if content is not None:
+                return self.complete(instruction, messages, content)
+            chat = self.client.chats.create(
+                **self.chat_kwargs(instruction, messages, context)
+            )
+            try:
+                with self.limit:
+                    response_obj = chat.send_message(messages[1]["content"])
+            except Exception:
+                self.log(messages)
+                raise
+            self.cache_store(key, response_obj.text)
+            # only the new turns, others may have been added meanwhile
+            turns = chat.get_history()[len(context) :]
+            return self.complete(instruction, messages, response_obj.text, turns)
         except Exception as e:
             raise AgentException(e)
 
-    def flush_context(self):
-        self.context = []
+    async def arun(self, instruction, prompt, **kwargs):
+        try:
+            messages = self.build_messages(instruction, prompt, **kwargs)
+            context = self.get_context() if self.use_context else []
+            key, content = self.cache_lookup(instruction, messages, context)
+            if content is not None:
+                return self.complete(instruction, messages, content)
+            chat = self.client.aio.chats.create(
+                **self.chat_kwargs(instruction, messages, context)
+            )
+            try:
+                async with self.get_async_limit():
+                    response_obj = await chat.send_message(messages[1]["content"])
+            except Exception:
+                self.log(messages)
+                raise
+            self.cache_store(key, response_obj.text)
+            # only the new turns, others may have been added meanwhile
+            turns = chat.get_history()[len(context) :]
+            return self.complete(instruction, messages, response_obj.text, turns)
+        except Exception as e:
+            raise AgentException(e)
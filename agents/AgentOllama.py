@@ -1,15 +1,20 @@
 from agents.Agent import Agent, Message
-from ollama import Client
+from ollama import AsyncClient, Client
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from errors import AgentException
+from loops import LoopResource
 
 load_dotenv()
 os.environ["NO_PROXY"] = "localhost,127.0.0.1"
 
 
 class AgentOllama(Agent):
+    """Ollama chat agent. Every call is sent without the earlier messages, also
+    with `use_context`, as in the original experiments.
+    """
+
     def __init__(
         self,
         model,
@@ -23,45 +28,90 @@ class AgentOllama(Agent):
                 model, instructions, response_schema, log_path, use_context
             )
             host = os.getenv("OLLAMA_HOST", "localhost:11434")
-            self.client = Client(host=f"http://{host}")
-            self.context = []
+            self.host = f"http://{host}"
+            self.client = Client(host=self.host)
+            # ollama 0.6 has no public close, its httpx client is closed
+            self.async_clients = LoopResource(
+                lambda: AsyncClient(host=self.host),
+                lambda client: client._client.aclose(),
+            )
+            # fixed sampling makes responses reproducible, e.g. for the cache
+            self.options = {
+                option: cast(os.getenv(name))
+                for option, name, cast in [
+                    ("temperature", "OLLAMA_TEMPERATURE", float),
+                    ("seed", "OLLAMA_SEED", int),
+                ]
+                if os.getenv(name)
+            }
+        except Exception as e:
+            raise AgentException(e)
+
+    def get_async_client(self) -> AsyncClient:
+        """Returns the async client, which is created on first use. Its
+        connections are bound to the event loop, so every loop the agent is
+        used from (e.g. several `asyncio.run`) gets its own client, which is
+        closed when the loop shuts down (see `LoopResource`).
+        """
+        return self.async_clients.get()
+
+    async def aclose(self):
+        """Closes the async client of the running loop, if it has one."""
+        try:
+            await self.async_clients.aclose()
         except Exception as e:
             raise AgentException(e)
 
+    def chat_kwargs(self, instruction, messages) -> dict:
+        fmt = self.get_format(instruction)
+        if isinstance(fmt, type) and issubclass(fmt, BaseModel):
+            fmt = fmt.model_json_schema()
+        return {
+            "model": self.model,
+            "messages": messages,
+            "format": fmt,
+            "options": self.options or None,
+        }
+
+    def complete(self, instruction, messages, content) -> str:
+        assistant_message = Message(
+            role="assistant", content=content, instruction=instruction
+        )
+        self.log(messages + [assistant_message])
+        return assistant_message["content"]
+
     def run(self, instruction, prompt, **kwargs) -> str:
         try:
-            fmt = self.get_format(instruction)
-            if isinstance(fmt, type) and issubclass(fmt, BaseModel):
-                fmt = fmt.model_json_schema()
-            system_message = Message(
-                role="system",
-                content=self.instructions["system"][instruction](**kwargs),
-                instruction=instruction,
-            )
-            user_message = Message(
-                role="user",
-                content=self.instructions["user"][instruction](prompt=prompt, **kwargs),
-                instruction=instruction,
-            )
-            messages = [system_message, user_message]
-            self.log(messages)
-            if self.use_context:
-                messages = self.context + messages
-            assistant_message = Message(
-                role="assistant",
-                content=self.client.chat(
-                    model=self.model,
-                    messages=messages,
-                    format=fmt,
-                ).message.content,
-                instruction=instruction,
-            )
-            if self.use_context:
-                messages.append(assistant_message)
-            self.log([assistant_message])
-            return assistant_message["content"]
+            messages = self.build_messages(instruction, prompt, **kwargs)
+            key, content = self.cache_lookup(instruction, messages)
+            if content is None:
+                chat_kwargs = self.chat_kwargs(instruction, messages)
+                try:
+                    with self.limit:
+                        response = self.client.chat(**chat_kwargs)
+                except Exception:
+                    self.log(messages)
+                    raise
+                content = response.message.content
+                self.cache_store(key, content)
+            return self.complete(instruction, messages, content)
         except Exception as e:
             raise AgentException(e)
 
-    def flush_context(self):
-        self.context = []
+    async def arun(self, instruction, prompt, **kwargs) -> str:
+        try:
+            messages = self.build_messages(instruction, prompt, **kwargs)
+            key, content = self.cache_lookup(instruction, messages)
+            if content is None:
+                chat_kwargs = self.chat_kwargs(instruction, messages)
+                try:
+                    async with self.get_async_limit():
+                        response = await self.get_async_client().chat(**chat_kwargs)
+                except Exception:
+                    self.log(messages)
+                    raise
+                content = response.message.content
+                self.cache_store(key, content)
+            return self.complete(instruction, messages, content)
+        except Exception as e:
+            raise AgentException(e)
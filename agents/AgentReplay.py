@@ -0,0 +1,202 @@
+from agents.Agent import Agent, Message
+from errors import AgentException
+from cache import SQLiteCache
+from typing import Dict, IO, Iterator, List, Tuple
+from dotenv import load_dotenv
+import io
+import json
+import os
+import re
+import threading
+import zipfile
+
+load_dotenv()
+
+# method, question, repetition and response of a recorded call
+Recording = Tuple[str, str, str, str]
+
+
+class AgentReplay(Agent):
+    """Answers from the history logs of earlier experiments instead of an llm,
+    e.g. to benchmark and profile the methods offline on the prompts of real
+    runs.
+
+    The experiments are searched in `AGENT_REPLAY_PATH` (defaults to
+    `./results`), both extracted `raw_data` directories and zip archives of
+    them. Only experiments of `model` (the `agent` in their `meta.json`) are
+    used, `*` uses all of them.
+
+    Recorded calls are indexed by the hash of their instruction and exact
+    system and user prompt. A call is answered with the recording of the same method,
+    question and repetition if there is one, otherwise with the recording
+    closest to it. These are taken from the log path of the agent
+    (`.../<method>/logs/<question>/history_<rep>.log`). Repeated prompts are
+    answered with the recordings in their original order. Prompts without a
+    recording raise an `AgentException`. The context is not part of the key,
+    so contextual calls replay the recorded answer whatever the context.
+    """
+
+    LOG_PATH = re.compile(r"([^/\\]+)[/\\]logs[/\\](\d+)[/\\]history_(\d+)\.log$")
+    LOG_LINE = re.compile(r"^.*? \[[A-Z]+\] \[[^\]]*\] (\{.*\})\s*$")
+
+    # indexes are built once per process and shared by all instances
+    indexes: Dict[Tuple[str, str], Dict[str, List[Recording]]] = {}
+    index_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model,
+        instructions,
+        response_schema=None,
+        log_path=None,
+        use_context=False,
+    ):
+        try:
+            super().__init__(
+                model, instructions, response_schema, log_path, use_context
+            )
+            self.path = os.getenv("AGENT_REPLAY_PATH", "./results")
+            self.index = self.get_index(self.path, model)
+            match = (
+                self.LOG_PATH.search(log_path) if isinstance(log_path, str) else None
+            )
+            self.origin = match.groups() if match else (None, None, None)
+            self.replayed: Dict[str, int] = {}
+        except Exception as e:
+            raise AgentException(e)
+
+    # ---------------------------------------------------------------------------- #
+    #                                   INDEXING                                   #
+    # ---------------------------------------------------------------------------- #
+
+    @classmethod
+    def get_index(cls, path: str, model: str) -> Dict[str, List[Recording]]:
+        with cls.index_lock:
+            key = (os.path.abspath(path), model)
+            if key not in cls.indexes:
+                cls.indexes[key] = cls.build_index(path, model)
+            return cls.indexes[key]
+
+    @staticmethod
+    def hash_call(instruction: str, system: str, user: str) -> str:
+        return SQLiteCache.hash_key(instruction, system, user, normalize=False)
+
+    @classmethod
+    def build_index(cls, path: str, model: str) -> Dict[str, List[Recording]]:
+        index: Dict[str, List[Recording]] = {}
+        for name, file in cls.iter_logs(path, model):
+            method, question, rep = cls.LOG_PATH.search(name).groups()
+            with file:
+                lines = io.TextIOWrapper(file, encoding="utf-8", errors="replace")
+                for system, user, assistant in cls.parse_history(lines):
+                    key = cls.hash_call(
+                        user.get("instruction"), system["content"], user["content"]
+                    )
+                    index.setdefault(key, []).append(
+                        (method, question, rep, assistant["content"])
+                    )
+        return index
+
+    @classmethod
+    def iter_logs(cls, path: str, model: str) -> Iterator[Tuple[str, IO[bytes]]]:
+        """Yields the name and an open binary file of every history log of the
+        experiments of `model` below `path`, extracted or zipped.
+        """
+        models: Dict[str, str | None] = {}
+
+        def get_model(directory: str) -> str | None:
+            """Returns the agent in the `meta.json` closest above `directory`."""
+            if directory not in models:
+                meta_path = os.path.join(directory, "meta.json")
+                parent = os.path.dirname(directory)
+                if os.path.isfile(meta_path):
+                    with open(meta_path) as f:
+                        models[directory] = json.load(f).get("agent")
+                elif parent != directory and directory != os.path.abspath(path):
+                    models[directory] = get_model(parent)
+                else:
+                    models[directory] = None
+            return models[directory]
+
+        for directory, _, files in os.walk(os.path.abspath(path)):
+            for file_name in sorted(files):
+                file_path = os.path.join(directory, file_name)
+                if model != "*" and get_model(directory) != model:
+                    continue
+                if cls.LOG_PATH.search(file_path):
+                    yield file_path, open(file_path, "rb")
+                elif file_name.endswith(".zip") and zipfile.is_zipfile(file_path):
+                    with zipfile.ZipFile(file_path) as archive:
+                        for name in sorted(archive.namelist()):
+                            if cls.LOG_PATH.search(name):
+                                yield f"{file_path}/{name}", archive.open(name)
+
+    @classmethod
+    def parse_history(cls, lines: Iterator[str]) -> Iterator[Tuple[Message, ...]]:
+        """Yields the `(system, user, assistant)` messages of the answered calls
+        of a history log. Calls that failed have no answer and are skipped.
+        """
+        system = user = None
+        for line in lines:
+            match = cls.LOG_LINE.match(line)
+            if not match:
+                continue
+            try:
+                message = json.loads(match.group(1))
+            except ValueError:
+                continue
+            role = message.get("role")
+            if role == "system":
+                system, user = message, None
+            elif role == "user":
+                user = message
+            elif role == "assistant" and system and user:
+                yield system, user, message
+                system = user = None
+
+    # ---------------------------------------------------------------------------- #
+    #                                    REPLAY                                    #
+    # ---------------------------------------------------------------------------- #
+
+    def replay(self, instruction, messages: List[Message]) -> str:
+        key = self.hash_call(
+            instruction, messages[0]["content"], messages[1]["content"]
+        )
+        recordings = self.index.get(key)
+        if not recordings:
+            self.log(messages)
+            raise AgentException(
+                f"No recorded response for {instruction}: {messages[1]['content']}"
+            )
+        method, question, rep = self.origin
+        # prefer the same method, then question, then repetition
+        rank = lambda recording: (
+            recording[0] == method,
+            recording[1] == question,
+            recording[2] == rep,
+        )
+        best = max(map(rank, recordings))
+        candidates = [recording for recording in recordings if rank(recording) == best]
+        with self.context_lock:
+            occurrence = self.replayed.get(key, 0)
+            self.replayed[key] = occurrence + 1
+        content = candidates[min(occurrence, len(candidates) - 1)][3]
+
+        assistant_message = Message(
+            role="assistant", content=content, instruction=instruction
+        )
+        if self.use_context:
+            self.add_context(messages + [assistant_message])
+        self.log(messages + [assistant_message])
+        return content
+
+    def run(self, instruction, prompt, **kwargs) -> str:
+        try:
+            return self.replay(
+                instruction, self.build_messages(instruction, prompt, **kwargs)
+            )
+        except Exception as e:
+            raise AgentException(e)
+
+    async def arun(self, instruction, prompt, **kwargs) -> str:
+        return self.run(instruction, prompt, **kwargs)
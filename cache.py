@@ -0,0 +1,230 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class LRUCache:
+    """A thread-safe in-memory cache with least recently used eviction.
+
+    - At most `maxsize` entries are kept (`0` means unbounded).
+    - Entries older than `ttl` seconds are treated as misses (`0` disables expiry).
+    - Hits, misses and evictions are counted, see `get_stats`.
+    """
+
+    MISSING = object()
+
+    def __init__(self, maxsize: int = 0, ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value or `LRUCache.MISSING` on a miss."""
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is not None and self.ttl and time.time() - entry[0] > self.ttl:
+                del self.entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return self.MISSING
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        with self.lock:
+            self.entries[key] = (time.time(), value)
+            self.entries.move_to_end(key)
+            while self.maxsize and len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteCache:
+    """A persistent key value store in a local SQLite file.
+
+    - Entries older than `ttl` seconds are treated as misses (`0` disables expiry).
+    - Once the stored values exceed `max_bytes` the oldest entries are evicted
+      (`0` disables eviction). Eviction is by insertion time, so that reads
+      never have to write and stay cheap under concurrent access. Each
+      instance checks the size every `evict_every` writes.
+    - Several threads and processes can share the file, e.g. all array tasks
+      of an HPC job. Each thread keeps one connection, and writers wait for
+      each other up to `timeout` seconds (`busy_timeout`).
+    - The `journal_mode` defaults to `CACHE_JOURNAL_MODE` or `DELETE`, the
+      rollback journal, which only needs the file locks that network
+      filesystems such as NFS provide. `WAL` lets readers and the writer run
+      at once, but relies on shared memory and is only safe on a local disk.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 0,
+        max_bytes: int = 0,
+        timeout: float = 60,
+        evict_every: int = 50,
+        journal_mode: str = None,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.evict_every = evict_every
+        self.journal_mode = journal_mode or os.getenv("CACHE_JOURNAL_MODE", "DELETE")
+        self.writes = 0
+        self.local = threading.local()
+        connection = self.connect()
+        connection.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_created ON entries (created)"
+            )
+
+    def connect(self) -> sqlite3.Connection:
+        """Returns the connection of the current thread. Connections are not
+        inherited by forked processes, which open their own.
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return connection
+
+    def close(self):
+        """Closes the connection of the current thread."""
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    @staticmethod
+    def hash_key(*parts: str, normalize: bool = True) -> str:
+        """Returns a stable key for the given parts. With `normalize`, whitespace
+        is normalized, so differently indented versions of the same query share
+        one entry. Prompts are hashed without it, as the llm sees every byte.
+        """
+        if normalize:
+            parts = [" ".join(str(part).split()) for part in parts]
+        joined = "\x1f".join(str(part) for part in parts)
+        return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached value or `None` on a miss."""
+        row = (
+            self.connect()
+            .execute("SELECT value, created FROM entries WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        value, created = row
+        if self.ttl and time.time() - created > self.ttl:
+            return None
+        return zlib.decompress(value).decode("utf-8")
+
+    def get_many(self, keys: List[str], batch_size: int = 500) -> Dict[str, str]:
+        """Returns the cached values of `keys`, leaving out misses. Keys are
+        looked up in batches of `batch_size` over one connection.
+        """
+        rows = []
+        connection = self.connect()
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start : start + batch_size]
+            rows += connection.execute(
+                f"SELECT key, value, created FROM entries WHERE key IN ({', '.join('?' * len(batch))})",
+                batch,
+            ).fetchall()
+        return {
+            key: zlib.decompress(value).decode("utf-8")
+            for key, value, created in rows
+            if not self.ttl or time.time() - created <= self.ttl
+        }
+
+    def set_many(self, items: Dict[str, str]):
+        """Stores all `items` in one transaction."""
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            compressed = zlib.compress(value.encode("utf-8"))
+            rows.append((key, compressed, len(compressed), now))
+        with self.connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, created) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        self.count_writes(len(rows))
+
+    def set(self, key: str, value: str):
+        compressed = zlib.compress(value.encode("utf-8"))
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created) VALUES (?, ?, ?, ?)",
+                (key, compressed, len(compressed), time.time()),
+            )
+        self.count_writes(1)
+
+    def count_writes(self, count: int):
+        """Evicts once per `evict_every` writes, not on every write."""
+        before = self.writes
+        self.writes += count
+        if (
+            self.max_bytes
+            and before // self.evict_every < self.writes // self.evict_every
+        ):
+            self.evict()
+
+    def evict(self):
+        """Removes expired entries and, if the stored values are larger than
+        `max_bytes`, the oldest entries until 90% of `max_bytes` are left.
+        """
+        with self.connect() as connection:
+            if self.ttl:
+                connection.execute(
+                    "DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,)
+                )
+            if self.max_bytes:
+                total = connection.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()[0]
+                excess = total - int(self.max_bytes * 0.9)
+                if total > self.max_bytes:
+                    removed = 0
+                    keys = []
+                    for key, size in connection.execute(
+                        "SELECT key, size FROM entries ORDER BY created"
+                    ):
+                        if removed >= excess:
+                            break
+                        keys.append((key,))
+                        removed += size
+                    connection.executemany("DELETE FROM entries WHERE key = ?", keys)
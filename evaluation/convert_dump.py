@@ -0,0 +1,40 @@
+"""
+# ---------------------------------------------------------------------------- #
+#                                 CONVERT DUMP                                 #
+# ---------------------------------------------------------------------------- #
+
+Converts a Wikidata N-Triples dump (e.g. an extract of `latest-truthy.nt.gz`)
+into the memory-mapped format of the `wikidata_dump` graph (see
+`GraphWikidataDump`).
+
+```
+python -m evaluation.convert_dump --source ./truthy-extract.nt.gz
+```
+"""
+
+from graphs.GraphWikidataDump import GraphWikidataDump
+import argparse
+import os
+import time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--source",
+        type=str,
+        required=True,
+        help="The N-Triples file, optionally compressed with gzip or bzip2",
+    )
+    parser.add_argument(
+        "--path",
+        type=str,
+        help="The output directory (defaults to GRAPH_DUMP_PATH)",
+    )
+    args = parser.parse_args()
+
+    path = args.path or os.getenv("GRAPH_DUMP_PATH", "./wikidata_dump")
+    start = time.perf_counter()
+    stats = GraphWikidataDump.convert(args.source, path)
+    for name, count in stats.items():
+        print(f"{name:>12}: {count}")
+    print(f"Converted to {path} in {time.perf_counter() - start:.1f}s")
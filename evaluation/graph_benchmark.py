@@ -0,0 +1,209 @@
+"""
+# ---------------------------------------------------------------------------- #
+#                                GRAPH BENCHMARK                               #
+# ---------------------------------------------------------------------------- #
+
+Small benchmarks for the graph backends. Each benchmark runs a baseline and a
+candidate variant of the same lookups on sample entities of the configured
+graph and prints the timings side by side.
+
+```
+python -m evaluation.graph_benchmark --benchmark plan_cache --samples 200
+```
+"""
+
+from graphs.GraphNeo4j import GraphNeo4j
+import graphs.queries.Cypher as queries
+from typing import Callable, Dict, List
+import argparse
+import json
+import random
+import statistics
+import time
+
+
+# ---------------------------------------------------------------------------- #
+#                                    HELPERS                                   #
+# ---------------------------------------------------------------------------- #
+def sample_uuids(graph: GraphNeo4j, samples: int, seed: int) -> List[str]:
+    uuids = graph.run_query(
+        "read", "MATCH (entity) RETURN entity.uuid AS uuid", key="uuid"
+    )
+    random.Random(seed).shuffle(uuids)
+    return uuids[:samples]
+
+
+def timed_query(graph: GraphNeo4j, query: str, **kwargs) -> Dict[str, float]:
+    """Runs a query and returns the wall time and the server side time until
+    the first record was available (which includes parsing and planning)."""
+    with graph.driver.session() as session:
+        start = time.perf_counter()
+        summary = session.run(query, **kwargs).consume()
+        wall = time.perf_counter() - start
+    return {
+        "wall_ms": wall * 1000,
+        "available_after_ms": summary.result_available_after or 0,
+    }
+
+
+def timed_fetch(graph: GraphNeo4j, query: str, **kwargs) -> Dict[str, float]:
+    """Runs a query, fetches all records and returns the wall time and the
+    size of the received values serialized as JSON, an estimate of the bytes
+    sent over the wire."""
+    with graph.driver.session() as session:
+        start = time.perf_counter()
+        records = [record.data() for record in session.run(query, **kwargs)]
+        wall = time.perf_counter() - start
+    return {
+        "wall_ms": wall * 1000,
+        "payload_kb": len(json.dumps(records, default=str).encode("utf-8")) / 1024,
+    }
+
+
+def report(results: Dict[str, List[Dict[str, float]]]):
+    print(f"\n{"Variant":<20} {"Metric":<20} {"Mean":>10} {"Median":>10} {"p95":>10}")
+    for variant, rows in results.items():
+        for metric in rows[0].keys():
+            values = sorted(row[metric] for row in rows)
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            print(
+                f"{variant:<20} {metric:<20} {statistics.mean(values):>10.3f} {statistics.median(values):>10.3f} {p95:>10.3f}"
+            )
+
+
+# ---------------------------------------------------------------------------- #
+#                                  BENCHMARKS                                  #
+# ---------------------------------------------------------------------------- #
+def benchmark_plan_cache(graph: GraphNeo4j, uuids: List[str], **_):
+    """Compares relationship lookups with the uuid inlined into the query string
+    (a new plan per entity) against the parameterized query (one cached plan).
+    """
+    inline_query = """
+MATCH (entity {{ uuid: "{uuid}" }})-[rel]-()
+WITH DISTINCT type(rel) as relationship
+RETURN relationship
+"""
+    params = graph.relationship_filter_params()
+    results = {"inline": [], "parameterized": []}
+    timed_query(graph, queries.get_relationships, uuid=uuids[0], **params)
+    for uuid in uuids:
+        results["inline"].append(timed_query(graph, inline_query.format(uuid=uuid)))
+        results["parameterized"].append(
+            timed_query(graph, queries.get_relationships, uuid=uuid, **params)
+        )
+    return results
+
+
+def benchmark_uuid_lookup(graph: GraphNeo4j, uuids: List[str], **_):
+    """Compares entity lookups by uuid without a node label (full node scan)
+    against the labeled lookup served by the uuid uniqueness constraint.
+    Run `GraphNeo4j.ensure_schema()` (or `use_case/generate_graph.py`) first.
+    """
+    unlabeled_query = """
+UNWIND $data_list AS data
+MATCH (entity { uuid: data })
+RETURN entity
+"""
+    results = {"unlabeled": [], "labeled": []}
+    timed_query(graph, unlabeled_query, data_list=uuids[:1])
+    timed_query(graph, queries.get_entities, data_list=uuids[:1], preview=None)
+    for uuid in uuids:
+        results["unlabeled"].append(
+            timed_query(graph, unlabeled_query, data_list=[uuid])
+        )
+        results["labeled"].append(
+            timed_query(graph, queries.get_entities, data_list=[uuid], preview=None)
+        )
+    return results
+
+
+def benchmark_session_reuse(graph: GraphNeo4j, uuids: List[str], **_):
+    """Compares the per-call overhead of `run_query` with a new session per
+    query against queries sharing one session (see `GraphNeo4j.session`).
+    """
+
+    params = graph.relationship_filter_params()
+
+    def timed_run_query(uuid: str) -> Dict[str, float]:
+        start = time.perf_counter()
+        graph.run_query("read", queries.get_relationships, uuid=uuid, **params)
+        return {"wall_ms": (time.perf_counter() - start) * 1000}
+
+    results = {"session_per_call": [], "shared_session": []}
+    graph.run_query("read", queries.get_relationships, uuid=uuids[0], **params)
+    for uuid in uuids:
+        results["session_per_call"].append(timed_run_query(uuid))
+    with graph.session():
+        for uuid in uuids:
+            results["shared_session"].append(timed_run_query(uuid))
+    return results
+
+
+def benchmark_projection(graph: GraphNeo4j, uuids: List[str], **_):
+    """Compares fetching all triplets of an entity as whole nodes against the
+    uuid and label projection used by `GraphNeo4j`, with full labels and with
+    a label preview of 80 characters.
+    """
+    node_query = """
+MATCH (a:NODE { uuid: $uuid })-[rel]-(b)
+RETURN startNode(rel) AS head, type(rel) AS relationship, endNode(rel) AS tail
+"""
+    projected_query = """
+MATCH (a:NODE { uuid: $uuid })-[rel]-(b)
+WITH startNode(rel) AS head, type(rel) AS relationship, endNode(rel) AS tail
+RETURN head {
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN head.label ELSE left(head.label, $preview) END
+} AS head, relationship, tail {
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN tail.label ELSE left(tail.label, $preview) END
+} AS tail
+"""
+    results = {"nodes": [], "projected": [], "preview_80": []}
+    timed_fetch(graph, node_query, uuid=uuids[0])
+    timed_fetch(graph, projected_query, uuid=uuids[0], preview=None)
+    for uuid in uuids:
+        results["nodes"].append(timed_fetch(graph, node_query, uuid=uuid))
+        results["projected"].append(
+            timed_fetch(graph, projected_query, uuid=uuid, preview=None)
+        )
+        results["preview_80"].append(
+            timed_fetch(graph, projected_query, uuid=uuid, preview=80)
+        )
+    return results
+
+
+BENCHMARKS: Dict[str, Callable[..., Dict[str, List[Dict[str, float]]]]] = {
+    "plan_cache": benchmark_plan_cache,
+    "uuid_lookup": benchmark_uuid_lookup,
+    "session_reuse": benchmark_session_reuse,
+    "projection": benchmark_projection,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--benchmark",
+        choices=list(BENCHMARKS.keys()),
+        required=True,
+        help="The benchmark to run",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=100,
+        help="Number of sample entities used for lookups",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for sampling entities"
+    )
+    args = parser.parse_args()
+
+    graph = GraphNeo4j()
+    try:
+        uuids = sample_uuids(graph, args.samples, args.seed)
+        print(f"Running '{args.benchmark}' with {len(uuids)} sample entities")
+        report(BENCHMARKS[args.benchmark](graph, uuids))
+    finally:
+        graph.close()
@@ -1,4 +1,5 @@
 from graphs.registry import graph_service
+from graphs.CachingGraph import CachingGraph
 from agents.registry import agent_provider
 import evaluation.utils as utils
 import argparse
@@ -66,6 +67,18 @@ if __name__ == "__main__":
         default=1,
         help="How often each question is repeated",
     )
+    parser.add_argument(
+        "--max_fanout",
+        type=int,
+        default=0,
+        help="(Forma)ToG methods skip relationships expanding to more than this many triplets, unless an entity has no others. 0 disables the cap.",
+    )
+    parser.add_argument(
+        "--prune_workers",
+        type=int,
+        default=1,
+        help="ToG methods run the independent prune calls of a step in this many threads. Use with AGENT_MAX_CONCURRENCY and OLLAMA_NUM_PARALLEL above 1.",
+    )
     parser.add_argument(
         "--env_note",
         type=str,
@@ -118,6 +131,8 @@ if __name__ == "__main__":
                 "questions": args.questions,
                 "q_range": [q_from, q_to],
                 "repetitions": reps,
+                "max_fanout": args.max_fanout,
+                "prune_workers": args.prune_workers,
                 "env_note": args.env_note,
                 "timestamp": time.time(),
             },
@@ -211,6 +226,8 @@ if __name__ == "__main__":
                         agent=agent,
                         graph=graph,
                         seed_entities=question_data["seed_entities"],
+                        max_fanout=args.max_fanout,
+                        prune_workers=args.prune_workers,
                         log_path=os.path.join(q_dir, f"method_{rep+1}.log"),
                     )
                     duration = time.time() - start_timestamp
@@ -246,4 +263,7 @@ if __name__ == "__main__":
                     )
                     progress.update(1)
 
+    if isinstance(graph, CachingGraph):
+        print(f"\nGraph cache: {graph.get_stats()}")
+
 print("\nExperiment completed!\n")
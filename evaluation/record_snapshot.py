@@ -0,0 +1,104 @@
+"""
+# ---------------------------------------------------------------------------- #
+#                                RECORD SNAPSHOT                               #
+# ---------------------------------------------------------------------------- #
+
+Crawls the k-hop Wikidata neighborhoods of the seed entities of a question
+catalogue into a local snapshot, which the `wikidata_snapshot` graph answers
+lookups from without network access (see `GraphWikidataSnapshot`).
+
+```
+python -m evaluation.record_snapshot --questions qald_10-en --hops 2
+```
+"""
+
+from graphs.GraphWikidata import GraphWikidata
+from graphs.GraphWikidataSnapshot import GraphWikidataSnapshot
+from methods.common import relationship_filter
+from evaluation.utils import get_seed_ids
+import argparse
+import json
+import os
+import time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--questions",
+        type=str,
+        required=True,
+        help="Question catalogue to use. Catalogue must be a JSON file in /questions. Enter the file name without '.json'.",
+    )
+    parser.add_argument(
+        "--questions_from",
+        type=int,
+        help="The index marking the first question to be used (inclusive start index)",
+    )
+    parser.add_argument(
+        "--questions_to",
+        type=int,
+        help="The index marking up to which question questions will be used (exclusive end index)",
+    )
+    parser.add_argument(
+        "--hops",
+        type=int,
+        default=2,
+        help="Relationships and triplets are recorded for entities closer than this to a seed entity. Use the depth of the methods to cover their lookups.",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="Max. triplets recorded per entity and relationship (defaults to GRAPH_TRIPLET_LIMIT)",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=50,
+        help="Entities fetched per query",
+    )
+    parser.add_argument(
+        "--path",
+        type=str,
+        help="The snapshot file (defaults to GRAPH_SNAPSHOT_PATH)",
+    )
+    parser.add_argument(
+        "--unfiltered",
+        action="store_true",
+        help="Also record the relationships removed by the methods' relationship filter",
+    )
+    args = parser.parse_args()
+
+    current_dir = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(current_dir, ".."))
+    q_path = os.path.join(root_dir, "questions", f"{args.questions}.json")
+    with open(q_path) as f:
+        questions = json.load(f)
+    q_from = args.questions_from if args.questions_from is not None else 0
+    q_to = args.questions_to if args.questions_to is not None else len(questions)
+    seeds = sorted(
+        {
+            seed
+            for question in questions[q_from:q_to]
+            for seed in get_seed_ids(args.questions, question)
+        }
+    )
+    print(f"Recording {len(seeds)} seed entities with {args.hops} hops")
+
+    source = GraphWikidata()
+    snapshot = GraphWikidataSnapshot(args.path, create=True)
+    page = {"limit": args.limit} if args.limit is not None else {}
+    try:
+        start = time.perf_counter()
+        stats = snapshot.record(
+            source,
+            seeds,
+            hops=args.hops,
+            batch_size=args.batch_size,
+            relationship_filter=None if args.unfiltered else relationship_filter,
+            **page,
+        )
+        for hop, entities in stats.items():
+            print(f"{hop:>10}: {entities} entities")
+        print(f"Recorded to {snapshot.path} in {time.perf_counter() - start:.1f}s")
+    finally:
+        source.close()
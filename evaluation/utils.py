@@ -1,6 +1,7 @@
 from methods.prompting import ask
 from methods.formatog import think_on_graph as formatog
 from methods.tog import think_on_graph as tog
+from methods.tog_batched import think_on_graph as tog_batched
 from methods.instructions.cot import config as cot_config, schema as cot_schema
 from methods.instructions.io_few_shot import (
     config as io_few_shot_config,
@@ -16,7 +17,9 @@ from methods.instructions.formatog import (
     schema as formatog_schema,
 )
 from methods.instructions.tog import config as tog_config
+from methods.instructions.tog_batched import config as tog_batched_config
 from graphs.Graph import Graph
+from typing import List
 import re
 from pathlib import Path
 import string
@@ -61,6 +64,9 @@ def get_method_exec(method: str):
             "tog": lambda prompt, **kwargs: tog(
                 prompt, max_depth=max_depth, max_paths=max_paths, **kwargs
             ),
+            "tog_batched": lambda prompt, **kwargs: tog_batched(
+                prompt, max_depth=max_depth, max_paths=max_paths, **kwargs
+            ),
             "formatog": lambda prompt, **kwargs: formatog(
                 prompt, max_depth=max_depth, max_paths=max_paths, **kwargs
             ),
@@ -85,6 +91,7 @@ def get_config_and_use_context(method_with_params: str):
         "formatog": (formatog_config, True, formatog_schema),
         "formatog_noctx": (formatog_config, False, formatog_schema),
         "tog": (tog_config, False, None),
+        "tog_batched": (tog_batched_config, False, None),
     }
 
     if method in methods:
@@ -93,14 +100,19 @@ def get_config_and_use_context(method_with_params: str):
     raise ValueError(f"Unknown method: {method}")
 
 
+def get_seed_ids(catalogue: str, question_dict: dict) -> List[str]:
+    """Returns the IDs of the seed entities of a question."""
+    if catalogue in ["cwq", "qald_10-en"]:
+        return [key for key in list(question_dict["qid_topic_entity"].keys())]
+    return question_dict.get("seed_entities", [])
+
+
 def map_question(catalogue: str, question_dict: dict, graph: Graph):
     if catalogue == "cwq":
         return {
             "question": question_dict["question"],
             "answer": question_dict["answer"],
-            "seed_entities": graph.get_entities(
-                [key for key in list(question_dict["qid_topic_entity"].keys())]
-            ),
+            "seed_entities": graph.get_entities(get_seed_ids(catalogue, question_dict)),
         }
     if catalogue == "qald_10-en":
         return {
@@ -108,16 +120,14 @@ def map_question(catalogue: str, question_dict: dict, graph: Graph):
             "answer": "; ".join(
                 [val for val in list(question_dict["answer"].values())]
             ),
-            "seed_entities": graph.get_entities(
-                [key for key in list(question_dict["qid_topic_entity"].keys())]
-            ),
+            "seed_entities": graph.get_entities(get_seed_ids(catalogue, question_dict)),
         }
 
     if catalogue == "lndw25":
         return {
             "question": question_dict["question"],
             "answer": question_dict["answer"],
-            "seed_entities": graph.get_entities(question_dict["seed_entities"]),
+            "seed_entities": graph.get_entities(get_seed_ids(catalogue, question_dict)),
         }
 
     return question_dict
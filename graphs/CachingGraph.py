@@ -0,0 +1,175 @@
+from graphs.Graph import Graph, Entity, Relationship, GraphTriplet, GraphTuple
+from cache import LRUCache
+from errors import GraphException
+from typing import Callable, Dict, Hashable, List
+from dotenv import load_dotenv
+import os
+
+
+class CachingGraph(Graph):
+    """Wraps any graph backend and memoizes its read operations in memory.
+
+    Lookups are keyed by entity and relationship ids (not labels) together with
+    the keyword arguments of the call. The bulk operations only forward the
+    missing keys to the wrapped graph. All other attributes (e.g. `close` or
+    the CRUD operations of `GraphNeo4j`) are passed through unchanged.
+
+    The cache size and time to live are configured with `GRAPH_MEMORY_CACHE_SIZE`
+    (number of entries, `0` for unbounded) and `GRAPH_MEMORY_CACHE_TTL` (seconds,
+    `0` to never expire).
+    """
+
+    def __init__(self, graph: Graph, maxsize: int = None, ttl: float = None):
+        try:
+            load_dotenv()
+            self.graph = graph
+            self.cache = LRUCache(
+                maxsize=(
+                    maxsize
+                    if maxsize is not None
+                    else int(os.getenv("GRAPH_MEMORY_CACHE_SIZE", 100000))
+                ),
+                ttl=(
+                    ttl
+                    if ttl is not None
+                    else float(os.getenv("GRAPH_MEMORY_CACHE_TTL", 0))
+                ),
+            )
+        except Exception as e:
+            raise GraphException(e)
+
+    def __getattr__(self, name):
+        if name == "graph":
+            raise AttributeError(name)
+        return getattr(self.graph, name)
+
+    def session(self):
+        return self.graph.session()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns the size, hit, miss and eviction counters of the cache."""
+        return self.cache.get_stats()
+
+    # ---------------------------------------------------------------------------- #
+    #                                    HELPERS                                   #
+    # ---------------------------------------------------------------------------- #
+
+    @staticmethod
+    def make_key(operation: str, key: Hashable, kwargs: dict) -> Hashable:
+        return (operation, key, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+
+    def cached(self, key: Hashable, fetch: Callable[[], list]) -> list:
+        value = self.cache.get(key)
+        if value is LRUCache.MISSING:
+            value = fetch()
+            self.cache.set(key, value)
+        return list(value)
+
+    def cached_many(
+        self, keys: List[Hashable], items: list, fetch_many: Callable[[list], list]
+    ) -> List[list]:
+        """Looks up every key and fetches the items of all misses with one call
+        of `fetch_many`, which must return results aligned with its input.
+        """
+        values = [self.cache.get(key) for key in keys]
+        missing = [
+            index for index, value in enumerate(values) if value is LRUCache.MISSING
+        ]
+        if missing:
+            fetched = fetch_many([items[index] for index in missing])
+            for index, value in zip(missing, fetched):
+                values[index] = value
+                self.cache.set(keys[index], value)
+        return [list(value) for value in values]
+
+    # ---------------------------------------------------------------------------- #
+    #                                    TOG OPS                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def get_entities(self, entities: List[str], **kwargs) -> List[Entity]:
+        if not entities:
+            return []
+
+        def fetch_many(ids: List[str]) -> List[List[Entity]]:
+            found = {
+                entity.get_id(): entity
+                for entity in self.graph.get_entities(ids, **kwargs)
+            }
+            return [[found[id]] if id in found else [] for id in ids]
+
+        keys = [self.make_key("get_entities", id, kwargs) for id in entities]
+        return [
+            entity
+            for result in self.cached_many(keys, entities, fetch_many)
+            for entity in result
+        ]
+
+    def get_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
+        return self.cached(
+            self.make_key("get_relationships", entity.get_id(), kwargs),
+            lambda: self.graph.get_relationships(entity, **kwargs),
+        )
+
+    def get_relationships_many(
+        self, entities: List[Entity], **kwargs
+    ) -> List[List[Relationship]]:
+        keys = [
+            self.make_key("get_relationships", entity.get_id(), kwargs)
+            for entity in entities
+        ]
+        return self.cached_many(
+            keys,
+            entities,
+            lambda missing: self.graph.get_relationships_many(missing, **kwargs),
+        )
+
+    def get_triplets(
+        self, entity: Entity, relationship: Relationship, **kwargs
+    ) -> List[GraphTriplet]:
+        return self.cached(
+            self.make_key(
+                "get_triplets", (entity.get_id(), relationship.get_id()), kwargs
+            ),
+            lambda: self.graph.get_triplets(entity, relationship, **kwargs),
+        )
+
+    def get_triplets_many(
+        self, tuples: List[GraphTuple], **kwargs
+    ) -> List[List[GraphTriplet]]:
+        keys = [
+            self.make_key(
+                "get_triplets", (entity.get_id(), relationship.get_id()), kwargs
+            )
+            for entity, relationship in tuples
+        ]
+        return self.cached_many(
+            keys,
+            tuples,
+            lambda missing: self.graph.get_triplets_many(missing, **kwargs),
+        )
+
+    def count_triplets_many(self, tuples: List[GraphTuple], **kwargs) -> List[int]:
+        keys = [
+            self.make_key(
+                "count_triplets", (entity.get_id(), relationship.get_id()), kwargs
+            )
+            for entity, relationship in tuples
+        ]
+        return [
+            count
+            for result in self.cached_many(
+                keys,
+                tuples,
+                lambda missing: [
+                    [count]
+                    for count in self.graph.count_triplets_many(missing, **kwargs)
+                ],
+            )
+            for count in result
+        ]
+
+    def find(self, data_list: List[str], **kwargs) -> List[Entity]:
+        return self.cached(
+            self.make_key("find", tuple(data_list), kwargs),
+            lambda: self.graph.find(data_list, **kwargs),
+        )
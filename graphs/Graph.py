@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import ContextManager, List, Tuple, TypedDict
+import contextlib
+import asyncio
 
 
 class Entity(ABC):
@@ -8,6 +10,11 @@ class Entity(ABC):
     def __init__(self):
         pass
 
+    @abstractmethod
+    def get_id(self) -> str:
+        """Returns the identifier used by the graph backend."""
+        pass
+
     @abstractmethod
     def get_label(self) -> str:
         pass
@@ -19,6 +26,11 @@ class Relationship(ABC):
     def __init__(self):
         pass
 
+    @abstractmethod
+    def get_id(self) -> str:
+        """Returns the identifier used by the graph backend."""
+        pass
+
     @abstractmethod
     def get_label(self) -> str:
         pass
@@ -28,7 +40,38 @@ GraphTriplet = Tuple[Entity, Relationship, Entity]
 GraphTuple = Tuple[Entity, Relationship]
 
 
+class RelationshipFilter(TypedDict, total=False):
+    """Relationships to leave out of `get_relationships`, passed as the
+    `relationship_filter` keyword argument. Backends push the filter into their
+    queries where they can; all fields are optional.
+    - `excluded_ids`: relationship identifiers (see `Relationship.get_id`)
+    - `excluded_datatypes`: value types, e.g. `ExternalId` for Wikidata
+    - `excluded_suffixes`: case-sensitive label endings, e.g. `" ID"`
+    - `excluded_labels`: lower case labels
+    - `excluded_substrings`: lower case parts of labels
+    """
+
+    excluded_ids: List[str]
+    excluded_datatypes: List[str]
+    excluded_suffixes: List[str]
+    excluded_labels: List[str]
+    excluded_substrings: List[str]
+
+
 class Graph(ABC):
+    """The graph interface used by the methods.
+
+    Every read operation has an async counterpart prefixed with `a` (e.g.
+    `aget_triplets`). By default these run the sync operation in a worker
+    thread; backends with an async client override them to await their I/O
+    directly, so many lookups can be in flight on one event loop.
+    """
+
+    def session(self) -> ContextManager:
+        """Groups the lookups inside the block, so that backends can serve them
+        over one connection (see `GraphNeo4j.session`). Does nothing by default.
+        """
+        return contextlib.nullcontext()
 
     @abstractmethod
     def get_entities(self, entities: List[str], **kwargs) -> List[Entity]:
@@ -37,9 +80,22 @@ class Graph(ABC):
 
     @abstractmethod
     def get_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
-        """Returns all ingoing and outgoing relationships of a given entity."""
+        """Returns all ingoing and outgoing relationships of a given entity.
+        Backends may leave out the relationships matching a `relationship_filter`
+        (see `RelationshipFilter`), so callers should still filter the result.
+        """
         pass
 
+    def get_relationships_many(
+        self, entities: List[Entity], **kwargs
+    ) -> List[List[Relationship]]:
+        """Returns all ingoing and outgoing relationships for each of the given
+        entities. The result is aligned with `entities`, so the relationships of
+        `entities[i]` are found at index `i`.
+        Backends should override this to fetch everything in a single round trip.
+        """
+        return [self.get_relationships(entity, **kwargs) for entity in entities]
+
     @abstractmethod
     def get_triplets(
         self, enitity: Entity, relationship: Relationship, **kwargs
@@ -52,9 +108,87 @@ class Graph(ABC):
         """
         pass
 
+    def get_triplets_many(
+        self, tuples: List[GraphTuple], **kwargs
+    ) -> List[List[GraphTriplet]]:
+        """Returns all triplets for each of the given `(entity, relationship)`
+        tuples. The result is aligned with `tuples`, so the triplets of
+        `tuples[i]` are found at index `i`.
+        Backends should override this to fetch everything in a single round trip.
+        """
+        return [
+            self.get_triplets(entity, relationship, **kwargs)
+            for entity, relationship in tuples
+        ]
+
+    def count_triplets(
+        self, entity: Entity, relationships: List[Relationship], **kwargs
+    ) -> List[int]:
+        """Returns how many triplets `get_triplets` would return without a limit
+        for the given entity and each of the relationships. The result is
+        aligned with `relationships`. Counting is cheap compared to fetching,
+        so hub relationships can be skipped before they are expanded.
+        """
+        return self.count_triplets_many(
+            [(entity, relationship) for relationship in relationships], **kwargs
+        )
+
+    def count_triplets_many(self, tuples: List[GraphTuple], **kwargs) -> List[int]:
+        """Returns the number of triplets for each of the given
+        `(entity, relationship)` tuples, aligned with `tuples`.
+        Backends should override this with a count aggregation in a single
+        round trip instead of fetching all triplets.
+        """
+        return [
+            len(self.get_triplets(entity, relationship, **{**kwargs, "limit": 0}))
+            for entity, relationship in tuples
+        ]
+
     @abstractmethod
     def find(self, data_list: List[str], **kwargs) -> List[Entity]:
         """Attempts to find entities based on query strings. If not applicable
         this can be implemented to return an empty list instead.
         """
         pass
+
+    # ---------------------------------------------------------------------------- #
+    #                                   ASYNC OPS                                  #
+    # ---------------------------------------------------------------------------- #
+
+    async def aget_entities(self, entities: List[str], **kwargs) -> List[Entity]:
+        return await asyncio.to_thread(self.get_entities, entities, **kwargs)
+
+    async def aget_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
+        return await asyncio.to_thread(self.get_relationships, entity, **kwargs)
+
+    async def aget_relationships_many(
+        self, entities: List[Entity], **kwargs
+    ) -> List[List[Relationship]]:
+        return await asyncio.to_thread(self.get_relationships_many, entities, **kwargs)
+
+    async def aget_triplets(
+        self, entity: Entity, relationship: Relationship, **kwargs
+    ) -> List[GraphTriplet]:
+        return await asyncio.to_thread(
+            self.get_triplets, entity, relationship, **kwargs
+        )
+
+    async def aget_triplets_many(
+        self, tuples: List[GraphTuple], **kwargs
+    ) -> List[List[GraphTriplet]]:
+        return await asyncio.to_thread(self.get_triplets_many, tuples, **kwargs)
+
+    async def acount_triplets(
+        self, entity: Entity, relationships: List[Relationship], **kwargs
+    ) -> List[int]:
+        return await self.acount_triplets_many(
+            [(entity, relationship) for relationship in relationships], **kwargs
+        )
+
+    async def acount_triplets_many(
+        self, tuples: List[GraphTuple], **kwargs
+    ) -> List[int]:
+        return await asyncio.to_thread(self.count_triplets_many, tuples, **kwargs)
+
+    async def afind(self, data_list: List[str], **kwargs) -> List[Entity]:
+        return await asyncio.to_thread(self.find, data_list, **kwargs)
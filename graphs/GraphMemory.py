@@ -0,0 +1,310 @@
+from graphs.Graph import (
+    Graph,
+    Entity as AbstractEntity,
+    Relationship as AbstractRelationship,
+)
+from graphs.mapped import MappedGraph
+from errors import GraphException
+from typing import Dict, Iterable, List, Tuple
+from dotenv import load_dotenv
+from array import array
+import xml.etree.ElementTree as ET
+import bisect
+import hashlib
+import os
+
+
+class Entity(AbstractEntity):
+
+    def __init__(self, uuid: str, label: str):
+        self.uuid = uuid
+        self.label = label
+
+    def get_id(self):
+        return self.uuid
+
+    def get_label(self):
+        return self.label.replace("\n", " ")
+
+
+class Relationship(AbstractRelationship):
+
+    def __init__(self, type: str):
+        self.type = type
+
+    def get_id(self):
+        return self.type
+
+    def get_label(self):
+        return self.type
+
+
+class GraphMemory(Graph):
+    """A read-only in-process graph loaded from the GraphML export of the Neo4j
+    graph (see `use_case/generate_graph.py`) or from a binary snapshot of it
+    (see `MappedGraph` and `use_case/graph_snapshot.py`).
+
+    Adjacency is kept in compressed sparse row (CSR) arrays: the incident edges
+    of node `i` are found at `offsets[i]:offsets[i + 1]` in `neighbors`,
+    `edge_types` (interned relationship types) and `outgoing` (whether node `i`
+    is the head of the edge). Each node's edges are sorted by type, so the
+    triplets of one relationship type are a contiguous range.
+
+    The file is configured with `GRAPH_MEMORY_FILE`, a directory is loaded as a
+    snapshot. Triplet lookups are paged like in `GraphNeo4j` (see `page_range`).
+    """
+
+    GRAPHML_NS = "{http://graphml.graphdrawing.org/xmlns}"
+
+    def __init__(self, path: str = None):
+        try:
+            load_dotenv()
+            self.find_limit = int(os.getenv("GRAPH_FIND_LIMIT", 10))
+            self.triplet_limit = int(os.getenv("GRAPH_TRIPLET_LIMIT", 0))
+            self.triplet_order = os.getenv("GRAPH_TRIPLET_ORDER", "id")
+            self.triplet_seed = int(os.getenv("GRAPH_TRIPLET_SEED", 0))
+            path = path or os.getenv(
+                "GRAPH_MEMORY_FILE",
+                os.path.join(os.getenv("GRAPH_IMPORT_VOL", "./use_case"), "graph.xml"),
+            )
+            if os.path.isdir(path):
+                self.load_snapshot(path)
+            else:
+                self.load_graphml(path)
+        except Exception as e:
+            raise GraphException(e)
+
+    def close(self):
+        """Nothing to release, exists for compatibility with the other graphs."""
+        pass
+
+    # ---------------------------------------------------------------------------- #
+    #                                    LOADING                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def load_graphml(self, path: str):
+        uuids: List[str] = []
+        labels: List[str] = []
+        node_index: Dict[str, int] = {}
+        edges: List[Tuple[str, str, str]] = []
+        for _, element in ET.iterparse(path, events=("end",)):
+            if element.tag == f"{self.GRAPHML_NS}node":
+                data = {
+                    child.get("key"): child.text or ""
+                    for child in element.iter(f"{self.GRAPHML_NS}data")
+                }
+                node_index[element.get("id")] = len(uuids)
+                uuids.append(data["uuid"])
+                labels.append(data.get("label", ""))
+                element.clear()
+            elif element.tag == f"{self.GRAPHML_NS}edge":
+                edges.append(
+                    (element.get("source"), element.get("label"), element.get("target"))
+                )
+                element.clear()
+        rel_types = sorted({rel_type for _, rel_type, _ in edges})
+        type_index = {rel_type: index for index, rel_type in enumerate(rel_types)}
+        self.build(
+            uuids,
+            labels,
+            rel_types,
+            (
+                (node_index[head], type_index[rel_type], node_index[tail])
+                for head, rel_type, tail in edges
+            ),
+        )
+
+    def load_snapshot(self, path: str):
+        with MappedGraph(path) as snapshot:
+            self.build(
+                snapshot.uuids.decode(),
+                snapshot.labels.decode(),
+                snapshot.rel_types.decode(),
+                snapshot.iter_edges(),
+            )
+
+    def export_snapshot(self, path: str) -> Dict[str, int]:
+        """Writes the graph as a `MappedGraph` snapshot to `path`."""
+        try:
+            return MappedGraph.write(
+                path,
+                self.uuids,
+                self.labels,
+                self.rel_types,
+                (
+                    (node, self.edge_types[index], self.neighbors[index])
+                    for node in range(len(self.uuids))
+                    for index in range(self.offsets[node], self.offsets[node + 1])
+                    if self.outgoing[index]
+                ),
+            )
+        except Exception as e:
+            raise GraphException(e)
+
+    def build(
+        self,
+        uuids: List[str],
+        labels: List[str],
+        rel_types: List[str],
+        edges: Iterable[Tuple[int, int, int]],
+    ):
+        """Builds the CSR adjacency and lookup indexes from interned edges given
+        as `(head_index, type_index, tail_index)`.
+        """
+        incidences = []
+        for head, rel_type, tail in edges:
+            incidences.append((head, rel_type, tail, 1))
+            incidences.append((tail, rel_type, head, 0))
+        incidences.sort()
+
+        self.uuids = uuids
+        self.labels = labels
+        self.rel_types = rel_types
+        self.uuid_index = {uuid: index for index, uuid in enumerate(uuids)}
+        self.type_index = {rel_type: index for index, rel_type in enumerate(rel_types)}
+        self.lower_labels = [label.lower() for label in labels]
+        self.label_index: Dict[str, List[int]] = {}
+        for index, label in enumerate(self.lower_labels):
+            self.label_index.setdefault(label, []).append(index)
+
+        self.offsets = array("q", [0] * (len(uuids) + 1))
+        self.neighbors = array("i", [neighbor for _, _, neighbor, _ in incidences])
+        self.edge_types = array("i", [rel_type for _, rel_type, _, _ in incidences])
+        self.outgoing = array("b", [outgoing for _, _, _, outgoing in incidences])
+        for node, _, _, _ in incidences:
+            self.offsets[node + 1] += 1
+        for index in range(len(uuids)):
+            self.offsets[index + 1] += self.offsets[index]
+
+    # ---------------------------------------------------------------------------- #
+    #                                    HELPERS                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def make_entity(self, index: int) -> Entity:
+        return Entity(uuid=self.uuids[index], label=self.labels[index])
+
+    def type_range(self, node: int, rel_type: int) -> Tuple[int, int]:
+        """Returns the range of `node`'s edges that have the given type."""
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return (
+            bisect.bisect_left(self.edge_types, rel_type, start, end),
+            bisect.bisect_right(self.edge_types, rel_type, start, end),
+        )
+
+    def page_range(self, start: int, end: int, **kwargs) -> List[int]:
+        """Returns the edge indexes of one page of the range. The page is selected
+        with the keyword arguments `limit`, `offset`, `order` and `seed`, see
+        `GraphNeo4j.page_query`.
+        """
+        indexes = list(range(start, end))
+        limit = kwargs.get("limit", self.triplet_limit)
+        if not limit:
+            return indexes
+        order = kwargs.get("order", self.triplet_order)
+        if order not in ["id", "sample"]:
+            raise ValueError(f"Unknown triplet order: {order}")
+        if order == "sample":
+            seed = str(kwargs.get("seed", self.triplet_seed))
+            indexes.sort(
+                key=lambda index: hashlib.md5(
+                    (self.uuids[self.neighbors[index]] + seed).encode("utf-8")
+                ).digest()
+            )
+        else:
+            indexes.sort(key=lambda index: self.uuids[self.neighbors[index]])
+        offset = kwargs.get("offset", 0)
+        return indexes[offset : offset + limit]
+
+    # ---------------------------------------------------------------------------- #
+    #                                    TOG OPS                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def get_entities(self, entities, **kwargs) -> List[Entity]:
+        try:
+            return [
+                self.make_entity(self.uuid_index[uuid])
+                for uuid in entities or []
+                if uuid in self.uuid_index
+            ]
+        except Exception as e:
+            raise GraphException(e)
+
+    def get_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
+        try:
+            if not entity or entity.uuid not in self.uuid_index:
+                return []
+            node = self.uuid_index[entity.uuid]
+            rel_types = []
+            for index in range(self.offsets[node], self.offsets[node + 1]):
+                rel_type = self.edge_types[index]
+                if not rel_types or rel_types[-1] != rel_type:
+                    rel_types.append(rel_type)
+            return [Relationship(type=self.rel_types[index]) for index in rel_types]
+        except Exception as e:
+            raise GraphException(e)
+
+    def get_triplets(self, entity: Entity, relationship: Relationship, **kwargs):
+        try:
+            if (
+                not entity
+                or not relationship
+                or entity.uuid not in self.uuid_index
+                or relationship.type not in self.type_index
+            ):
+                return []
+            node = self.uuid_index[entity.uuid]
+            start, end = self.type_range(node, self.type_index[relationship.type])
+            triplets = []
+            for index in self.page_range(start, end, **kwargs):
+                neighbor = self.make_entity(self.neighbors[index])
+                current = self.make_entity(node)
+                triplets.append(
+                    (current, Relationship(type=relationship.type), neighbor)
+                    if self.outgoing[index]
+                    else (neighbor, Relationship(type=relationship.type), current)
+                )
+            return triplets
+        except Exception as e:
+            raise GraphException(e)
+
+    def count_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[int]:
+        try:
+            counts = []
+            for entity, relationship in tuples:
+                if (
+                    entity.uuid not in self.uuid_index
+                    or relationship.type not in self.type_index
+                ):
+                    counts.append(0)
+                    continue
+                start, end = self.type_range(
+                    self.uuid_index[entity.uuid], self.type_index[relationship.type]
+                )
+                counts.append(end - start)
+            return counts
+        except Exception as e:
+            raise GraphException(e)
+
+    def find(self, data_list, **kwargs) -> List[Entity]:
+        """Returns entities whose label equals (first) or contains (second) one
+        of the query strings, ignoring case. At most `limit` entities are matched
+        per query string.
+        """
+        try:
+            limit = kwargs.get("limit", self.find_limit)
+            found: Dict[int, None] = {}
+            for data in data_list or []:
+                query = data.lower()
+                matches = list(self.label_index.get(query, []))
+                for index, label in enumerate(self.lower_labels):
+                    if len(matches) >= limit:
+                        break
+                    if query in label and label != query:
+                        matches.append(index)
+                for index in matches[:limit]:
+                    found[index] = None
+            return [self.make_entity(index) for index in found]
+        except Exception as e:
+            raise GraphException(e)
@@ -4,19 +4,34 @@ from graphs.Graph import (
     Relationship as AbstractRelationship,
 )
 import graphs.queries.Cypher as queries
-from neo4j import GraphDatabase, Transaction
+from neo4j import (
+    AsyncGraphDatabase,
+    AsyncManagedTransaction,
+    GraphDatabase,
+    Session,
+    Transaction,
+)
+from graphs.mapped import MappedGraph
+from loops import LoopResource
 from errors import GraphException
-from typing import Literal, List, Tuple
+from typing import Dict, Iterator, Literal, List, Tuple
+from contextlib import contextmanager
+from uuid import uuid4
 from dotenv import load_dotenv
+import threading
 import os
 import re
 
 
 class Entity(AbstractEntity):
 
-    def __init__(self, uuid: str, label: str):
+    def __init__(self, uuid: str, label: str, score: float | None = None):
         self.uuid = uuid
         self.label = label
+        self.score = score
+
+    def get_id(self):
+        return self.uuid
 
     def get_label(self):
         return self.label.replace("\n", " ")
@@ -27,11 +42,30 @@ class Relationship(AbstractRelationship):
     def __init__(self, type: str):
         self.type = type
 
+    def get_id(self):
+        return self.type
+
     def get_label(self):
         return self.type
 
 
 class GraphNeo4j(Graph):
+    """A graph stored in Neo4j.
+
+    One instance can be shared by several threads (e.g. the server workers).
+    The driver and its connection pool are thread safe, while sessions are
+    not, so every session opened by `session` is bound to the calling thread.
+
+    The connection pool is configured with `GRAPH_MAX_CONNECTIONS`,
+    `GRAPH_CONNECTION_ACQUISITION_TIMEOUT` (seconds to wait for a free
+    connection) and `GRAPH_FETCH_SIZE` (records fetched per batch).
+
+    Triplet lookups can be capped to `GRAPH_TRIPLET_LIMIT` triplets per entity
+    and relationship, so that hub entities do not flood memory and prompts (see
+    `page_query`). The cap is off by default, as it changes the candidates the
+    methods see. Entities are fetched as their uuid and label only, labels
+    can be truncated to `GRAPH_LABEL_PREVIEW` characters (see `get_preview`).
+    """
 
     def __init__(self):
         try:
@@ -40,8 +74,34 @@ class GraphNeo4j(Graph):
             user = os.getenv("GRAPH_USERNAME")
             password = os.getenv("GRAPH_PASSWORD")
             bolt_port = os.getenv("GRAPH_BOLT_PORT", 7687)
-            uri = f"bolt://{host}:{bolt_port}"
-            self.driver = GraphDatabase.driver(uri, auth=(user, password))
+            self.uri = f"bolt://{host}:{bolt_port}"
+            self.auth = (user, password)
+            self.find_limit = int(os.getenv("GRAPH_FIND_LIMIT", 10))
+            self.has_fulltext_index: bool | None = None
+            self.triplet_limit = int(os.getenv("GRAPH_TRIPLET_LIMIT", 0))
+            self.triplet_order = os.getenv("GRAPH_TRIPLET_ORDER", "id")
+            self.triplet_seed = int(os.getenv("GRAPH_TRIPLET_SEED", 0))
+            self.label_preview = int(os.getenv("GRAPH_LABEL_PREVIEW", 0))
+            self.bulk_batch_size = int(os.getenv("GRAPH_BULK_BATCH_SIZE", 5000))
+            self.driver_config = {
+                "max_connection_pool_size": int(
+                    os.getenv("GRAPH_MAX_CONNECTIONS", 100)
+                ),
+                "connection_acquisition_timeout": float(
+                    os.getenv("GRAPH_CONNECTION_ACQUISITION_TIMEOUT", 60)
+                ),
+                "fetch_size": int(os.getenv("GRAPH_FETCH_SIZE", 1000)),
+            }
+            self.driver = GraphDatabase.driver(
+                self.uri, auth=self.auth, **self.driver_config
+            )
+            self.local = threading.local()
+            self.async_drivers = LoopResource(
+                lambda: AsyncGraphDatabase.driver(
+                    self.uri, auth=self.auth, **self.driver_config
+                ),
+                lambda driver: driver.close(),
+            )
         except Exception as e:
             raise GraphException(e)
 
@@ -53,11 +113,21 @@ class GraphNeo4j(Graph):
         except Exception as e:
             raise GraphException(e)
 
+    async def aclose(self):
+        """Close the async Neo4j driver of the running loop, if one was created by
+        the async ops. Drivers of loops ended by `asyncio.run` are closed with
+        their loop.
+        """
+        try:
+            await self.async_drivers.aclose()
+        except Exception as e:
+            raise GraphException(e)
+
     def run_query(
         self, mode: Literal["read", "write", "admin"], query: str, key=None, **kwargs
     ):
         try:
-            with self.driver.session() as session:
+            with self.session() as session:
                 if mode == "admin":
                     return session.run(query, **kwargs).data()
                 execute = (
@@ -68,6 +138,53 @@ class GraphNeo4j(Graph):
         except Exception as e:
             raise GraphException(e)
 
+    def stream_query(
+        self, mode: Literal["read", "write", "admin"], query: str, key=None, **kwargs
+    ) -> Iterator:
+        """Streaming variant of `run_query`, which yields records one by one
+        instead of materializing all of them. Records are pulled from the server
+        in batches of `GRAPH_FETCH_SIZE` as the iterator is consumed, and
+        stopping early discards the rest. Uses a session of its own, so other
+        queries can run while the iterator is open.
+        """
+        try:
+            with self.driver.session() as session:
+                if mode == "admin":
+                    results = session.run(query, **kwargs)
+                    for record in results:
+                        yield record.data() if key is None else record[key]
+                    return
+                with session.begin_transaction() as tx:
+                    for record in tx.run(query, **kwargs):
+                        yield record.data() if key is None else record[key]
+                    if mode == "write":
+                        tx.commit()
+        except Exception as e:
+            raise GraphException(e)
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """Shares one session between all queries of the calling thread until
+        the block is left, e.g. the lookups of one ToG depth:
+        ```
+        with graph.session():
+            graph.get_relationships_many(entities)
+            graph.get_triplets_many(tuples)
+        ```
+        Nested blocks reuse the outer session. Outside of a block every query
+        opens its own session.
+        """
+        session = getattr(self.local, "session", None)
+        if session is not None:
+            yield session
+            return
+        with self.driver.session() as session:
+            self.local.session = session
+            try:
+                yield session
+            finally:
+                self.local.session = None
+
     @staticmethod
     def _run_tx(tx: Transaction, query: str, key: str | None, **kwargs):
         try:
@@ -79,11 +196,44 @@ class GraphNeo4j(Graph):
         except Exception as e:
             raise GraphException(e)
 
+    def get_async_driver(self):
+        """Returns the async driver, which is created on first use. Its
+        connections are bound to the event loop, so every loop the async ops
+        are used from (e.g. several `asyncio.run`) gets its own driver, which
+        is closed when the loop shuts down (see `LoopResource`).
+        """
+        return self.async_drivers.get()
+
+    async def arun_query(
+        self, mode: Literal["read", "write", "admin"], query: str, key=None, **kwargs
+    ):
+        try:
+            async with self.get_async_driver().session() as session:
+                if mode == "admin":
+                    return await (await session.run(query, **kwargs)).data()
+                execute = (
+                    session.execute_read if mode == "read" else session.execute_write
+                )
+                return await execute(self._arun_tx, query, key, **kwargs)
+        except Exception as e:
+            raise GraphException(e)
+
+    @staticmethod
+    async def _arun_tx(
+        tx: AsyncManagedTransaction, query: str, key: str | None, **kwargs
+    ):
+        try:
+            results = await tx.run(query, **kwargs)
+            return [
+                record.data() if key is None else record.data()[key]
+                async for record in results
+            ]
+        except Exception as e:
+            raise GraphException(e)
+
     def format_labels(self, labels: List[str]):
-        if not labels:
-            return ":NODE"
-        result = ""
-        for label in labels:
+        result = ":NODE"
+        for label in labels or []:
             if self.check_label(label):
                 result += ":" + label
         return result
@@ -96,6 +246,18 @@ class GraphNeo4j(Graph):
             )
         return True
 
+    def ensure_schema(self):
+        """Adds the common `:NODE` label to all entities and creates the uuid
+        uniqueness constraint and the label index. Safe to run repeatedly, e.g.
+        before every import or generation of the graph.
+        """
+        try:
+            for query in queries.schema:
+                self.run_query("admin", query)
+            self.has_fulltext_index = None
+        except Exception as e:
+            raise GraphException(e)
+
     def export_graphml(self, filename: str) -> bool:
         try:
             return self.run_query(
@@ -112,6 +274,212 @@ class GraphNeo4j(Graph):
         except Exception as e:
             raise GraphException(e)
 
+    def export_snapshot(self, path: str) -> Dict[str, int]:
+        """Writes the `:NODE` entities and their relationships as a `MappedGraph`
+        snapshot to `path`, a local path of the client (unlike the GraphML
+        export, which is written by the server).
+        """
+        try:
+            uuids: List[str] = []
+            labels: List[str] = []
+            node_index: Dict[str, int] = {}
+            for result in self.stream_query("read", queries.bulk_labels):
+                node_index[result["uuid"]] = len(uuids)
+                uuids.append(result["uuid"])
+                labels.append(result["label"] or "")
+            type_index: Dict[str, int] = {}
+            edges = []
+            for result in self.stream_query("read", queries.snapshot_edges):
+                rel_type = type_index.setdefault(result["type"], len(type_index))
+                edges.append(
+                    (node_index[result["head"]], rel_type, node_index[result["tail"]])
+                )
+            return MappedGraph.write(path, uuids, labels, list(type_index), edges)
+        except Exception as e:
+            raise GraphException(e)
+
+    def import_snapshot(self, path: str, batch_size: int = None) -> Dict[str, int]:
+        """Imports a `MappedGraph` snapshot at the local path `path`, in write
+        transactions of `batch_size` rows (defaults to `GRAPH_BULK_BATCH_SIZE`).
+        Entities are merged by uuid and relationships by their ends and type,
+        so an interrupted import can be repeated. Run `ensure_schema` first,
+        the uuid constraint serves the merges.
+        """
+        try:
+            batch_size = batch_size or self.bulk_batch_size
+            with MappedGraph(path) as snapshot:
+                uuids = snapshot.uuids.decode()
+                labels = snapshot.labels.decode()
+                rel_types = snapshot.rel_types.decode()
+                pairs: Dict[int, List[List[str]]] = {}
+                for head, rel_type, tail in snapshot.iter_edges():
+                    pairs.setdefault(rel_type, []).append([uuids[head], uuids[tail]])
+            # entities first, then the edges grouped by type, which is part of
+            # the query, so that the merges need no apoc procedure
+            batches = [
+                (
+                    queries.bulk_nodes,
+                    "nodes",
+                    [
+                        {"uuid": uuid, "label": label}
+                        for uuid, label in zip(uuids, labels)
+                    ],
+                )
+            ]
+            for rel_type, edges in pairs.items():
+                self.check_label(rel_types[rel_type])
+                query = queries.import_snapshot_edges.format(
+                    rel_type=rel_types[rel_type]
+                )
+                batches.append((query, "edges", edges))
+
+            stats = {"nodes": 0, "edges": 0, "transactions": 0}
+            with self.session():
+                for query, key, rows in batches:
+                    for start in range(0, len(rows), batch_size):
+                        batch = rows[start : start + batch_size]
+                        self.run_query("write", query, **{key: batch})
+                        stats[key] += len(batch)
+                        stats["transactions"] += 1
+            return stats
+        except Exception as e:
+            raise GraphException(e)
+
+    def clear(self):
+        """Deletes all entities and relationships of the database."""
+        try:
+            self.run_query("admin", queries.clear)
+        except Exception as e:
+            raise GraphException(e)
+
+    # ---------------------------------------------------------------------------- #
+    #                                    PARSING                                   #
+    # ---------------------------------------------------------------------------- #
+
+    @staticmethod
+    def to_entities(results: List[dict]) -> List[Entity]:
+        return [
+            Entity(
+                uuid=result["entity"]["uuid"],
+                label=result["entity"]["label"],
+                score=result.get("score"),
+            )
+            for result in results
+        ]
+
+    @staticmethod
+    def to_triplet(result: dict) -> Tuple[Entity, Relationship, Entity]:
+        return (
+            Entity(uuid=result["head"]["uuid"], label=result["head"]["label"]),
+            Relationship(type=result["relationship"]),
+            Entity(uuid=result["tail"]["uuid"], label=result["tail"]["label"]),
+        )
+
+    @staticmethod
+    def to_relationships_many(
+        results: List[dict], entities: List[Entity]
+    ) -> List[List[Relationship]]:
+        by_uuid = {result["uuid"]: result["relationships"] for result in results}
+        return [
+            [Relationship(type=rel_type) for rel_type in by_uuid.get(entity.uuid, [])]
+            for entity in entities
+        ]
+
+    def to_triplets_many(
+        self, results: List[dict], tuples: List[Tuple[Entity, Relationship]]
+    ) -> List[List[Tuple[Entity, Relationship, Entity]]]:
+        by_pair = {}
+        for result in results:
+            by_pair.setdefault((result["uuid"], result["rel_type"]), []).append(
+                self.to_triplet(result)
+            )
+        return [
+            by_pair.get((entity.uuid, relationship.type), [])
+            for entity, relationship in tuples
+        ]
+
+    @staticmethod
+    def to_counts(
+        results: List[dict], tuples: List[Tuple[Entity, Relationship]]
+    ) -> List[int]:
+        by_pair = {
+            (result["uuid"], result["rel_type"]): result["count"] for result in results
+        }
+        return [
+            by_pair.get((entity.uuid, relationship.type), 0)
+            for entity, relationship in tuples
+        ]
+
+    @staticmethod
+    def to_pairs(tuples: List[Tuple[Entity, Relationship]]) -> List[List[str]]:
+        pairs = sorted(
+            {(entity.uuid, relationship.type) for entity, relationship in tuples}
+        )
+        return [list(pair) for pair in pairs]
+
+    @staticmethod
+    def relationship_filter_params(**kwargs) -> dict:
+        """Returns the parameters of the relationship queries for the
+        `relationship_filter` keyword argument (see `RelationshipFilter`).
+        Relationship types have no datatype, so `excluded_datatypes` is ignored.
+        """
+        spec = kwargs.get("relationship_filter") or {}
+        return {
+            "excluded_ids": list(spec.get("excluded_ids", [])),
+            "excluded_suffixes": list(spec.get("excluded_suffixes", [])),
+            "excluded_labels": list(spec.get("excluded_labels", [])),
+            "excluded_substrings": list(spec.get("excluded_substrings", [])),
+        }
+
+    def get_preview(self, **kwargs) -> int | None:
+        """Returns the length entity labels are truncated to, or `None` to keep
+        them whole. Set with the `preview` keyword argument, which defaults to
+        `GRAPH_LABEL_PREVIEW` (`0` keeps labels whole).
+        """
+        return kwargs.get("preview", self.label_preview) or None
+
+    def page_query(self, query: str, **kwargs) -> Tuple[str, dict]:
+        """Returns a triplet query with its page clause and parameters. The page
+        is selected with the keyword arguments
+        - `limit`: max. triplets per entity and relationship, `0` for all
+          (defaults to `GRAPH_TRIPLET_LIMIT`)
+        - `offset`: triplets to skip, to fetch the following pages
+        - `order`: `id` to page through neighbors in uuid order or `sample` for a
+          reproducible random sample (defaults to `GRAPH_TRIPLET_ORDER`)
+        - `seed`: the seed of the sample (defaults to `GRAPH_TRIPLET_SEED`)
+
+        The parameters include the label `preview` (see `get_preview`).
+        """
+        limit = kwargs.get("limit", self.triplet_limit)
+        if not limit:
+            return query.format(page=""), {"preview": self.get_preview(**kwargs)}
+        order = kwargs.get("order", self.triplet_order)
+        if order not in ["id", "sample"]:
+            raise ValueError(f"Unknown triplet order: {order}")
+        page = queries.page_by_sample if order == "sample" else queries.page_by_uuid
+        return query.format(page=page), {
+            "limit": limit,
+            "offset": kwargs.get("offset", 0),
+            "seed": str(kwargs.get("seed", self.triplet_seed)),
+            "preview": self.get_preview(**kwargs),
+        }
+
+    def find_query(self, data_list: List[str], **kwargs) -> Tuple[str, dict]:
+        """Returns the query and parameters of `find`, depending on whether the
+        full-text index is online (see `check_fulltext_index`).
+        """
+        labels = self.format_labels(kwargs.get("labels"))
+        if not self.has_fulltext_index:
+            return queries.find.format(labels=labels), {
+                "data_list": data_list,
+                "preview": self.get_preview(**kwargs),
+            }
+        return queries.find_fulltext.format(labels=labels), {
+            "data_list": [self.escape_lucene(data) for data in data_list if data],
+            "limit": kwargs.get("limit", self.find_limit),
+            "preview": self.get_preview(**kwargs),
+        }
+
     # ---------------------------------------------------------------------------- #
     #                                    ToG OPS                                   #
     # ---------------------------------------------------------------------------- #
@@ -124,11 +492,9 @@ class GraphNeo4j(Graph):
                 "read",
                 queries.get_entities,
                 data_list=entities,
+                preview=self.get_preview(**kwargs),
             )
-            return [
-                Entity(uuid=result["entity"]["uuid"], label=result["entity"]["label"])
-                for result in results
-            ]
+            return self.to_entities(results)
         except Exception as e:
             raise GraphException(e)
 
@@ -137,49 +503,225 @@ class GraphNeo4j(Graph):
             if not entity:
                 return []
             results = self.run_query(
-                "read", queries.get_relationships.format(uuid=entity.uuid)
+                "read",
+                queries.get_relationships,
+                uuid=entity.uuid,
+                **self.relationship_filter_params(**kwargs),
             )
             return [Relationship(type=result["relationship"]) for result in results]
         except Exception as e:
             raise GraphException(e)
 
+    def get_relationships_many(
+        self, entities: List[Entity], **kwargs
+    ) -> List[List[Relationship]]:
+        try:
+            if not entities:
+                return []
+            results = self.run_query(
+                "read",
+                queries.get_relationships_many,
+                uuids=sorted({entity.uuid for entity in entities}),
+                **self.relationship_filter_params(**kwargs),
+            )
+            return self.to_relationships_many(results, entities)
+        except Exception as e:
+            raise GraphException(e)
+
     def get_triplets(self, entity: Entity, relationship: Relationship, **kwargs):
         try:
             if not entity or not relationship:
                 return []
+            query, page = self.page_query(queries.get_triplets, **kwargs)
             results = self.run_query(
                 "read",
-                queries.get_triplets.format(
-                    uuid=entity.uuid, rel_type=relationship.type
-                ),
+                query,
+                uuid=entity.uuid,
+                rel_type=relationship.type,
+                **page,
             )
-            return [
-                (
-                    Entity(uuid=result["head"]["uuid"], label=result["head"]["label"]),
-                    Relationship(type=result["relationship"]),
-                    Entity(uuid=result["tail"]["uuid"], label=result["tail"]["label"]),
-                )
-                for result in results
-            ]
+            return [self.to_triplet(result) for result in results]
+        except Exception as e:
+            raise GraphException(e)
+
+    def iter_triplets(
+        self, entity: Entity, relationship: Relationship, **kwargs
+    ) -> Iterator[Tuple[Entity, Relationship, Entity]]:
+        """Streaming variant of `get_triplets`, e.g. to scan all triplets of a
+        hub entity with `limit=0` without holding them in memory.
+        """
+        if not entity or not relationship:
+            return
+        query, page = self.page_query(queries.get_triplets, **kwargs)
+        for result in self.stream_query(
+            "read", query, uuid=entity.uuid, rel_type=relationship.type, **page
+        ):
+            yield self.to_triplet(result)
+
+    def get_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[List[Tuple[Entity, Relationship, Entity]]]:
+        try:
+            if not tuples:
+                return []
+            query, page = self.page_query(queries.get_triplets_many, **kwargs)
+            results = self.run_query("read", query, pairs=self.to_pairs(tuples), **page)
+            return self.to_triplets_many(results, tuples)
+        except Exception as e:
+            raise GraphException(e)
+
+    def count_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[int]:
+        try:
+            if not tuples:
+                return []
+            results = self.run_query(
+                "read", queries.count_triplets_many, pairs=self.to_pairs(tuples)
+            )
+            return self.to_counts(results, tuples)
         except Exception as e:
             raise GraphException(e)
 
     def find(self, data_list, **kwargs) -> List[Entity]:
+        """Links query strings to entities through the full-text index on entity
+        labels. Entities are ordered by relevance and carry their `score`. At
+        most `limit` entities are matched per query string. Falls back to
+        scanning all node properties if the index does not exist.
+        """
         try:
             if not data_list:
                 return []
-            results = self.run_query(
+            self.check_fulltext_index()
+            query, params = self.find_query(data_list, **kwargs)
+            return self.to_entities(self.run_query("read", query, **params))
+        except Exception as e:
+            raise GraphException(e)
+
+    # ---------------------------------------------------------------------------- #
+    #                                 ASYNC ToG OPS                                #
+    # ---------------------------------------------------------------------------- #
+
+    async def aget_entities(self, entities, **kwargs) -> List[Entity]:
+        try:
+            if not entities:
+                return []
+            results = await self.arun_query(
                 "read",
-                queries.find.format(labels=self.format_labels(kwargs.get("labels"))),
-                data_list=data_list,
+                queries.get_entities,
+                data_list=entities,
+                preview=self.get_preview(**kwargs),
             )
-            return [
-                Entity(uuid=result["entity"]["uuid"], label=result["entity"]["label"])
-                for result in results
-            ]
+            return self.to_entities(results)
+        except Exception as e:
+            raise GraphException(e)
+
+    async def aget_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
+        try:
+            if not entity:
+                return []
+            results = await self.arun_query(
+                "read",
+                queries.get_relationships,
+                uuid=entity.uuid,
+                **self.relationship_filter_params(**kwargs),
+            )
+            return [Relationship(type=result["relationship"]) for result in results]
+        except Exception as e:
+            raise GraphException(e)
+
+    async def aget_relationships_many(
+        self, entities: List[Entity], **kwargs
+    ) -> List[List[Relationship]]:
+        try:
+            if not entities:
+                return []
+            results = await self.arun_query(
+                "read",
+                queries.get_relationships_many,
+                uuids=sorted({entity.uuid for entity in entities}),
+                **self.relationship_filter_params(**kwargs),
+            )
+            return self.to_relationships_many(results, entities)
         except Exception as e:
             raise GraphException(e)
 
+    async def aget_triplets(self, entity: Entity, relationship: Relationship, **kwargs):
+        try:
+            if not entity or not relationship:
+                return []
+            query, page = self.page_query(queries.get_triplets, **kwargs)
+            results = await self.arun_query(
+                "read",
+                query,
+                uuid=entity.uuid,
+                rel_type=relationship.type,
+                **page,
+            )
+            return [self.to_triplet(result) for result in results]
+        except Exception as e:
+            raise GraphException(e)
+
+    async def aget_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[List[Tuple[Entity, Relationship, Entity]]]:
+        try:
+            if not tuples:
+                return []
+            query, page = self.page_query(queries.get_triplets_many, **kwargs)
+            results = await self.arun_query(
+                "read", query, pairs=self.to_pairs(tuples), **page
+            )
+            return self.to_triplets_many(results, tuples)
+        except Exception as e:
+            raise GraphException(e)
+
+    async def acount_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[int]:
+        try:
+            if not tuples:
+                return []
+            results = await self.arun_query(
+                "read", queries.count_triplets_many, pairs=self.to_pairs(tuples)
+            )
+            return self.to_counts(results, tuples)
+        except Exception as e:
+            raise GraphException(e)
+
+    async def afind(self, data_list, **kwargs) -> List[Entity]:
+        try:
+            if not data_list:
+                return []
+            if self.has_fulltext_index is None:
+                self.has_fulltext_index = (
+                    await self.arun_query(
+                        "read", queries.has_fulltext_index, key="is_online"
+                    )
+                )[0]
+            query, params = self.find_query(data_list, **kwargs)
+            return self.to_entities(await self.arun_query("read", query, **params))
+        except Exception as e:
+            raise GraphException(e)
+
+    def check_fulltext_index(self) -> bool:
+        """Returns whether the full-text index used by `find` is online. The
+        result is cached until the next call of `ensure_schema`.
+        """
+        if self.has_fulltext_index is None:
+            self.has_fulltext_index = self.run_query(
+                "read", queries.has_fulltext_index, key="is_online"
+            )[0]
+        return self.has_fulltext_index
+
+    @staticmethod
+    def escape_lucene(data: str) -> str:
+        """Escapes characters with a special meaning in the Lucene query syntax,
+        so that query strings are matched as plain text. Lowercasing disables
+        the AND/OR/NOT operators, the index analyzer is case-insensitive anyway.
+        """
+        return re.sub(r'([+\-!(){}\[\]^"~*?:\\/&|])', r"\\\1", data.lower())
+
     # ---------------------------------------------------------------------------- #
     #                                GRAPH CRUD OPS                                #
     # ---------------------------------------------------------------------------- #
@@ -221,15 +763,115 @@ class GraphNeo4j(Graph):
         except Exception as e:
             raise GraphException(e)
 
+    def bulk_loader(self, batch_size: int = None, preload: bool = True):
+        """Returns a `BulkLoader`, which writes entities and links in batched
+        transactions of `batch_size` rows (defaults to `GRAPH_BULK_BATCH_SIZE`).
+        """
+        try:
+            return BulkLoader(self, batch_size or self.bulk_batch_size, preload)
+        except Exception as e:
+            raise GraphException(e)
+
     def unlink(self, triplet: Tuple[str, str, str], **kwargs):
         try:
             return self.run_query(
                 "write",
-                queries.unlink.format(
-                    head_uuid=triplet[0],
-                    rel_type=triplet[1],
-                    tail_uuid=triplet[2],
-                ),
+                queries.unlink,
+                head_uuid=triplet[0],
+                rel_type=triplet[1],
+                tail_uuid=triplet[2],
             )
         except Exception as e:
             raise GraphException(e)
+
+
+class BulkLoader:
+    """Collects the entities and links of a graph in memory and writes them in
+    batched transactions, instead of one transaction per `create` and `link`
+    call, e.g. while generating a graph:
+    ```
+    with graph.bulk_loader() as loader:
+        event, url = loader.create(["Event", "https://..."])
+        loader.link([(event.uuid, "HAT_URL", url.uuid)])
+    ```
+    Entities get their uuid right away, so they can be linked before they are
+    written. Like `GraphNeo4j.create`, entities are merged by label: with
+    `preload`, the labels of the entities already in the graph are loaded once,
+    and an entity with a known label reuses its uuid. Pending entities and
+    links are written once they reach `batch_size` and when the block is left.
+    A loader is not thread safe.
+    """
+
+    def __init__(self, graph: GraphNeo4j, batch_size: int, preload: bool = True):
+        self.graph = graph
+        self.batch_size = batch_size
+        self.uuids: Dict[str, str] = {}
+        if preload:
+            for result in graph.stream_query("read", queries.bulk_labels):
+                self.uuids.setdefault(result["label"], result["uuid"])
+        self.nodes: List[dict] = []
+        self.edges: Dict[Tuple[str, str, str], None] = {}
+        self.stats = {"nodes": 0, "edges": 0, "transactions": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.flush()
+
+    def create(self, data_list: List[str]) -> List[Entity]:
+        """Returns an entity for each label in `data_list`, in the same order."""
+        try:
+            entities = []
+            for data in data_list:
+                uuid = self.uuids.get(data)
+                if uuid is None:
+                    uuid = self.uuids[data] = str(uuid4())
+                    self.nodes.append({"uuid": uuid, "label": data})
+                entities.append(Entity(uuid=uuid, label=data))
+            self.flush_if_full()
+            return entities
+        except Exception as e:
+            raise GraphException(e)
+
+    def link(self, triplets: List[Tuple[str, str, str]]):
+        """Adds links given as `(head_uuid, rel_type, tail_uuid)`."""
+        try:
+            for head, rel_type, tail in triplets:
+                self.graph.check_label(rel_type)
+                self.edges[(head, rel_type, tail)] = None
+            self.flush_if_full()
+        except Exception as e:
+            raise GraphException(e)
+
+    def flush_if_full(self):
+        if len(self.nodes) + len(self.edges) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the pending entities and then the pending links in one
+        transaction, in `UNWIND` batches of `batch_size` rows.
+        """
+        try:
+            if not self.nodes and not self.edges:
+                return
+            edges = [list(edge) for edge in self.edges]
+            with self.graph.session() as session:
+                session.execute_write(self._write_tx, self.nodes, edges)
+            self.stats["nodes"] += len(self.nodes)
+            self.stats["edges"] += len(edges)
+            self.stats["transactions"] += 1
+            self.nodes = []
+            self.edges = {}
+        except Exception as e:
+            raise GraphException(e)
+
+    def _write_tx(self, tx: Transaction, nodes: List[dict], edges: List[list]):
+        for start in range(0, len(nodes), self.batch_size):
+            tx.run(
+                queries.bulk_nodes, nodes=nodes[start : start + self.batch_size]
+            ).consume()
+        for start in range(0, len(edges), self.batch_size):
+            tx.run(
+                queries.bulk_edges, edges=edges[start : start + self.batch_size]
+            ).consume()
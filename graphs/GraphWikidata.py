@@ -4,11 +4,20 @@ from .Graph import (
     Relationship as AbstractRelationship,
 )
 import graphs.queries.SPARQL as queries
-from SPARQLWrapper import SPARQLWrapper
 from errors import GraphException
-from typing import List, Tuple
+from cache import LRUCache, SQLiteCache
+from ratelimit import TokenBucket
+from loops import LoopResource
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Tuple
 from dotenv import load_dotenv
+import asyncio
+import httpx
+import json
 import os
+import random
+import threading
+import time
 
 
 class Entity(AbstractEntity):
@@ -17,6 +26,9 @@ class Entity(AbstractEntity):
         self.qid = qid
         self.value = value
 
+    def get_id(self):
+        return self.qid
+
     def get_label(self):
         return self.value
 
@@ -27,122 +39,700 @@ class Relationship(AbstractRelationship):
         self.pid = pid
         self.value = value
 
+    def get_id(self):
+        return self.pid
+
     def get_label(self):
         return self.value
 
 
 class GraphWikidata(Graph):
+    """A graph backed by a public SPARQL endpoint, e.g. the Wikidata Query
+    Service configured with `GRAPH_URL`.
+
+    Requests are sent over pooled keep-alive HTTP clients, so one instance can
+    be shared by several threads and coroutines. All instances querying the
+    same endpoint share one token bucket of `GRAPH_HTTP_RATE` requests per
+    second (bursts of `GRAPH_HTTP_BURST`). Rate limited (429) and unavailable
+    (5xx) responses as well as connection errors are retried up to
+    `GRAPH_HTTP_RETRIES` times with jittered exponential backoff, honoring
+    `Retry-After`. Queries time out after `GRAPH_HTTP_TIMEOUT` seconds, which
+    matches the 60s limit of the Wikidata Query Service.
+
+    Triplet lookups can be capped to `GRAPH_TRIPLET_LIMIT` triplets per entity
+    and relationship, so that hub entities do not flood memory and prompts (see
+    `neighbors_query`). The cap is off by default, as it changes the candidates
+    the methods see.
+
+    Queries do not use the label service. English labels are resolved from a
+    local label store instead, which is persisted at `GRAPH_LABEL_PATH` and
+    shared across runs (see `get_labels`).
+    """
+
+    ENTITY_URL = "http://www.wikidata.org/entity/"
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+    limiters: Dict[str, TokenBucket] = {}
+    limiters_lock = threading.Lock()
 
     def __init__(self):
         try:
             load_dotenv()
             self.url = os.getenv("GRAPH_URL")
             self.user_agent = os.getenv("GRAPH_USER_AGENT")
-            self.sparql = SPARQLWrapper(self.url, agent=self.user_agent)
-            self.sparql.setReturnFormat("json")
+            self.cache_mode = os.getenv("GRAPH_CACHE_MODE", "off")
+            if self.cache_mode not in ["off", "read-through", "offline"]:
+                raise ValueError(f"Unknown cache mode: {self.cache_mode}")
+            self.cache = (
+                SQLiteCache(
+                    os.getenv("GRAPH_CACHE_PATH", "./wikidata_cache.sqlite"),
+                    ttl=float(os.getenv("GRAPH_CACHE_TTL", 0)),
+                    max_bytes=int(float(os.getenv("GRAPH_CACHE_MAX_MB", 0)) * 2**20),
+                )
+                if self.cache_mode != "off"
+                else None
+            )
+            self.http_max_connections = int(os.getenv("GRAPH_HTTP_MAX_CONNECTIONS", 10))
+            self.http_timeout = float(os.getenv("GRAPH_HTTP_TIMEOUT", 60))
+            self.http_retries = int(os.getenv("GRAPH_HTTP_RETRIES", 5))
+            self.http_backoff = float(os.getenv("GRAPH_HTTP_BACKOFF", 1))
+            self.triplet_limit = int(os.getenv("GRAPH_TRIPLET_LIMIT", 0))
+            self.triplet_order = os.getenv("GRAPH_TRIPLET_ORDER", "id")
+            self.triplet_seed = int(os.getenv("GRAPH_TRIPLET_SEED", 0))
+            label_path = os.getenv("GRAPH_LABEL_PATH", "./wikidata_labels.sqlite")
+            self.label_store = (
+                SQLiteCache(label_path, ttl=float(os.getenv("GRAPH_LABEL_TTL", 0)))
+                if label_path
+                else None
+            )
+            self.label_memory = LRUCache(
+                maxsize=int(os.getenv("GRAPH_LABEL_MEMORY_SIZE", 100000))
+            )
+            self.label_batch_size = int(os.getenv("GRAPH_LABEL_BATCH_SIZE", 500))
+            self.limiter = self.get_limiter(
+                self.url,
+                rate=float(os.getenv("GRAPH_HTTP_RATE", 5)),
+                burst=int(os.getenv("GRAPH_HTTP_BURST", 5)),
+            )
+            self.client = httpx.Client(**self.client_config())
+            self.async_clients = LoopResource(
+                lambda: httpx.AsyncClient(**self.client_config()),
+                lambda client: client.aclose(),
+            )
+        except Exception as e:
+            raise GraphException(e)
+
+    def close(self):
+        """Close the HTTP client. Run this after you are done using an instance of this class."""
+        try:
+            self.client.close()
+        except Exception as e:
+            raise GraphException(e)
+
+    async def aclose(self):
+        """Close the async HTTP client of the running loop, if one was created by
+        the async ops. Clients of loops ended by `asyncio.run` are closed with
+        their loop.
+        """
+        try:
+            await self.async_clients.aclose()
         except Exception as e:
             raise GraphException(e)
 
     def query(self, query: str) -> dict:
         """Executes a SPARQL query string and returns results.
         Results in JSON format by default.
+        Responses are cached on disk depending on `GRAPH_CACHE_MODE`:
+        - `off`: no caching
+        - `read-through`: cached responses are used and misses are fetched and stored
+        - `offline`: only cached responses are used, a miss raises a `GraphException`
         """
         try:
-            self.sparql.setQuery(query)
-            response = self.sparql.query().convert()
-            return response
+            key, cached = self.cache_lookup(query)
+            if cached is not None:
+                return cached
+            for attempt in range(self.http_retries + 1):
+                time.sleep(self.limiter.reserve())
+                try:
+                    response = self.client.post(self.url, data={"query": query})
+                except self.RETRY_ERRORS:
+                    if attempt == self.http_retries:
+                        raise
+                    time.sleep(self.retry_delay(None, attempt))
+                    continue
+                if (
+                    response.status_code not in self.RETRY_STATUS
+                    or attempt == self.http_retries
+                ):
+                    break
+                time.sleep(self.retry_delay(response, attempt))
+            response.raise_for_status()
+            result = response.json()
+            self.cache_store(key, result)
+            return result
         except Exception as e:
             raise GraphException(e)
 
+    async def aquery(self, query: str) -> dict:
+        """Async version of `query`, sharing its rate limit and retries."""
+        try:
+            key, cached = await asyncio.to_thread(self.cache_lookup, query)
+            if cached is not None:
+                return cached
+            client = self.get_async_client()
+            for attempt in range(self.http_retries + 1):
+                await asyncio.sleep(self.limiter.reserve())
+                try:
+                    response = await client.post(self.url, data={"query": query})
+                except self.RETRY_ERRORS:
+                    if attempt == self.http_retries:
+                        raise
+                    await asyncio.sleep(self.retry_delay(None, attempt))
+                    continue
+                if (
+                    response.status_code not in self.RETRY_STATUS
+                    or attempt == self.http_retries
+                ):
+                    break
+                await asyncio.sleep(self.retry_delay(response, attempt))
+            response.raise_for_status()
+            result = response.json()
+            await asyncio.to_thread(self.cache_store, key, result)
+            return result
+        except Exception as e:
+            raise GraphException(e)
+
+    # ---------------------------------------------------------------------------- #
+    #                                     HTTP                                     #
+    # ---------------------------------------------------------------------------- #
+
+    @classmethod
+    def get_limiter(cls, url: str, rate: float, burst: int) -> TokenBucket:
+        """Returns the token bucket shared by all instances querying `url`."""
+        with cls.limiters_lock:
+            if url not in cls.limiters:
+                cls.limiters[url] = TokenBucket(rate=rate, burst=burst)
+            return cls.limiters[url]
+
+    def client_config(self) -> dict:
+        return {
+            "headers": {
+                "User-Agent": self.user_agent or "",
+                "Accept": "application/sparql-results+json",
+            },
+            "limits": httpx.Limits(
+                max_connections=self.http_max_connections,
+                max_keepalive_connections=self.http_max_connections,
+            ),
+            "timeout": self.http_timeout,
+        }
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Returns the async HTTP client, which is created on first use. Its
+        connections are bound to the event loop, so every loop the async ops
+        are used from (e.g. several `asyncio.run`) gets its own client, which
+        is closed when the loop shuts down (see `LoopResource`).
+        """
+        return self.async_clients.get()
+
+    def retry_delay(self, response: httpx.Response | None, attempt: int) -> float:
+        """Returns the seconds to wait before retrying a failed request. A
+        `Retry-After` header is honored and pauses all requests to the
+        endpoint, otherwise the delay is drawn from a jittered exponential
+        backoff.
+        """
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after:
+            try:
+                seconds = float(retry_after)
+            except ValueError:
+                seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            seconds = max(seconds, 0)
+            self.limiter.pause(seconds)
+            return seconds
+        return random.uniform(0, self.http_backoff * 2**attempt)
+
+    def cache_lookup(self, query: str) -> Tuple[str | None, dict | None]:
+        """Returns the cache key of a query and the cached response, if any."""
+        if not self.cache:
+            return None, None
+        key = SQLiteCache.hash_key(self.url, query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return key, json.loads(cached)
+        if self.cache_mode == "offline":
+            raise GraphException(f"Cache miss in offline mode for: {query}")
+        return key, None
+
+    def cache_store(self, key: str | None, response: dict):
+        if self.cache:
+            self.cache.set(key, json.dumps(response))
+
+    # ---------------------------------------------------------------------------- #
+    #                                    LABELS                                    #
+    # ---------------------------------------------------------------------------- #
+
+    def get_labels(self, ids: List[str]) -> Dict[str, str]:
+        """Returns the english labels of the given QIDs and PIDs. Labels are
+        looked up in memory, then in the label store, and only the remaining
+        IDs are fetched, in batches of `GRAPH_LABEL_BATCH_SIZE`. IDs without an
+        english label are labeled with the ID, like the label service does.
+        IDs the endpoint does not know are left out.
+        """
+        labels, missing = self.lookup_labels(ids)
+        for start in range(0, len(missing), self.label_batch_size):
+            batch = missing[start : start + self.label_batch_size]
+            response = self.query(self.labels_query(batch))
+            labels.update(self.store_labels(batch, response))
+        return labels
+
+    async def aget_labels(self, ids: List[str]) -> Dict[str, str]:
+        """Async version of `get_labels`, fetching the batches concurrently."""
+        labels, missing = await asyncio.to_thread(self.lookup_labels, ids)
+        batches = [
+            missing[start : start + self.label_batch_size]
+            for start in range(0, len(missing), self.label_batch_size)
+        ]
+        responses = await asyncio.gather(
+            *[self.aquery(self.labels_query(batch)) for batch in batches]
+        )
+        for batch, response in zip(batches, responses):
+            labels.update(await asyncio.to_thread(self.store_labels, batch, response))
+        return labels
+
+    def lookup_labels(self, ids: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        """Returns the known labels of `ids` and the IDs that are missing."""
+        labels = {}
+        for item in ids:
+            label = self.label_memory.get(item)
+            if label is not LRUCache.MISSING:
+                labels[item] = label
+        missing = sorted({item for item in ids if item not in labels})
+        if missing and self.label_store:
+            stored = self.label_store.get_many(missing)
+            for item, label in stored.items():
+                self.label_memory.set(item, label)
+            labels.update(stored)
+            missing = [item for item in missing if item not in stored]
+        return labels, missing
+
+    def store_labels(self, ids: List[str], response: dict) -> Dict[str, str]:
+        """Stores the labels of `ids` from a response of the `labels` query.
+        Unknown IDs are not stored, so they are asked for again.
+        """
+        labels = {}
+        for entry in response["results"]["bindings"]:
+            item = self.url2id(entry["item"]["value"])
+            labels[item] = entry.get("itemLabel", {}).get("value", item)
+        for item, label in labels.items():
+            self.label_memory.set(item, label)
+        if self.label_store:
+            self.label_store.set_many(labels)
+        return labels
+
+    def response_ids(self, response: dict, names: List[str]) -> List[str]:
+        """Returns the QIDs and PIDs bound to the variables `names`, which are the
+        ones to label. Literals (e.g. dates) are their own label.
+        """
+        ids = set()
+        for entry in response["results"]["bindings"]:
+            for name in names:
+                if name in entry and entry[name]["value"].startswith(self.ENTITY_URL):
+                    ids.add(self.url2id(entry[name]["value"]))
+        return sorted(ids)
+
+    # ---------------------------------------------------------------------------- #
+    #                                    PARSING                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def to_entity(self, entry: dict, name: str, labels: Dict[str, str]) -> Entity:
+        qid = self.url2id(entry[name]["value"])
+        return Entity(qid=qid, value=labels.get(qid, qid))
+
+    def to_relationship(
+        self, entry: dict, name: str, labels: Dict[str, str]
+    ) -> Relationship:
+        pid = self.url2id(entry[name]["value"])
+        return Relationship(pid=pid, value=labels.get(pid, pid))
+
+    def to_triplet(
+        self, entry: dict, labels: Dict[str, str]
+    ) -> Tuple[Entity, Relationship, Entity]:
+        return (
+            self.to_entity(entry, "head", labels),
+            self.to_relationship(entry, "rel", labels),
+            self.to_entity(entry, "tail", labels),
+        )
+
+    def to_relationships_many(
+        self, response: dict, entities: List[Entity], labels: Dict[str, str]
+    ) -> List[List[Relationship]]:
+        by_qid = {}
+        for entry in response["results"]["bindings"]:
+            by_qid.setdefault(self.url2id(entry["entity"]["value"]), []).append(
+                self.to_relationship(entry, "prop", labels)
+            )
+        return [by_qid.get(entity.qid, []) for entity in entities]
+
+    def to_triplets_many(
+        self,
+        response: dict,
+        tuples: List[Tuple[Entity, Relationship]],
+        labels: Dict[str, str],
+    ) -> List[List[Tuple[Entity, Relationship, Entity]]]:
+        by_pair = {}
+        for entry in response["results"]["bindings"]:
+            triplet = self.to_triplet(entry, labels)
+            key = (self.url2id(entry["qid"]["value"]), triplet[1].pid)
+            by_pair.setdefault(key, []).append(triplet)
+        return [
+            by_pair.get((entity.qid, relationship.pid), [])
+            for entity, relationship in tuples
+        ]
+
+    def to_counts(
+        self, response: dict, tuples: List[Tuple[Entity, Relationship]]
+    ) -> List[int]:
+        by_pair = {
+            (
+                self.url2id(entry["qid"]["value"]),
+                self.url2id(entry["rel"]["value"]),
+            ): int(entry["count"]["value"])
+            for entry in response["results"]["bindings"]
+        }
+        return [
+            by_pair.get((entity.qid, relationship.pid), 0)
+            for entity, relationship in tuples
+        ]
+
+    def to_found(self, response: dict) -> List[Entity]:
+        best_matches = {}
+        for row in response["results"]["bindings"]:
+            search_name = row["searchString"]["value"]
+            item_uri = row["entity"]["value"]
+            try:
+                q_id_string = self.url2id(item_uri)
+                q_id_val = int(q_id_string.replace("Q", ""))
+            except ValueError:
+                continue
+            if (
+                search_name not in best_matches
+                or q_id_val < best_matches[search_name]["id_val"]
+            ):
+                best_matches[search_name] = {
+                    "id_val": q_id_val,
+                    "qid": q_id_string,
+                    "value": search_name,
+                }
+
+        return [
+            Entity(qid=row["qid"], value=row["value"]) for row in best_matches.values()
+        ]
+
+    @staticmethod
+    def labels_query(ids: List[str]) -> str:
+        return queries.labels.format(ids=" ".join([f"wd:{item}" for item in ids]))
+
+    @staticmethod
+    def relationship_filters(**kwargs) -> str:
+        """Returns the `FILTER` clauses of the relationship queries for the
+        `relationship_filter` keyword argument (see `RelationshipFilter`).
+        Datatypes are given by their local name, e.g. `ExternalId` or `Url`.
+        """
+        spec = kwargs.get("relationship_filter") or {}
+
+        def literal(value: str) -> str:
+            return json.dumps(value, ensure_ascii=False)
+
+        filters = []
+        if spec.get("excluded_ids"):
+            filters.append(
+                queries.filter_ids.format(
+                    ids=", ".join([f"wd:{pid}" for pid in spec["excluded_ids"]])
+                )
+            )
+        if spec.get("excluded_datatypes"):
+            filters.append(
+                queries.filter_datatypes.format(
+                    datatypes=", ".join(
+                        [f"wikibase:{dt}" for dt in spec["excluded_datatypes"]]
+                    )
+                )
+            )
+        conditions = [
+            f"STRENDS(?propFilterLabel, {literal(suffix)})"
+            for suffix in spec.get("excluded_suffixes", [])
+        ]
+        if spec.get("excluded_labels"):
+            labels = ", ".join([literal(label) for label in spec["excluded_labels"]])
+            conditions.append(f"LCASE(STR(?propFilterLabel)) IN ({labels})")
+        conditions += [
+            f"CONTAINS(LCASE(?propFilterLabel), {literal(part)})"
+            for part in spec.get("excluded_substrings", [])
+        ]
+        if conditions:
+            filters.append(
+                queries.filter_labels.format(conditions=" || ".join(conditions))
+            )
+        return "\n  ".join(filters)
+
+    def get_relationships_query(self, entity: Entity, **kwargs) -> str:
+        return queries.get_relationships.format(
+            qid=entity.qid, filters=self.relationship_filters(**kwargs)
+        )
+
+    def get_relationships_many_query(self, entities: List[Entity], **kwargs) -> str:
+        return queries.get_relationships_many.format(
+            qids=" ".join(sorted({f"wd:{entity.qid}" for entity in entities})),
+            filters=self.relationship_filters(**kwargs),
+        )
+
+    @staticmethod
+    def count_triplets_many_query(tuples: List[Tuple[Entity, Relationship]]) -> str:
+        pairs = sorted(
+            {(entity.qid, relationship.pid) for entity, relationship in tuples}
+        )
+        return queries.count_triplets_many.format(
+            neighbors=queries.neighbors.format(
+                pairs=" ".join(
+                    [f"(wd:{qid} wd:{pid} wdt:{pid})" for qid, pid in pairs]
+                ),
+                page="",
+            )
+        )
+
+    def neighbors_query(self, pairs: List[Tuple[str, str]], **kwargs) -> str:
+        """Returns the pattern matching the neighbors of `(qid, pid)` pairs. The
+        neighbors of each pair are paged with the keyword arguments
+        - `limit`: max. triplets per entity and relationship, `0` for all
+          (defaults to `GRAPH_TRIPLET_LIMIT`)
+        - `offset`: triplets to skip, to fetch the following pages
+        - `order`: `id` to page through neighbors in IRI order or `sample` for a
+          reproducible random sample (defaults to `GRAPH_TRIPLET_ORDER`)
+        - `seed`: the seed of the sample (defaults to `GRAPH_TRIPLET_SEED`)
+        """
+
+        def values(pairs: List[Tuple[str, str]]) -> str:
+            return " ".join([f"(wd:{qid} wd:{pid} wdt:{pid})" for qid, pid in pairs])
+
+        limit = int(kwargs.get("limit", self.triplet_limit))
+        if not limit:
+            return queries.neighbors.format(pairs=values(pairs), page="")
+        order = kwargs.get("order", self.triplet_order)
+        if order not in ["id", "sample"]:
+            raise ValueError(f"Unknown triplet order: {order}")
+        page = (
+            queries.page_by_sample if order == "sample" else queries.page_by_id
+        ).format(
+            limit=limit,
+            offset=int(kwargs.get("offset", 0)),
+            seed=int(kwargs.get("seed", self.triplet_seed)),
+        )
+        return "UNION".join(
+            [
+                queries.neighbors.format(pairs=values([pair]), page=page)
+                for pair in pairs
+            ]
+        )
+
+    def get_triplets_query(
+        self, entity: Entity, relationship: Relationship, **kwargs
+    ) -> str:
+        return queries.get_triplets.format(
+            neighbors=self.neighbors_query([(entity.qid, relationship.pid)], **kwargs)
+        )
+
+    def get_triplets_many_query(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> str:
+        pairs = sorted(
+            {(entity.qid, relationship.pid) for entity, relationship in tuples}
+        )
+        return queries.get_triplets_many.format(
+            neighbors=self.neighbors_query(pairs, **kwargs)
+        )
+
+    @staticmethod
+    def find_query(data_list: List[str]) -> str:
+        return queries.find.format(
+            queries=" ".join([f'"{data}"' for data in data_list])
+        )
+
+    # ---------------------------------------------------------------------------- #
+    #                                    ToG OPS                                   #
+    # ---------------------------------------------------------------------------- #
+
     def get_entities(self, entities, **kwargs) -> List[Entity]:
         try:
             if not entities:
                 return []
-            response = self.query(
-                queries.get_entities.format(
-                    qids=" ".join([f"wd:{e}" for e in entities])
-                )
-            )
+            labels = self.get_labels(entities)
             return [
-                Entity(
-                    qid=self.url2id(entry["entity"]["value"]),
-                    value=entry["entityLabel"]["value"],
-                )
-                for entry in response["results"]["bindings"]
+                Entity(qid=qid, value=labels[qid]) for qid in entities if qid in labels
             ]
         except Exception as e:
             raise GraphException(e)
 
     def get_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
         try:
-            response = self.query(queries.get_relationships.format(qid=entity.qid))
+            response = self.query(self.get_relationships_query(entity, **kwargs))
+            labels = self.get_labels(self.response_ids(response, ["prop"]))
             return [
-                Relationship(
-                    pid=self.url2id(entry["prop"]["value"]),
-                    value=entry["propLabel"]["value"],
-                )
+                self.to_relationship(entry, "prop", labels)
                 for entry in response["results"]["bindings"]
             ]
         except Exception as e:
             raise GraphException(e)
 
+    def get_relationships_many(
+        self, entities: List[Entity], **kwargs
+    ) -> List[List[Relationship]]:
+        try:
+            if not entities:
+                return []
+            response = self.query(self.get_relationships_many_query(entities, **kwargs))
+            labels = self.get_labels(self.response_ids(response, ["prop"]))
+            return self.to_relationships_many(response, entities, labels)
+        except Exception as e:
+            raise GraphException(e)
+
     def get_triplets(
         self, entity: Entity, relationship: Relationship, **kwargs
     ) -> List[Tuple[Entity, Relationship, Entity]]:
         try:
             response = self.query(
-                queries.get_triplets.format(qid=entity.qid, pid=relationship.pid)
+                self.get_triplets_query(entity, relationship, **kwargs)
+            )
+            labels = self.get_labels(
+                self.response_ids(response, ["head", "rel", "tail"])
             )
             return [
-                (
-                    Entity(
-                        qid=self.url2id(entry["head"]["value"]),
-                        value=entry["headLabel"]["value"],
-                    ),
-                    Relationship(
-                        pid=self.url2id(entry["rel"]["value"]),
-                        value=entry["relLabel"]["value"],
-                    ),
-                    Entity(
-                        qid=self.url2id(entry["tail"]["value"]),
-                        value=entry["tailLabel"]["value"],
-                    ),
-                )
+                self.to_triplet(entry, labels)
                 for entry in response["results"]["bindings"]
             ]
         except Exception as e:
             raise GraphException(e)
 
+    def get_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[List[Tuple[Entity, Relationship, Entity]]]:
+        try:
+            if not tuples:
+                return []
+            response = self.query(self.get_triplets_many_query(tuples, **kwargs))
+            labels = self.get_labels(
+                self.response_ids(response, ["head", "rel", "tail"])
+            )
+            return self.to_triplets_many(response, tuples, labels)
+        except Exception as e:
+            raise GraphException(e)
+
+    def count_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[int]:
+        try:
+            if not tuples:
+                return []
+            response = self.query(self.count_triplets_many_query(tuples))
+            return self.to_counts(response, tuples)
+        except Exception as e:
+            raise GraphException(e)
+
     def find(self, data_list, **kwargs) -> List[Entity]:
         try:
-            query_concat = " ".join([f'"{data}"' for data in data_list])
-            response = self.query(queries.find.format(queries=query_concat))
-            best_matches = {}
-            for row in response["results"]["bindings"]:
-                search_name = row["searchString"]["value"]
-                item_uri = row["entity"]["value"]
-                try:
-                    q_id_string = self.url2id(item_uri)
-                    q_id_val = int(q_id_string.replace("Q", ""))
-                except ValueError:
-                    continue
-                if (
-                    search_name not in best_matches
-                    or q_id_val < best_matches[search_name]["id_val"]
-                ):
-                    best_matches[search_name] = {
-                        "id_val": q_id_val,
-                        "qid": q_id_string,
-                        "value": row["entityLabel"]["value"],
-                    }
+            return self.to_found(self.query(self.find_query(data_list)))
+        except Exception as e:
+            raise GraphException(e)
+
+    # ---------------------------------------------------------------------------- #
+    #                                 ASYNC ToG OPS                                #
+    # ---------------------------------------------------------------------------- #
+
+    async def aget_entities(self, entities, **kwargs) -> List[Entity]:
+        try:
+            if not entities:
+                return []
+            labels = await self.aget_labels(entities)
+            return [
+                Entity(qid=qid, value=labels[qid]) for qid in entities if qid in labels
+            ]
+        except Exception as e:
+            raise GraphException(e)
 
+    async def aget_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
+        try:
+            response = await self.aquery(self.get_relationships_query(entity, **kwargs))
+            labels = await self.aget_labels(self.response_ids(response, ["prop"]))
             return [
-                Entity(qid=row["qid"], value=row["value"])
-                for row in best_matches.values()
+                self.to_relationship(entry, "prop", labels)
+                for entry in response["results"]["bindings"]
             ]
         except Exception as e:
             raise GraphException(e)
 
+    async def aget_relationships_many(
+        self, entities: List[Entity], **kwargs
+    ) -> List[List[Relationship]]:
+        try:
+            if not entities:
+                return []
+            response = await self.aquery(
+                self.get_relationships_many_query(entities, **kwargs)
+            )
+            labels = await self.aget_labels(self.response_ids(response, ["prop"]))
+            return self.to_relationships_many(response, entities, labels)
+        except Exception as e:
+            raise GraphException(e)
+
+    async def aget_triplets(
+        self, entity: Entity, relationship: Relationship, **kwargs
+    ) -> List[Tuple[Entity, Relationship, Entity]]:
+        try:
+            response = await self.aquery(
+                self.get_triplets_query(entity, relationship, **kwargs)
+            )
+            labels = await self.aget_labels(
+                self.response_ids(response, ["head", "rel", "tail"])
+            )
+            return [
+                self.to_triplet(entry, labels)
+                for entry in response["results"]["bindings"]
+            ]
+        except Exception as e:
+            raise GraphException(e)
+
+    async def aget_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[List[Tuple[Entity, Relationship, Entity]]]:
+        try:
+            if not tuples:
+                return []
+            response = await self.aquery(self.get_triplets_many_query(tuples, **kwargs))
+            labels = await self.aget_labels(
+                self.response_ids(response, ["head", "rel", "tail"])
+            )
+            return self.to_triplets_many(response, tuples, labels)
+        except Exception as e:
+            raise GraphException(e)
+
+    async def acount_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[int]:
+        try:
+            if not tuples:
+                return []
+            response = await self.aquery(self.count_triplets_many_query(tuples))
+            return self.to_counts(response, tuples)
+        except Exception as e:
+            raise GraphException(e)
+
+    async def afind(self, data_list, **kwargs) -> List[Entity]:
+        try:
+            return self.to_found(await self.aquery(self.find_query(data_list)))
+        except Exception as e:
+            raise GraphException(e)
+
     @staticmethod
     def url2id(url: str) -> str:
-        return url.replace("http://www.wikidata.org/entity/", "")
+        return url.replace(GraphWikidata.ENTITY_URL, "")
@@ -0,0 +1,401 @@
+from .Graph import Graph
+from .GraphWikidata import GraphWikidata, Entity, Relationship
+from .mapped import MappedArray, MappedStrings, write_strings
+from errors import GraphException
+from typing import Dict, Iterator, List, Tuple
+from array import array
+from dotenv import load_dotenv
+import bisect
+import bz2
+import gzip
+import hashlib
+import os
+import re
+
+
+class TriplePrefixes:
+    """Exposes the `(first, second)` columns of a flat array of sorted
+    `(first, second, third)` triples as a sequence for `bisect`.
+    """
+
+    def __init__(self, triples: MappedArray):
+        self.triples = triples
+
+    def __len__(self) -> int:
+        return len(self.triples) // 3
+
+    def __getitem__(self, index: int) -> Tuple[int, int]:
+        return self.triples[3 * index], self.triples[3 * index + 1]
+
+
+class LabelKeys:
+    """Exposes the labels of the entities in `order` as a sequence for `bisect`."""
+
+    def __init__(self, labels: MappedStrings, order: MappedArray):
+        self.labels = labels
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.labels[self.order[index]]
+
+
+class GraphWikidataDump(Graph):
+    """A read-only graph answering lookups from a local Wikidata dump, converted
+    with `convert` (see `evaluation/convert_dump.py`) into memory-mapped sorted
+    arrays in the directory `GRAPH_DUMP_PATH`:
+    - `terms`: the sorted IDs and literal values, a term's ID is its index
+    - `labels`: the english label of each term, `labels.sorted` the terms with
+      a label sorted by label (for `find`)
+    - `spo.bin` and `ops.bin`: the `wdt:` statements as `(subject, property,
+      object)` and `(object, property, subject)` term triples, both sorted
+
+    The relationships and triplets of an entity are contiguous ranges of the
+    triple arrays and found by binary search, so lookups only touch a few
+    pages. Entities and relationships are those of `GraphWikidata`, triplets
+    are paged like there (see `GraphWikidata.neighbors_query`).
+    """
+
+    ENTITY_URL = GraphWikidata.ENTITY_URL
+    PROPERTY_URL = "http://www.wikidata.org/prop/direct/"
+    LABEL_URL = "http://www.w3.org/2000/01/rdf-schema#label"
+
+    def __init__(self, path: str = None):
+        try:
+            load_dotenv()
+            self.path = path or os.getenv("GRAPH_DUMP_PATH", "./wikidata_dump")
+            self.triplet_limit = int(os.getenv("GRAPH_TRIPLET_LIMIT", 0))
+            self.triplet_order = os.getenv("GRAPH_TRIPLET_ORDER", "id")
+            self.triplet_seed = int(os.getenv("GRAPH_TRIPLET_SEED", 0))
+            self.terms = MappedStrings(os.path.join(self.path, "terms"))
+            self.labels = MappedStrings(os.path.join(self.path, "labels"))
+            self.label_order = MappedArray(
+                os.path.join(self.path, "labels.sorted"), "i"
+            )
+            self.spo = MappedArray(os.path.join(self.path, "spo.bin"), "i")
+            self.ops = MappedArray(os.path.join(self.path, "ops.bin"), "i")
+        except Exception as e:
+            raise GraphException(e)
+
+    def close(self):
+        """Unmaps the files. Run this after you are done using an instance of this class."""
+        try:
+            for mapped in [
+                self.terms,
+                self.labels,
+                self.label_order,
+                self.spo,
+                self.ops,
+            ]:
+                mapped.close()
+        except Exception as e:
+            raise GraphException(e)
+
+    # ---------------------------------------------------------------------------- #
+    #                                  CONVERSION                                  #
+    # ---------------------------------------------------------------------------- #
+
+    @classmethod
+    def convert(cls, source: str, path: str) -> Dict[str, int]:
+        """Converts an N-Triples dump (optionally `.gz` or `.bz2` compressed),
+        e.g. the truthy Wikidata dump or an extract of it, into the mapped
+        format at `path`. Only `wdt:` statements and english `rdfs:label`s
+        are kept. The kept statements are sorted in memory, so large dumps
+        should be filtered to the needed entities first.
+        """
+        term_index: Dict[str, int] = {}
+        names: List[str] = []
+        statements = array("i")
+        labels: Dict[int, str] = {}
+
+        def intern(term: str) -> int:
+            index = term_index.get(term)
+            if index is None:
+                index = term_index[term] = len(names)
+                names.append(term)
+            return index
+
+        for subject, predicate, obj, language in cls.parse_ntriples(source):
+            if predicate.startswith(cls.PROPERTY_URL):
+                statements.extend(
+                    [
+                        intern(cls.to_term(subject)),
+                        intern(predicate[len(cls.PROPERTY_URL) :]),
+                        intern(cls.to_term(obj)),
+                    ]
+                )
+            elif predicate == cls.LABEL_URL and language == "en":
+                labels[intern(cls.to_term(subject))] = obj
+
+        # renumber terms in sorted order, so that IDs compare like the terms
+        order = sorted(range(len(names)), key=lambda index: names[index].encode())
+        renumber = array("i", [0] * len(names))
+        for new, old in enumerate(order):
+            renumber[old] = new
+        os.makedirs(path, exist_ok=True)
+        write_strings(os.path.join(path, "terms"), [names[old] for old in order])
+        write_strings(
+            os.path.join(path, "labels"), [labels.get(old, "") for old in order]
+        )
+        with open(os.path.join(path, "labels.sorted"), "wb") as f:
+            array(
+                "i",
+                sorted(
+                    [renumber[old] for old in labels],
+                    key=lambda new: (labels[order[new]].encode(), new),
+                ),
+            ).tofile(f)
+
+        triples = sorted(
+            {
+                (
+                    renumber[statements[i]],
+                    renumber[statements[i + 1]],
+                    renumber[statements[i + 2]],
+                )
+                for i in range(0, len(statements), 3)
+            }
+        )
+        for name, key in [
+            ("spo.bin", lambda t: t),
+            ("ops.bin", lambda t: (t[2], t[1], t[0])),
+        ]:
+            with open(os.path.join(path, name), "wb") as f:
+                array(
+                    "i",
+                    [term for triple in sorted(map(key, triples)) for term in triple],
+                ).tofile(f)
+        return {"terms": len(names), "labels": len(labels), "statements": len(triples)}
+
+    @classmethod
+    def parse_ntriples(cls, source: str) -> Iterator[Tuple[str, str, str, str | None]]:
+        """Yields `(subject, predicate, object, language)` of the statements in an
+        N-Triples file. Literals are unescaped and returned without datatype.
+        """
+        opener = {".gz": gzip.open, ".bz2": bz2.open}.get(
+            os.path.splitext(source)[1], open
+        )
+        with opener(source, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line.startswith("<"):
+                    continue
+                subject, predicate, rest = line.split(" ", 2)
+                rest = rest.rstrip(" .")
+                language = None
+                if rest.startswith("<"):
+                    obj = rest[1:-1]
+                elif rest.startswith('"'):
+                    end = rest.rindex('"')
+                    obj = cls.unescape(rest[1:end])
+                    if rest[end + 1 : end + 2] == "@":
+                        language = rest[end + 2 :]
+                else:
+                    continue
+                yield subject[1:-1], predicate[1:-1], obj, language
+
+    @staticmethod
+    def unescape(literal: str) -> str:
+        if "\\" not in literal:
+            return literal
+        return re.sub(
+            r"\\(U[0-9A-Fa-f]{8}|u[0-9A-Fa-f]{4}|.)",
+            lambda m: (
+                chr(int(m.group(1)[1:], 16))
+                if m.group(1)[0] in "uU" and len(m.group(1)) > 1
+                else {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f"}.get(
+                    m.group(1), m.group(1)
+                )
+            ),
+            literal,
+        )
+
+    @classmethod
+    def to_term(cls, value: str) -> str:
+        return value.replace(cls.ENTITY_URL, "")
+
+    # ---------------------------------------------------------------------------- #
+    #                                    HELPERS                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def term_id(self, term: str) -> int | None:
+        key = term.encode()
+        index = bisect.bisect_left(self.terms, key)
+        if index < len(self.terms) and self.terms[index] == key:
+            return index
+        return None
+
+    def term(self, index: int) -> str:
+        return self.terms[index].decode()
+
+    def label(self, index: int) -> str:
+        """Returns the english label of a term, or the term itself without one."""
+        return (self.labels[index] or self.terms[index]).decode()
+
+    @staticmethod
+    def prefix_range(
+        triples: MappedArray, first: int, second: int = None
+    ) -> Tuple[int, int]:
+        """Returns the range of the triples starting with `first` (and `second`)
+        as triple indexes.
+        """
+        prefixes = TriplePrefixes(triples)
+        if second is None:
+            return (
+                bisect.bisect_left(prefixes, (first, -1)),
+                bisect.bisect_left(prefixes, (first + 1, -1)),
+            )
+        return (
+            bisect.bisect_left(prefixes, (first, second)),
+            bisect.bisect_left(prefixes, (first, second + 1)),
+        )
+
+    def neighbors(self, node: int, prop: int) -> List[Tuple[int, bool]]:
+        """Returns the `(neighbor, outgoing)` terms connected to `node` by `prop`.
+        A statement linking `node` to itself is in both triple arrays and only
+        returned once, like by `GraphWikidata`.
+        """
+        found = []
+        for triples, outgoing in [(self.spo, True), (self.ops, False)]:
+            start, end = self.prefix_range(triples, node, prop)
+            found += [
+                (triples[3 * index + 2], outgoing)
+                for index in range(start, end)
+                if outgoing or triples[3 * index + 2] != node
+            ]
+        return found
+
+    def count_self_loops(self, node: int, prop: int) -> int:
+        """Returns 1 if `node` is linked to itself by `prop`, otherwise 0."""
+        start, end = self.prefix_range(self.spo, node, prop)
+        index = bisect.bisect_left(
+            range(start, end), node, key=lambda index: self.spo[3 * index + 2]
+        )
+        return int(start + index < end and self.spo[3 * (start + index) + 2] == node)
+
+    def page(self, found: List[Tuple[int, bool]], **kwargs) -> List[Tuple[int, bool]]:
+        """Returns one page of neighbors, selected with the keyword arguments
+        `limit`, `offset`, `order` and `seed`, see `GraphWikidata.neighbors_query`.
+        """
+        found = sorted(found)
+        limit = int(kwargs.get("limit", self.triplet_limit))
+        if not limit:
+            return found
+        order = kwargs.get("order", self.triplet_order)
+        if order not in ["id", "sample"]:
+            raise ValueError(f"Unknown triplet order: {order}")
+        if order == "sample":
+            seed = str(kwargs.get("seed", self.triplet_seed))
+            found.sort(
+                key=lambda item: hashlib.md5(
+                    (self.term(item[0]) + seed).encode("utf-8")
+                ).digest()
+            )
+        offset = int(kwargs.get("offset", 0))
+        return found[offset : offset + limit]
+
+    # ---------------------------------------------------------------------------- #
+    #                                    ToG OPS                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def get_entities(self, entities, **kwargs) -> List[Entity]:
+        try:
+            result = []
+            for qid in entities or []:
+                index = self.term_id(qid)
+                # unknown QIDs are left out, like by `GraphWikidata`
+                if index is not None:
+                    result.append(Entity(qid=qid, value=self.label(index)))
+            return result
+        except Exception as e:
+            raise GraphException(e)
+
+    def get_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
+        try:
+            node = self.term_id(entity.qid) if entity else None
+            if node is None:
+                return []
+            props = set()
+            for triples in [self.spo, self.ops]:
+                start, end = self.prefix_range(triples, node)
+                index = start
+                while index < end:
+                    prop = triples[3 * index + 1]
+                    props.add(prop)
+                    # skip to the next property of the node
+                    index = self.prefix_range(triples, node, prop)[1]
+            return [
+                Relationship(pid=self.term(prop), value=self.label(prop))
+                for prop in sorted(props)
+            ]
+        except Exception as e:
+            raise GraphException(e)
+
+    def get_triplets(
+        self, entity: Entity, relationship: Relationship, **kwargs
+    ) -> List[Tuple[Entity, Relationship, Entity]]:
+        try:
+            node = self.term_id(entity.qid) if entity else None
+            prop = self.term_id(relationship.pid) if relationship else None
+            if node is None or prop is None:
+                return []
+            current = Entity(qid=entity.qid, value=self.label(node))
+            rel = Relationship(pid=relationship.pid, value=self.label(prop))
+            triplets = []
+            for neighbor, outgoing in self.page(self.neighbors(node, prop), **kwargs):
+                other = Entity(qid=self.term(neighbor), value=self.label(neighbor))
+                triplets.append(
+                    (current, rel, other) if outgoing else (other, rel, current)
+                )
+            return triplets
+        except Exception as e:
+            raise GraphException(e)
+
+    def count_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[int]:
+        try:
+            counts = []
+            for entity, relationship in tuples:
+                node = self.term_id(entity.qid)
+                prop = self.term_id(relationship.pid)
+                if node is None or prop is None:
+                    counts.append(0)
+                    continue
+                counts.append(
+                    sum(
+                        end - start
+                        for start, end in [
+                            self.prefix_range(self.spo, node, prop),
+                            self.prefix_range(self.ops, node, prop),
+                        ]
+                    )
+                    - self.count_self_loops(node, prop)
+                )
+            return counts
+        except Exception as e:
+            raise GraphException(e)
+
+    def find(self, data_list, **kwargs) -> List[Entity]:
+        """Returns the entity with the smallest QID whose english label equals
+        the query string, like `GraphWikidata.find`.
+        """
+        try:
+            keys = LabelKeys(self.labels, self.label_order)
+            found = {}
+            for data in data_list or []:
+                key = data.encode()
+                start = bisect.bisect_left(keys, key)
+                end = bisect.bisect_right(keys, key, lo=start)
+                qids = [
+                    self.term(self.label_order[index]) for index in range(start, end)
+                ]
+                qids = [qid for qid in qids if qid[:1] == "Q" and qid[1:].isdigit()]
+                if qids:
+                    qid = min(qids, key=lambda qid: int(qid[1:]))
+                    found[qid] = Entity(qid=qid, value=data)
+            return list(found.values())
+        except Exception as e:
+            raise GraphException(e)
@@ -0,0 +1,412 @@
+from .Graph import Graph, RelationshipFilter
+from .GraphWikidata import GraphWikidata, Entity, Relationship
+from errors import GraphException
+from typing import Dict, Iterable, List, Tuple
+from contextlib import closing
+from dotenv import load_dotenv
+import hashlib
+import json
+import os
+import sqlite3
+
+
+class GraphWikidataSnapshot(Graph):
+    """A read-only graph answering lookups from a local snapshot of Wikidata
+    neighborhoods, so that runs neither depend on nor wait for the public
+    endpoint and are repeatable.
+
+    The snapshot is an SQLite file at `GRAPH_SNAPSHOT_PATH`, written by
+    `record` (see `evaluation/record_snapshot.py`). It holds the crawled
+    entities, their relationships with the number of triplets, the recorded
+    triplets and the labels of all QIDs and PIDs. Entities outside of the
+    recorded neighborhoods have no relationships.
+
+    Triplets are paged like in `GraphWikidata`, but only within the triplets
+    that were recorded, i.e. at most the `limit` used by the recorder.
+
+    A missing snapshot file raises a `GraphException`, unless the instance is
+    created to `record` a new one (`create`).
+    """
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS labels (id TEXT PRIMARY KEY, label TEXT NOT NULL) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS entities (qid TEXT PRIMARY KEY, hop INTEGER NOT NULL) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS relationships (qid TEXT NOT NULL, pid TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (qid, pid)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS triplets (qid TEXT NOT NULL, pid TEXT NOT NULL, neighbor TEXT NOT NULL, outgoing INTEGER NOT NULL, PRIMARY KEY (qid, pid, neighbor, outgoing)) WITHOUT ROWID",
+    ]
+
+    def __init__(self, path: str = None, create: bool = False):
+        try:
+            load_dotenv()
+            self.path = path or os.getenv(
+                "GRAPH_SNAPSHOT_PATH", "./wikidata_snapshot.sqlite"
+            )
+            self.triplet_limit = int(os.getenv("GRAPH_TRIPLET_LIMIT", 0))
+            self.triplet_order = os.getenv("GRAPH_TRIPLET_ORDER", "id")
+            self.triplet_seed = int(os.getenv("GRAPH_TRIPLET_SEED", 0))
+            if not create:
+                self.check_snapshot()
+        except Exception as e:
+            raise GraphException(e)
+
+    def check_snapshot(self):
+        """Raises if there is no snapshot at `self.path`, so that a wrong path
+        is not answered with an empty graph.
+        """
+        if not os.path.isfile(self.path):
+            raise FileNotFoundError(f"No snapshot found at {self.path}")
+        with closing(self.connect()) as connection:
+            tables = {
+                name
+                for (name,) in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            }
+        if not {"labels", "entities", "relationships", "triplets"} <= tables:
+            raise ValueError(f"{self.path} is not a snapshot")
+
+    def create_schema(self):
+        with closing(self.connect()) as connection:
+            with connection:
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+
+    def close(self):
+        """Nothing to release, exists for compatibility with the other graphs."""
+        pass
+
+    def connect(self) -> sqlite3.Connection:
+        """Every lookup uses its own connection, so that one instance can be
+        shared by several threads and one file by several processes.
+        """
+        return sqlite3.connect(self.path, timeout=60)
+
+    # ---------------------------------------------------------------------------- #
+    #                                   RECORDING                                  #
+    # ---------------------------------------------------------------------------- #
+
+    def record(
+        self,
+        source: GraphWikidata,
+        seeds: List[str],
+        hops: int,
+        batch_size: int = 50,
+        relationship_filter: RelationshipFilter = None,
+        **kwargs,
+    ) -> Dict[str, int]:
+        """Crawls the `hops`-hop neighborhoods of the `seeds` from `source` into
+        the snapshot. The relationships of every entity at a distance below
+        `hops` are recorded with their triplets, which are fetched with the
+        paging keyword arguments of `GraphWikidata.neighbors_query` (e.g.
+        `limit`). Entities are fetched in batches of `batch_size`.
+
+        Entities recorded by a previous call are not fetched again, their
+        neighbors are read from the recorded triplets instead. So an
+        interrupted recording can be resumed, or extended to more `hops`.
+        Returns the number of entities newly recorded per hop.
+        """
+        self.create_schema()
+        with closing(self.connect()) as connection:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    (
+                        "recorder",
+                        json.dumps(
+                            {
+                                "hops": hops,
+                                "relationship_filter": relationship_filter,
+                                **kwargs,
+                            }
+                        ),
+                    ),
+                )
+            recorded = {
+                qid for (qid,) in connection.execute("SELECT qid FROM entities")
+            }
+        stats = {}
+        frontier = sorted(set(seeds))
+        visited = set()
+        self.store_entities(source.get_entities(frontier))
+        for hop in range(hops):
+            pending = [qid for qid in frontier if qid not in recorded]
+            neighbors = self.recorded_neighbors(
+                [qid for qid in frontier if qid in recorded]
+            )
+            for start in range(0, len(pending), batch_size):
+                batch = [
+                    Entity(qid=qid, value=qid)
+                    for qid in pending[start : start + batch_size]
+                ]
+                neighbors |= self.record_batch(
+                    source, batch, hop, relationship_filter, **kwargs
+                )
+            recorded |= set(pending)
+            visited |= set(frontier)
+            stats[f"hop_{hop}"] = len(pending)
+            frontier = sorted(neighbors - visited)
+        return stats
+
+    def recorded_neighbors(self, qids: List[str]) -> set:
+        """Returns the QIDs of the recorded neighbors of `qids`."""
+        with closing(self.connect()) as connection:
+            rows = self.select_in(
+                connection,
+                "SELECT DISTINCT neighbor FROM triplets WHERE qid IN ({values})",
+                qids,
+            )
+        return {neighbor for (neighbor,) in rows if self.is_qid(neighbor)}
+
+    def record_batch(
+        self,
+        source: GraphWikidata,
+        entities: List[Entity],
+        hop: int,
+        relationship_filter: RelationshipFilter,
+        **kwargs,
+    ) -> set:
+        """Records the relationships and triplets of one batch of entities and
+        returns the QIDs of their neighbors.
+        """
+        relationships_per_entity = source.get_relationships_many(
+            entities, relationship_filter=relationship_filter
+        )
+        tuples = [
+            (entity, relationship)
+            for entity, relationships in zip(entities, relationships_per_entity)
+            for relationship in relationships
+        ]
+        counts = source.count_triplets_many(tuples)
+        triplets_per_tuple = source.get_triplets_many(tuples, **kwargs)
+
+        labels = {}
+        rows = []
+        neighbors = set()
+        for (entity, relationship), triplets in zip(tuples, triplets_per_tuple):
+            labels[relationship.pid] = relationship.get_label()
+            for head, _, tail in triplets:
+                outgoing = head.qid == entity.qid
+                neighbor = tail if outgoing else head
+                labels[neighbor.qid] = neighbor.get_label()
+                rows.append((entity.qid, relationship.pid, neighbor.qid, int(outgoing)))
+                if self.is_qid(neighbor.qid):
+                    neighbors.add(neighbor.qid)
+        with closing(self.connect()) as connection:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO labels (id, label) VALUES (?, ?)",
+                    labels.items(),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO relationships (qid, pid, count) VALUES (?, ?, ?)",
+                    [
+                        (entity.qid, relationship.pid, count)
+                        for (entity, relationship), count in zip(tuples, counts)
+                    ],
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO triplets (qid, pid, neighbor, outgoing) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO entities (qid, hop) VALUES (?, ?)",
+                    [(entity.qid, hop) for entity in entities],
+                )
+        return neighbors
+
+    def store_entities(self, entities: Iterable[Entity]):
+        with closing(self.connect()) as connection:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO labels (id, label) VALUES (?, ?)",
+                    [(entity.qid, entity.get_label()) for entity in entities],
+                )
+
+    @staticmethod
+    def is_qid(value: str) -> bool:
+        return value[:1] == "Q" and value[1:].isdigit()
+
+    # ---------------------------------------------------------------------------- #
+    #                                    HELPERS                                   #
+    # ---------------------------------------------------------------------------- #
+
+    @staticmethod
+    def select_in(
+        connection: sqlite3.Connection, query: str, values: List[str]
+    ) -> List[tuple]:
+        """Runs a query with an `IN ({values})` clause, in batches of 500."""
+        rows = []
+        for start in range(0, len(values), 500):
+            batch = values[start : start + 500]
+            rows += connection.execute(
+                query.format(values=", ".join("?" * len(batch))), batch
+            ).fetchall()
+        return rows
+
+    def get_labels(
+        self, connection: sqlite3.Connection, ids: Iterable[str]
+    ) -> Dict[str, str]:
+        """Returns the labels of the given IDs. Unknown IDs and literals are
+        labeled with themselves, like in `GraphWikidata`.
+        """
+        ids = sorted(set(ids))
+        labels = {item: item for item in ids}
+        labels.update(
+            self.select_in(
+                connection, "SELECT id, label FROM labels WHERE id IN ({values})", ids
+            )
+        )
+        return labels
+
+    def page_rows(self, rows: List[tuple], **kwargs) -> List[tuple]:
+        """Returns one page of `(neighbor, outgoing)` rows. The page is selected
+        with the keyword arguments `limit`, `offset`, `order` and `seed`, see
+        `GraphWikidata.neighbors_query`.
+        """
+        rows = sorted(rows)
+        limit = int(kwargs.get("limit", self.triplet_limit))
+        if not limit:
+            return rows
+        order = kwargs.get("order", self.triplet_order)
+        if order not in ["id", "sample"]:
+            raise ValueError(f"Unknown triplet order: {order}")
+        if order == "sample":
+            seed = str(kwargs.get("seed", self.triplet_seed))
+            rows.sort(
+                key=lambda row: hashlib.md5((row[0] + seed).encode("utf-8")).digest()
+            )
+        offset = int(kwargs.get("offset", 0))
+        return rows[offset : offset + limit]
+
+    # ---------------------------------------------------------------------------- #
+    #                                    ToG OPS                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def get_entities(self, entities, **kwargs) -> List[Entity]:
+        try:
+            if not entities:
+                return []
+            with closing(self.connect()) as connection:
+                labels = dict(
+                    self.select_in(
+                        connection,
+                        "SELECT id, label FROM labels WHERE id IN ({values})",
+                        sorted(set(entities)),
+                    )
+                )
+            # unknown QIDs are left out, like by `GraphWikidata`
+            return [
+                Entity(qid=qid, value=labels[qid]) for qid in entities if qid in labels
+            ]
+        except Exception as e:
+            raise GraphException(e)
+
+    def get_relationships(self, entity: Entity, **kwargs) -> List[Relationship]:
+        return self.get_relationships_many([entity], **kwargs)[0]
+
+    def get_relationships_many(
+        self, entities: List[Entity], **kwargs
+    ) -> List[List[Relationship]]:
+        try:
+            if not entities:
+                return []
+            with closing(self.connect()) as connection:
+                rows = self.select_in(
+                    connection,
+                    "SELECT qid, pid FROM relationships WHERE qid IN ({values}) ORDER BY qid, pid",
+                    sorted({entity.qid for entity in entities}),
+                )
+                labels = self.get_labels(connection, [pid for _, pid in rows])
+            by_qid = {}
+            for qid, pid in rows:
+                by_qid.setdefault(qid, []).append(
+                    Relationship(pid=pid, value=labels[pid])
+                )
+            return [list(by_qid.get(entity.qid, [])) for entity in entities]
+        except Exception as e:
+            raise GraphException(e)
+
+    def get_triplets(
+        self, entity: Entity, relationship: Relationship, **kwargs
+    ) -> List[Tuple[Entity, Relationship, Entity]]:
+        return self.get_triplets_many([(entity, relationship)], **kwargs)[0]
+
+    def get_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[List[Tuple[Entity, Relationship, Entity]]]:
+        try:
+            if not tuples:
+                return []
+            with closing(self.connect()) as connection:
+                by_pair: Dict[Tuple[str, str], List[tuple]] = {}
+                for entity, relationship in tuples:
+                    pair = (entity.qid, relationship.pid)
+                    if pair in by_pair:
+                        continue
+                    by_pair[pair] = self.page_rows(
+                        connection.execute(
+                            "SELECT neighbor, outgoing FROM triplets WHERE qid = ? AND pid = ?",
+                            pair,
+                        ).fetchall(),
+                        **kwargs,
+                    )
+                labels = self.get_labels(
+                    connection,
+                    [item for pair in by_pair for item in pair]
+                    + [row[0] for rows in by_pair.values() for row in rows],
+                )
+            results = []
+            for entity, relationship in tuples:
+                current = Entity(qid=entity.qid, value=labels[entity.qid])
+                rel = Relationship(pid=relationship.pid, value=labels[relationship.pid])
+                triplets = []
+                for neighbor, outgoing in by_pair[(entity.qid, relationship.pid)]:
+                    other = Entity(qid=neighbor, value=labels[neighbor])
+                    triplets.append(
+                        (current, rel, other) if outgoing else (other, rel, current)
+                    )
+                results.append(triplets)
+            return results
+        except Exception as e:
+            raise GraphException(e)
+
+    def count_triplets_many(
+        self, tuples: List[Tuple[Entity, Relationship]], **kwargs
+    ) -> List[int]:
+        try:
+            with closing(self.connect()) as connection:
+                return [
+                    (
+                        connection.execute(
+                            "SELECT count FROM relationships WHERE qid = ? AND pid = ?",
+                            (entity.qid, relationship.pid),
+                        ).fetchone()
+                        or (0,)
+                    )[0]
+                    for entity, relationship in tuples
+                ]
+        except Exception as e:
+            raise GraphException(e)
+
+    def find(self, data_list, **kwargs) -> List[Entity]:
+        """Returns the entity with the smallest QID whose label equals the
+        query string, like `GraphWikidata.find`, from the recorded labels.
+        """
+        try:
+            found = {}
+            with closing(self.connect()) as connection:
+                for data in data_list or []:
+                    qids = [
+                        qid
+                        for (qid,) in connection.execute(
+                            "SELECT id FROM labels WHERE label = ?", (data,)
+                        )
+                        if self.is_qid(qid)
+                    ]
+                    if qids:
+                        qid = min(qids, key=lambda qid: int(qid[1:]))
+                        found[qid] = Entity(qid=qid, value=data)
+            return list(found.values())
+        except Exception as e:
+            raise GraphException(e)
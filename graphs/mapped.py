@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+from array import array
+import mmap
+import os
+import shutil
+
+
+class MappedArray:
+    """A read-only array of native integers (`typecode` of `array`) memory-mapped
+    from a file. Pages are loaded on access and shared through the page cache,
+    so many processes can use one copy.
+    """
+
+    def __init__(self, path: str, typecode: str):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.map = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            )
+        self.view = memoryview(self.map).cast(typecode) if self.map else ()
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def __getitem__(self, index: int) -> int:
+        return self.view[index]
+
+    def close(self):
+        if self.map:
+            self.view.release()
+            self.map.close()
+
+
+class MappedStrings:
+    """A sequence of UTF-8 strings memory-mapped from a data file and an offsets
+    file, where string `i` spans `offsets[i]:offsets[i + 1]`. Items are returned
+    as bytes, so sorted strings can be searched with `bisect` without decoding.
+    """
+
+    def __init__(self, path: str):
+        self.offsets = MappedArray(f"{path}.offsets", "q")
+        with open(f"{path}.bin", "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.map = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.map[self.offsets[index] : self.offsets[index + 1]]
+
+    def decode(self) -> List[str]:
+        return [self[index].decode() for index in range(len(self))]
+
+    def close(self):
+        self.offsets.close()
+        if self.map:
+            self.map.close()
+
+
+def write_strings(path: str, strings: Iterable[str]):
+    """Writes `strings` in the format read by `MappedStrings`."""
+    offsets = array("q", [0])
+    with open(f"{path}.bin", "wb") as f:
+        for string in strings:
+            data = string.encode()
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    with open(f"{path}.offsets", "wb") as f:
+        offsets.tofile(f)
+
+
+class MappedGraph:
+    """A compact binary snapshot of a graph, memory-mapped from the directory
+    `path`:
+    - `uuids` and `labels`: string tables of the nodes, node `i` is the `i`th
+      entry of both
+    - `types`: string table of the relationship types
+    - `edges.bin`: the edges as flat `(head, type, tail)` int32 triples of node
+      and type indexes
+
+    Snapshots are written with `write` and replace the GraphML export where
+    the graph is loaded often, e.g. by every HPC array task (see
+    `GraphNeo4j.import_snapshot` and `GraphMemory`). Only the uuid and label of
+    the `:NODE` entities are kept, which is all the graphs use.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.uuids = MappedStrings(os.path.join(path, "uuids"))
+        self.labels = MappedStrings(os.path.join(path, "labels"))
+        self.rel_types = MappedStrings(os.path.join(path, "types"))
+        self.edges = MappedArray(os.path.join(path, "edges.bin"), "i")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        for mapped in [self.uuids, self.labels, self.rel_types, self.edges]:
+            mapped.close()
+
+    def count_edges(self) -> int:
+        return len(self.edges) // 3
+
+    def iter_edges(self) -> Iterator[Tuple[int, int, int]]:
+        """Yields the edges as `(head_index, type_index, tail_index)`."""
+        view = self.edges.view
+        return zip(view[0::3], view[1::3], view[2::3])
+
+    @staticmethod
+    def write(
+        path: str,
+        uuids: List[str],
+        labels: List[str],
+        rel_types: List[str],
+        edges: Iterable[Tuple[int, int, int]],
+    ) -> Dict[str, int]:
+        """Writes a snapshot of the interned `edges` to `path`, replacing an
+        existing one. Files are written to a temporary directory first, so
+        readers never see a partial snapshot.
+        """
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(tmp_path, exist_ok=True)
+        try:
+            write_strings(os.path.join(tmp_path, "uuids"), uuids)
+            write_strings(os.path.join(tmp_path, "labels"), labels)
+            write_strings(os.path.join(tmp_path, "types"), rel_types)
+            flat = array("i")
+            for edge in edges:
+                flat.extend(edge)
+            with open(os.path.join(tmp_path, "edges.bin"), "wb") as f:
+                flat.tofile(f)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.rename(tmp_path, path)
+        finally:
+            if os.path.isdir(tmp_path):
+                shutil.rmtree(tmp_path)
+        return {
+            "nodes": len(uuids),
+            "relationship types": len(rel_types),
+            "edges": len(flat) // 3,
+        }
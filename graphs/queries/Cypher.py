@@ -1,24 +1,119 @@
+# ---------------------------------------------------------------------------- #
+#                                    SCHEMA                                    #
+# ---------------------------------------------------------------------------- #
+# every entity carries the common :NODE label, so that lookups by uuid and label
+# are served by the constraint's index instead of a full node scan.
+# the label index is a text index, because range index keys are size limited
+# and some labels are multi-paragraph descriptions.
+# the full-text index serves `find` with relevance scored entity linking.
+# https://neo4j.com/docs/cypher-manual/5/indexes/search-performance-indexes/
+
+schema = [
+    """
+    CALL {
+        MATCH (entity) WHERE NOT entity:NODE
+        SET entity:NODE
+    } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    "CREATE CONSTRAINT node_uuid IF NOT EXISTS FOR (entity:NODE) REQUIRE entity.uuid IS UNIQUE",
+    "CREATE TEXT INDEX node_label IF NOT EXISTS FOR (entity:NODE) ON (entity.label)",
+    "CREATE FULLTEXT INDEX node_label_fulltext IF NOT EXISTS FOR (entity:NODE) ON EACH [entity.label]",
+    "CALL db.awaitIndexes(300)",
+]
+
 # ---------------------------------------------------------------------------- #
 #                                  TOG queries                                 #
 # ---------------------------------------------------------------------------- #
+# values are passed as $parameters so that every call reuses the same cached plan
+# https://neo4j.com/docs/cypher-manual/5/syntax/parameters/
+# entities are returned as map projections of their uuid and label instead of
+# whole nodes, so that no other properties are sent. with a $preview length,
+# labels are truncated (e.g. multi-paragraph descriptions), `null` keeps them.
+# https://neo4j.com/docs/cypher-manual/5/values-and-types/maps/#cypher-map-projection
 
 get_entities = """
 UNWIND $data_list AS data
-MATCH (entity { uuid: data })
-RETURN entity
+MATCH (entity:NODE { uuid: data })
+RETURN entity {
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN entity.label ELSE left(entity.label, $preview) END
+} AS entity
 """
 
+# relationship types are filtered once they are distinct, with the lists of
+# `GraphNeo4j.relationship_filter_params` (empty lists keep every type)
 get_relationships = """
-MATCH (entity {{ uuid: "{uuid}" }})-[rel]-()
+MATCH (entity:NODE { uuid: $uuid })-[rel]-()
 WITH DISTINCT type(rel) as relationship
+WHERE NOT relationship IN $excluded_ids
+  AND NOT any(suffix IN $excluded_suffixes WHERE relationship ENDS WITH suffix)
+  AND NOT toLower(relationship) IN $excluded_labels
+  AND NOT any(part IN $excluded_substrings WHERE toLower(relationship) CONTAINS part)
 RETURN relationship
 """
 
+get_relationships_many = """
+UNWIND $uuids AS uuid
+MATCH (entity:NODE { uuid: uuid })-[rel]-()
+WITH DISTINCT uuid, type(rel) AS relationship
+WHERE NOT relationship IN $excluded_ids
+  AND NOT any(suffix IN $excluded_suffixes WHERE relationship ENDS WITH suffix)
+  AND NOT toLower(relationship) IN $excluded_labels
+  AND NOT any(part IN $excluded_substrings WHERE toLower(relationship) CONTAINS part)
+WITH uuid, collect(relationship) AS relationships
+RETURN uuid, relationships
+"""
+
+# `{page}` is empty or one of the `page_*` clauses below, which bound the rows
+# returned for hub entities per (entity, relationship)
 get_triplets = """
-MATCH (a {{ uuid: "{uuid}" }})-[rel:{rel_type}]-(b)
-return startNode(rel) AS head, type(rel) AS relationship, endNode(rel) AS tail
+MATCH (a:NODE {{ uuid: $uuid }})-[rel]-(b)
+WHERE type(rel) = $rel_type
+WITH rel, b
+{page}
+WITH startNode(rel) AS head, type(rel) AS relationship, endNode(rel) AS tail
+RETURN head {{
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN head.label ELSE left(head.label, $preview) END
+}} AS head, relationship, tail {{
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN tail.label ELSE left(tail.label, $preview) END
+}} AS tail
+"""
+
+get_triplets_many = """
+UNWIND $pairs AS pair
+CALL {{
+    WITH pair
+    MATCH (a:NODE {{ uuid: pair[0] }})-[rel]-(b)
+    WHERE type(rel) = pair[1]
+    WITH rel, b
+    {page}
+    RETURN rel
+}}
+WITH pair, startNode(rel) AS head, type(rel) AS relationship, endNode(rel) AS tail
+RETURN pair[0] AS uuid, pair[1] AS rel_type, head {{
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN head.label ELSE left(head.label, $preview) END
+}} AS head, relationship, tail {{
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN tail.label ELSE left(tail.label, $preview) END
+}} AS tail
 """
 
+# degrees are read from the node's relationship counts instead of expanding them
+count_triplets_many = """
+UNWIND $pairs AS pair
+MATCH (entity:NODE { uuid: pair[0] })
+RETURN pair[0] AS uuid, pair[1] AS rel_type, apoc.node.degree(entity, pair[1]) AS count
+"""
+
+# neighbors in uuid order, so that pages are stable
+page_by_uuid = "ORDER BY b.uuid SKIP $offset LIMIT $limit"
+
+# a reproducible sample of the neighbors, shuffled by a seeded hash of their uuid
+page_by_sample = "ORDER BY apoc.util.md5([b.uuid, $seed]) SKIP $offset LIMIT $limit"
+
 # ---------------------------------------------------------------------------- #
 #                                 CRUD QUERIES                                 #
 # ---------------------------------------------------------------------------- #
@@ -29,19 +124,44 @@ create = """
 UNWIND $data_list AS data
 MERGE (entity{labels} {{ label: data }}) 
 ON CREATE SET entity.uuid = randomUUID()
-RETURN DISTINCT entity
+WITH DISTINCT entity
+RETURN entity {{ .uuid, .label }} AS entity
 """
 
 find = """
 UNWIND $data_list AS data
 MATCH (entity{labels})
 WHERE ANY(k IN keys(entity) WHERE lower(toString(entity[k])) CONTAINS lower(data))
-RETURN DISTINCT entity
+WITH DISTINCT entity
+RETURN entity {{
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN entity.label ELSE left(entity.label, $preview) END
+}} AS entity
+"""
+
+has_fulltext_index = """
+SHOW FULLTEXT INDEXES YIELD name, state
+WHERE name = "node_label_fulltext" AND state = "ONLINE"
+RETURN count(*) > 0 AS is_online
+"""
+
+# best score per entity over all query strings, each limited to `$limit` hits
+find_fulltext = """
+UNWIND $data_list AS data
+CALL db.index.fulltext.queryNodes("node_label_fulltext", data, {{ limit: $limit }})
+YIELD node AS entity, score
+WHERE entity{labels}
+WITH entity, max(score) AS score
+RETURN entity {{
+    .uuid,
+    label: CASE WHEN $preview IS NULL THEN entity.label ELSE left(entity.label, $preview) END
+}} AS entity, score
+ORDER BY score DESC
 """
 
 delete = """
 UNWIND $data_list AS data
-MATCH (entity { uuid: data })
+MATCH (entity:NODE { uuid: data })
 DETACH DELETE entity
 RETURN entity AS result
 """
@@ -49,22 +169,72 @@ RETURN entity AS result
 link = """
 UNWIND $triplets as triplet
 WITH triplet[0] AS head, triplet[1] AS rel_type, triplet[2] AS tail
-MERGE (a { uuid: head })
-MERGE (b { uuid: tail })
+MERGE (a:NODE { uuid: head })
+MERGE (b:NODE { uuid: tail })
 WITH a, b, rel_type
 CALL apoc.merge.relationship(a, rel_type, {}, {}, b) YIELD rel
 RETURN a, rel, b
 """
 
 unlink = """
-MATCH (a {{ uuid: "{head_uuid}" }})-[edge:{rel_type}]->(b {{ uuid: "{tail_uuid}" }})
+MATCH (a:NODE { uuid: $head_uuid })-[edge]->(b:NODE { uuid: $tail_uuid })
+WHERE type(edge) = $rel_type
 DELETE edge
 RETURN edge AS relationship
 """
 
+# ---------------------------------------------------------------------------- #
+#                                  BULK LOADING                                #
+# ---------------------------------------------------------------------------- #
+# nodes and edges of `BulkLoader` are merged by uuid, which is served by the
+# uniqueness constraint. labels are deduplicated by the loader instead
+bulk_labels = """
+MATCH (entity:NODE)
+RETURN entity.label AS label, entity.uuid AS uuid
+"""
+
+bulk_nodes = """
+UNWIND $nodes AS node
+MERGE (entity:NODE { uuid: node.uuid })
+ON CREATE SET entity.label = node.label
+RETURN count(entity) AS count
+"""
+
+bulk_edges = """
+UNWIND $edges AS edge
+MERGE (a:NODE { uuid: edge[0] })
+MERGE (b:NODE { uuid: edge[2] })
+WITH a, b, edge[1] AS rel_type
+CALL apoc.merge.relationship(a, rel_type, {}, {}, b) YIELD rel
+RETURN count(rel) AS count
+"""
+
 # ---------------------------------------------------------------------------- #
 #                                 IMPORT EXPORT                                #
 # ---------------------------------------------------------------------------- #
 
 export_graphml = "CALL apoc.export.graphml.all('{filename}', {{useTypes:true}})"
 import_graphml = "CALL apoc.import.graphml('{filename}', {{batchSize: 10000, readLabels: true, useTypes: true, storeNodeIds: false}})"
+
+# binary snapshots (see `MappedGraph`). entities are written first, so that the
+# edges of one relationship type only MATCH their ends by uuid
+snapshot_edges = """
+MATCH (a:NODE)-[r]->(b:NODE)
+RETURN a.uuid AS head, type(r) AS type, b.uuid AS tail
+"""
+
+import_snapshot_edges = """
+UNWIND $edges AS edge
+MATCH (a:NODE {{ uuid: edge[0] }})
+MATCH (b:NODE {{ uuid: edge[1] }})
+MERGE (a)-[:{rel_type}]->(b)
+RETURN count(*) AS count
+"""
+
+clear = """
+MATCH (entity)
+CALL {
+    WITH entity
+    DETACH DELETE entity
+} IN TRANSACTIONS OF 10000 ROWS
+"""
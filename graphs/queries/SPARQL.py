@@ -1,29 +1,70 @@
+# the queries are label-free, labels are resolved by `GraphWikidata.get_labels`
+# from its label store, which only asks the `labels` query for unknown IDs.
+# this keeps the costly `SERVICE wikibase:label` out of every lookup
 get_triplets = """
-SELECT DISTINCT ?head ?headLabel ?rel ?relLabel ?tail ?tailLabel
+SELECT DISTINCT ?head ?rel ?tail
 WHERE {{
+  {neighbors}
+}}
+"""
+
+get_triplets_many = """
+SELECT DISTINCT ?qid ?head ?rel ?tail
+WHERE {{
+  {neighbors}
+}}
+"""
+
+# the neighbors of (?qid ?rel ?p) pairs given as `(wd:Q wd:P wdt:P)`. `{page}` is
+# empty or one of the `page_*` clauses below, in which case each pair gets its
+# own block, combined with UNION, to bound the rows returned for hub entities.
+neighbors = """
   {{
-    wd:{qid} wdt:{pid} ?tail .
-  }}
-  UNION
-  {{
-    ?head wdt:{pid} wd:{qid} .
+    SELECT ?qid ?rel ?head ?tail
+    WHERE {{
+      VALUES (?qid ?rel ?p) {{ {pairs} }}
+      {{
+        ?qid ?p ?neighbor .
+        BIND(?qid AS ?head)
+        BIND(?neighbor AS ?tail)
+      }}
+      UNION
+      {{
+        ?neighbor ?p ?qid .
+        BIND(?neighbor AS ?head)
+        BIND(?qid AS ?tail)
+      }}
+    }}
+    {page}
   }}
+"""
 
-  BIND(wd:{pid} AS ?rel)
-  BIND(COALESCE(?head, wd:{qid}) AS ?head)
-  BIND(COALESCE(?tail, wd:{qid}) AS ?tail)
-
-  SERVICE wikibase:label {{
-    bd:serviceParam wikibase:language "en". 
-    ?head rdfs:label ?headLabel .
-    ?rel rdfs:label ?relLabel .
-    ?tail rdfs:label ?tailLabel .
+# counts the rows `get_triplets` returns for each pair, i.e. the distinct
+# triplets of the unpaged `neighbors`. A neighbor linked in both directions
+# counts twice, as it is part of two triplets
+count_triplets_many = """
+SELECT ?qid ?rel (COUNT(*) AS ?count)
+WHERE {{
+  SELECT DISTINCT ?qid ?rel ?head ?tail
+  WHERE {{
+    {neighbors}
   }}
 }}
+GROUP BY ?qid ?rel
 """
 
+# neighbors in IRI order, so that pages are stable
+page_by_id = "ORDER BY ?neighbor OFFSET {offset} LIMIT {limit}"
+
+# a reproducible sample of the neighbors, shuffled by a seeded hash of their IRI
+page_by_sample = (
+    'ORDER BY MD5(CONCAT(STR(?neighbor), "{seed}")) OFFSET {offset} LIMIT {limit}'
+)
+
+# `{filters}` is empty or made of the `filter_*` clauses below, which drop
+# properties before their labels are looked up (see `RelationshipFilter`)
 get_relationships = """
-SELECT DISTINCT ?prop ?propLabel
+SELECT DISTINCT ?prop
 WHERE {{
   {{ wd:{qid} ?p ?o . }}
   UNION 
@@ -31,25 +72,61 @@ WHERE {{
   
   FILTER(STRSTARTS(STR(?p), STR(wdt:)))       
   ?prop wikibase:directClaim ?p .
-  SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
+  {filters}
 }}
 """
 
-get_entities = """
-SELECT ?entity ?entityLabel 
+get_relationships_many = """
+SELECT DISTINCT ?entity ?prop
 WHERE {{
-  VALUES ?entity {{ {qids} }} 
-  SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
+  VALUES ?entity {{ {qids} }}
+  {{ ?entity ?p ?o . }}
+  UNION 
+  {{ ?o ?p ?entity . }}
+  
+  FILTER(STRSTARTS(STR(?p), STR(wdt:)))       
+  ?prop wikibase:directClaim ?p .
+  {filters}
+}}
+"""
+
+filter_ids = "FILTER(?prop NOT IN ({ids}))"
+
+filter_datatypes = """?prop wikibase:propertyType ?propType .
+  FILTER(?propType NOT IN ({datatypes}))"""
+
+# properties without an english label are kept, as their label is their PID
+filter_labels = """OPTIONAL {{
+    ?prop rdfs:label ?propFilterLabel .
+    FILTER(LANG(?propFilterLabel) = "en")
+  }}
+  FILTER(!BOUND(?propFilterLabel) || !({conditions}))"""
+
+# english labels of entities and properties. IDs without one are returned
+# unbound, IDs that are unknown or deleted (without any statement) are left out
+labels = """
+SELECT ?item ?itemLabel
+WHERE {{
+  {{
+    SELECT ?item
+    WHERE {{
+      VALUES ?item {{ {ids} }}
+      FILTER EXISTS {{ ?item ?p ?o . }}
+    }}
+  }}
+  OPTIONAL {{
+    ?item rdfs:label ?itemLabel .
+    FILTER(LANG(?itemLabel) = "en")
+  }}
 }}
 """
 
 
 find = """
-SELECT DISTINCT ?searchString ?entity ?entityLabel WHERE {{
+SELECT DISTINCT ?searchString ?entity WHERE {{
   VALUES ?searchString {{ {queries} }}
   BIND(STRLANG(?searchString, "en") AS ?lookupLabel)
   ?entity rdfs:label ?lookupLabel .
-  SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
 }}
 LIMIT 50
 """
@@ -1,9 +1,18 @@
-from typing import Dict, Type
+from typing import Callable, Dict
 from .Graph import Graph
 from .GraphNeo4j import GraphNeo4j
 from .GraphWikidata import GraphWikidata
+from .GraphWikidataSnapshot import GraphWikidataSnapshot
+from .GraphWikidataDump import GraphWikidataDump
+from .GraphMemory import GraphMemory
+from .CachingGraph import CachingGraph
 
-graph_service: Dict[str, Type[Graph]] = {
+graph_service: Dict[str, Callable[[], Graph]] = {
     "neo4j": GraphNeo4j,
     "wikidata": GraphWikidata,
+    "wikidata_snapshot": GraphWikidataSnapshot,
+    "wikidata_dump": GraphWikidataDump,
+    "memory": GraphMemory,
+    "neo4j_cached": lambda: CachingGraph(GraphNeo4j()),
+    "wikidata_cached": lambda: CachingGraph(GraphWikidata()),
 }
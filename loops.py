@@ -0,0 +1,59 @@
+from typing import Awaitable, Callable, Generic, TypeVar
+from weakref import WeakKeyDictionary
+import asyncio
+import threading
+
+T = TypeVar("T")
+
+
+class LoopResource(Generic[T]):
+    """Keeps one resource per event loop, e.g. an async client whose
+    connections are bound to the loop it was created in.
+
+    The resource of a loop is created by `create` on first use and closed by
+    `close` when the loop shuts down: `asyncio.run` cancels the remaining
+    tasks before it closes the loop, which ends a watcher task that closes
+    the resource. Loops that are closed without cancelling their tasks have
+    to call `aclose` before.
+    """
+
+    def __init__(self, create: Callable[[], T], close: Callable[[T], Awaitable]):
+        self.create = create
+        self.close = close
+        self.resources: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, tuple[T, asyncio.Task]
+        ] = WeakKeyDictionary()
+        self.lock = threading.Lock()
+
+    def get(self) -> T:
+        """Returns the resource of the running loop."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            entry = self.resources.get(loop)
+            if entry is None:
+                resource = self.create()
+                watcher = loop.create_task(self.close_on_shutdown(loop, resource))
+                entry = self.resources[loop] = (resource, watcher)
+        return entry[0]
+
+    async def close_on_shutdown(self, loop: asyncio.AbstractEventLoop, resource: T):
+        try:
+            await asyncio.Event().wait()
+        finally:
+            with self.lock:
+                entry = self.resources.pop(loop, None)
+            # unless `aclose` took it already
+            if entry is not None:
+                await self.close(resource)
+
+    async def aclose(self):
+        """Closes the resource of the running loop, if it has one."""
+        with self.lock:
+            entry = self.resources.pop(asyncio.get_running_loop(), None)
+        if entry is None:
+            return
+        entry[1].cancel()
+        await self.close(entry[0])
+
+    def __len__(self) -> int:
+        return len(self.resources)
@@ -1,5 +1,6 @@
-from typing import TypedDict, List
-from graphs.Graph import Relationship, GraphTriplet
+from typing import Callable, TypedDict, List
+from concurrent.futures import ThreadPoolExecutor
+from graphs.Graph import Relationship, RelationshipFilter, GraphTriplet, GraphTuple
 
 
 # ---------------------------------------------------------------------------- #
@@ -35,12 +36,79 @@ def get_default_result() -> Response:
     }
 
 
+def merge_results(response: Response, partial: Response):
+    """Adds the counters and errors of `partial` to `response`."""
+    response["agent_calls"] += partial["agent_calls"]
+    response["kg_calls"] += partial["kg_calls"]
+    for key in [
+        "has_err_agent",
+        "has_err_graph",
+        "has_err_tog",
+        "has_err_instruction",
+        "has_err_other",
+    ]:
+        response[key] = response[key] or partial[key]
+
+
+def run_calls(
+    calls: List[Callable[[Response], list]], response: Response, workers: int = 1
+) -> List[list]:
+    """Runs independent calls, e.g. the prune calls of the paths, and returns
+    their results in the order of `calls`. Every call counts in the response
+    it is given.
+
+    With more than one worker, the calls run in a thread pool of at most
+    `workers` threads, each counting in a response of its own, which are
+    merged into `response` in order. If a call raises, the calls that have
+    not started are cancelled, the counts of all calls that ran are kept and
+    the first exception in order is raised, like in a sequential run.
+    """
+    if workers <= 1 or len(calls) <= 1:
+        return [call(response) for call in calls]
+    partials = [get_default_result() for _ in calls]
+    executor = ThreadPoolExecutor(max_workers=min(workers, len(calls)))
+    futures = [executor.submit(call, partial) for call, partial in zip(calls, partials)]
+    exception = None
+    for future in futures:
+        exception = future.exception()
+        if exception is not None:
+            break
+    # calls that were cancelled did not count anything
+    executor.shutdown(cancel_futures=exception is not None)
+    for partial in partials:
+        merge_results(response, partial)
+    if exception is not None:
+        raise exception
+    return [future.result() for future in futures]
+
+
 # ---------------------------------------------------------------------------- #
 #                                    HELPERS                                   #
 # ---------------------------------------------------------------------------- #
-def filter_relationships(relationships: List[Relationship]) -> List[Relationship]:
-    """From original source"""
-    words = [
+def cap_fanout(
+    tuples: List[GraphTuple], counts: List[int], max_fanout: int
+) -> List[GraphTuple]:
+    """Removes the `(entity, relationship)` tuples that expand to more than
+    `max_fanout` triplets, given their `counts` (see `Graph.count_triplets`).
+    If every relationship of an entity exceeds the cap, its tuples are kept,
+    so that the entity does not become a dead end.
+    """
+    below_cap = {
+        entity.get_id()
+        for (entity, _), count in zip(tuples, counts)
+        if count <= max_fanout
+    }
+    return [
+        (entity, relationship)
+        for (entity, relationship), count in zip(tuples, counts)
+        if count <= max_fanout or entity.get_id() not in below_cap
+    ]
+
+
+# the relationships dropped by `filter_relationships`, from original source.
+# passed to `Graph.get_relationships` so that backends can drop them in the query
+relationship_filter: RelationshipFilter = {
+    "excluded_suffixes": [
         " ID",
         " code",
         " number",
@@ -51,8 +119,8 @@ def filter_relationships(relationships: List[Relationship]) -> List[Relationship
         "image",
         " rate",
         " count",
-    ]
-    useless_relation_list = [
+    ],
+    "excluded_labels": [
         "category's main topic",
         "topic's main category",
         "stack exchange site",
@@ -63,16 +131,32 @@ def filter_relationships(relationships: List[Relationship]) -> List[Relationship
         "country of origin",
         "country",
         "nationality",
-    ]
+    ],
+    "excluded_substrings": ["wikidata", "wikimedia"],
+}
+
+
+def filter_relationships(
+    relationships: List[Relationship],
+    spec: RelationshipFilter = relationship_filter,
+) -> List[Relationship]:
+    """From original source. Applies `spec` in Python, as a fallback for backends
+    that do not filter in the query. `excluded_datatypes` is only known to the
+    backends and therefore ignored here.
+    """
+    excluded_ids = set(spec.get("excluded_ids", []))
+    suffixes = tuple(spec.get("excluded_suffixes", []))
+    labels = set(spec.get("excluded_labels", []))
+    substrings = spec.get("excluded_substrings", [])
     filtered = []
     for rel in relationships:
         relStr = rel.get_label()
 
         if (
-            any([relStr.endswith(w) for w in words])
-            or "wikidata" in relStr.lower()
-            or "wikimedia" in relStr.lower()
-            or relStr.lower() in useless_relation_list
+            rel.get_id() in excluded_ids
+            or (suffixes and relStr.endswith(suffixes))
+            or relStr.lower() in labels
+            or any([word in relStr.lower() for word in substrings])
         ):
             continue
         filtered.append(rel)
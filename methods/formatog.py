@@ -3,7 +3,9 @@ from graphs.Graph import Graph, Entity, GraphTriplet, GraphTuple
 from methods.common import (
     Response,
     get_default_result,
+    cap_fanout,
     filter_relationships,
+    relationship_filter,
     triplet_to_string,
 )
 from errors import GraphException, AgentException, ToGException, InstructionError
@@ -22,11 +24,14 @@ def think_on_graph(
     seed_entities: List[Entity] = None,
     log_path: str = "",
     with_find: bool = False,
+    max_fanout: int = 0,
     **_,
 ):
     """An adjusted version of **think on graph**, where pruning is only done at most once
     for each exploration step in each iteration. This version also uses the advantage
     of structured output (json) of language model agents.
+    Relationships expanding to more than `max_fanout` triplets are skipped if
+    the entity has others (`0` disables the cap).
     """
 
     logger = get_logger(__name__, log_path)
@@ -55,52 +60,53 @@ def think_on_graph(
             logger.info(f"Depth {current_iteration}")
             response["depth"] = current_iteration
 
-            # ---------------------------------------------------------------------------- #
-            logger.info("Relationship exploration initiated")
-            candidate_tuples = relationship_search(
-                current_entities, graph, response, logger
-            )
-            selected_tuples = relationship_prune(
-                candidate_tuples, agent, prompt, max_paths, response
-            )
-            logger.info(
-                f"Relationships selected {[f"[{e.get_label()}]-[{r.get_label()}]" for e, r in selected_tuples]}"
-            )
-
-            # ---------------------------------------------------------------------------- #
-            logger.info("Entity exploration initiated")
-            candidate_triplets = entity_search(
-                selected_tuples, collected_triplets, graph, response, logger
-            )
-            selected_triplets = entity_prune(
-                candidate_triplets, agent, prompt, max_paths, response
-            )
-            selected_triplets_str_set = {
-                (h.get_label(), r.get_label(), t.get_label())
-                for h, r, t in selected_triplets
-            }
-            logger.info(f"Triplets selected {selected_triplets_str_set}")
-
-            # ---------------------------------------------------------------------------- #
-            logger.info("Reasoning over gathered data initiated")
-            collected_triplets.update(selected_triplets_str_set)
-            remaining_iter = max_depth - current_iteration
-            found_answer = reasoning(
-                collected_triplets, agent, prompt, remaining_iter, response, logger
-            )
-            if found_answer:
-                return response
-
-            logger.info(
-                f"Answering with paths not possible at depth {current_iteration}"
-            )
-            if current_iteration < max_depth:
-                logger.info("Preparing next iteration")
-                previous_entities = current_entities.copy()
-                current_entities = [
-                    get_next_entity(triplet, previous_entities)
-                    for triplet in selected_triplets
-                ]
+            with graph.session():
+                # ---------------------------------------------------------------------------- #
+                logger.info("Relationship exploration initiated")
+                candidate_tuples = relationship_search(
+                    current_entities, graph, response, logger, max_fanout
+                )
+                selected_tuples = relationship_prune(
+                    candidate_tuples, agent, prompt, max_paths, response
+                )
+                logger.info(
+                    f"Relationships selected {[f"[{e.get_label()}]-[{r.get_label()}]" for e, r in selected_tuples]}"
+                )
+
+                # ---------------------------------------------------------------------------- #
+                logger.info("Entity exploration initiated")
+                candidate_triplets = entity_search(
+                    selected_tuples, collected_triplets, graph, response, logger
+                )
+                selected_triplets = entity_prune(
+                    candidate_triplets, agent, prompt, max_paths, response
+                )
+                selected_triplets_str_set = {
+                    (h.get_label(), r.get_label(), t.get_label())
+                    for h, r, t in selected_triplets
+                }
+                logger.info(f"Triplets selected {selected_triplets_str_set}")
+
+                # ---------------------------------------------------------------------------- #
+                logger.info("Reasoning over gathered data initiated")
+                collected_triplets.update(selected_triplets_str_set)
+                remaining_iter = max_depth - current_iteration
+                found_answer = reasoning(
+                    collected_triplets, agent, prompt, remaining_iter, response, logger
+                )
+                if found_answer:
+                    return response
+
+                logger.info(
+                    f"Answering with paths not possible at depth {current_iteration}"
+                )
+                if current_iteration < max_depth:
+                    logger.info("Preparing next iteration")
+                    previous_entities = current_entities.copy()
+                    current_entities = [
+                        get_next_entity(triplet, previous_entities)
+                        for triplet in selected_triplets
+                    ]
 
         # ---------------------------------------------------------------------------- #
         logger.info("Maximum depth reached")
@@ -167,15 +173,22 @@ def recognize_and_link_entities(
 
 
 def relationship_search(
-    entities: List[Entity], graph: Graph, response: Response, logger: Logger
+    entities: List[Entity],
+    graph: Graph,
+    response: Response,
+    logger: Logger,
+    max_fanout: int = 0,
 ):
     """Searches the graph for all unique in and outgoing relationship types of
     the given entities, through which it then generates a list of candidate
-    tuples for further processing with the agent.
+    tuples for further processing with the agent. All entities are looked up
+    with a single graph call. With `max_fanout`, the triplets of all tuples are
+    counted with a second call and hub relationships are removed.
     """
 
     candidate_tuples: List[GraphTuple] = []
     checked_entities: Set[str] = set()
+    unique_entities: List[Entity] = []
     for entity in entities:
         entityStr = entity.get_label()
         if entityStr in checked_entities:
@@ -183,20 +196,31 @@ def relationship_search(
             continue
         else:
             checked_entities.add(entityStr)
-        logger.info(f"Checking entity {entityStr}")
-        relationships = []
-        response["kg_calls"] += 1
-        relationships = graph.get_relationships(entity)
-        logger.info("Removing unnecessary relationships (meta data etc.)")
+            unique_entities.append(entity)
+    logger.info(f"Checking entities {[e.get_label() for e in unique_entities]}")
+    response["kg_calls"] += 1
+    relationships_per_entity = graph.get_relationships_many(
+        unique_entities, relationship_filter=relationship_filter
+    )
+    logger.info("Removing unnecessary relationships (meta data etc.)")
+    for entity, relationships in zip(unique_entities, relationships_per_entity):
         relationships = filter_relationships(relationships)
         candidate_tuples.extend(
             [(entity, relationship) for relationship in relationships]
         )
         logger.info(
-            f"Found {len(relationships)} relationships connected to {entityStr}"
+            f"Found {len(relationships)} relationships connected to {entity.get_label()}"
         )
     if len(candidate_tuples) == 0:
         raise ToGException("No relationships found", candidate_tuples)
+    if max_fanout:
+        response["kg_calls"] += 1
+        counts = graph.count_triplets_many(candidate_tuples)
+        capped_tuples = cap_fanout(candidate_tuples, counts, max_fanout)
+        logger.info(
+            f"Removed {len(candidate_tuples) - len(capped_tuples)} relationships with more than {max_fanout} triplets"
+        )
+        candidate_tuples = capped_tuples
     logger.info(f"Collected a total of {len(candidate_tuples)} candidate relationships")
     return candidate_tuples
 
@@ -247,19 +271,22 @@ def entity_search(
 ):
     """Searches the graph for all triplets that contain a selected tuple
     and then generates a list of unique candidate triplets with all triplets
-    that have already been collected filtered out.
+    that have already been collected filtered out. All tuples are looked up
+    with a single graph call.
     Raises a `ToGException`, if the candidate triplet list is empty, because
     this would imply that there is no change of the current state.
     """
 
     candidate_triplets: List[GraphTriplet] = []
     checked_triplets: Set[Tuple[str, str, str]] = collected_triplets.copy()
-    for entity, relationship in selected_tuples:
+    logger.info(
+        f"Searching for triplets containing {[f"[{e.get_label()}]-[{r.get_label()}]" for e, r in selected_tuples]}"
+    )
+    response["kg_calls"] += 1
+    triplets_per_tuple = graph.get_triplets_many(selected_tuples)
+    for (entity, relationship), triplets in zip(selected_tuples, triplets_per_tuple):
         entityStr = entity.get_label()
         relStr = relationship.get_label()
-        logger.info(f"Searching for triplets containing {entityStr}, {relStr}")
-        response["kg_calls"] += 1
-        triplets = graph.get_triplets(entity, relationship)
         triplets = [
             triplet
             for triplet in triplets
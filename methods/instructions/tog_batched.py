@@ -0,0 +1,154 @@
+from typing import List
+from agents.Agent import InstructionConfig
+from methods.instructions.tog import (
+    Possible_Relationships,
+    Possible_Triplets,
+    StringTriplet,
+    system_message,
+    use_template_answer,
+)
+
+
+def use_template_pick_relationships(**kwargs):
+    prompt: str = kwargs.get("prompt")
+    relationships: List[Possible_Relationships] = kwargs.get("relationships")
+    amount = kwargs.get("amount")
+    result = """Please retrieve {amount} relations (separated by semicolon) of all topic entities that contribute to the question and rate their contribution on a scale from 0 to 1 (the sum of the scores of {amount} relations is 1). Prefix each relation with the number of its topic entity.
+Q: Mesih Pasha's uncle became emperor in what year?
+Topic Entity 1: Mesih Pasha
+Relations:
+1. wiki.relation.child
+2. wiki.relation.country_of_citizenship
+3. wiki.relation.date_of_birth
+4. wiki.relation.family
+5. wiki.relation.father
+6. wiki.relation.languages_spoken, written_or_signed
+7. wiki.relation.military_rank
+8. wiki.relation.occupation
+9. wiki.relation.place_of_death
+10. wiki.relation.position_held
+11. wiki.relation.religion_or_worldview
+12. wiki.relation.sex_or_gender
+13. wiki.relation.sibling
+14. wiki.relation.significant_event
+A: 1. {{1: wiki.relation.family (Score: 0.5)}}: This relation is highly relevant as it can provide information about the family background of Mesih Pasha, including his uncle who became emperor.
+2. {{1: wiki.relation.father (Score: 0.4)}}: Uncle is father's brother, so father might provide some information as well.
+3. {{1: wiki.relation.position held (Score: 0.1)}}: This relation is moderately relevant as it can provide information about any significant positions held by Mesih Pasha or his uncle that could be related to becoming an emperor.
+
+Q: Van Andel Institute was founded in part by what American businessman, who was best known as co-founder of the Amway Corporation?
+Topic Entity 1: Van Andel Institute
+Relations:
+1. wiki.relation.affiliation
+2. wiki.relation.country
+3. wiki.relation.donations
+4. wiki.relation.educated_at
+5. wiki.relation.headquarters_location
+Topic Entity 2: Amway
+Relations:
+1. wiki.relation.founded_by
+2. wiki.relation.headquarters_location
+3. wiki.relation.industry
+A: 1. {{2: wiki.relation.founded_by (Score: 0.5)}}: This relation is highly relevant because it can provide the co-founders of the Amway Corporation, one of whom is the American businessman in question.
+2. {{1: wiki.relation.affiliation (Score: 0.3)}}: This relation is relevant because it can provide information about the individuals or organizations associated with the Van Andel Institute, including the American businessman who co-founded the Amway Corporation.
+3. {{1: wiki.relation.donations (Score: 0.2)}}: This relation is relevant because it can provide information about the financial contributions made to the Van Andel Institute, which may include donations from the American businessman in question.
+
+Q: """.format(
+        amount=amount
+    )
+    result += f"{prompt}\n"
+    for number, entity_relationships in enumerate(relationships):
+        result += f"Topic Entity {number + 1}: {entity_relationships["entity"]}\n"
+        result += "Relations:\n"
+        for index, relationship in enumerate(entity_relationships["relationships"]):
+            result += f"{index + 1}. wiki.relation.{relationship.replace(" ", "_")}\n"
+    result += "A: "
+    return result
+
+
+def use_template_pick_triplets(**kwargs):
+    prompt: str = kwargs.get("prompt")
+    triplets: List[Possible_Triplets] = kwargs.get("triplets")
+    result = """Please score the entities' contribution to the question on a scale from 0 to 1 (the sum of the scores of the entities of each relation is 1). Give one line of scores per relation, prefixed by the number of the relation.
+Q: Staten Island Summer, starred what actress who was a cast member of "Saturday Night Live"?
+Relation 1: Staten Island Summer, cast member
+Entities: Ashley Greene; Bobby Moynihan; Camille Saviola; Cecily Strong; Colin Jost; Fred Armisen; Gina Gershon; Graham Phillips; Hassan Johnson; Jackson Nicoll; Jim Gaffigan; John DeLuca; Kate Walsh; Mary Birdsong
+Relation 2: Staten Island Summer, genre
+Entities: comedy film; coming-of-age story
+Score 1: 0.0, 0.0, 0.0, 0.4, 0.0, 0.2, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.4, 0.0
+Score 2: 0.5, 0.5
+To score the entities\' contribution to the question, we need to determine which entities are relevant to the question and have a higher likelihood of being the correct answer.
+In this case, we are looking for an actress who was a cast member of "Saturday Night Live" and starred in the movie "Staten Island Summer." Based on this information, we can eliminate entities that are not actresses or were not cast members of "Saturday Night Live."
+The relevant entities that meet these criteria are:\n- Ashley Greene\n- Cecily Strong\n- Fred Armisen\n- Gina Gershon\n- Kate Walsh\n\nTo distribute the scores, we can assign a higher score to entities that are more likely to be the correct answer. In this case, the most likely answer would be an actress who was a cast member of "Saturday Night Live" around the time the movie was released.
+Based on this reasoning, the scores could be assigned as follows:\n- Ashley Greene: 0\n- Cecily Strong: 0.4\n- Fred Armisen: 0.2\n- Gina Gershon: 0\n- Kate Walsh: 0.4
+The genres do not help to identify the actress, so their scores are equal.
+
+"""
+    result += f"Q: {prompt}\n"
+    for number, entity_rel_entities in enumerate(triplets):
+        result += f"Relation {number + 1}: {entity_rel_entities["entity"]}, "
+        result += f"{entity_rel_entities["relationship"]}\nEntities: "
+        result += "; ".join(entity_rel_entities["entities"]) + "\n"
+    result += "Score 1: "
+    return result
+
+
+def use_template_reflect(**kwargs):
+    prompt: str = kwargs.get("prompt")
+    triplets: List[StringTriplet] = kwargs.get("triplets")
+    result = """Given a question and the associated retrieved knowledge graph triplets (entity, relation, entity), you are asked to answer whether it's sufficient for you to answer the question with these triplets and your knowledge (Yes or No). If it is, also answer the question and mark the answer with curly braces.
+Q: Viscount Yamaji Motoharu was a general in the early Imperial Japanese Army which belonged to which Empire?
+Knowledge Triplets: Imperial Japanese Army, allegiance, Emperor of Japan
+Yamaji Motoharu, allegiance, Emperor of Japan
+Yamaji Motoharu, military rank, general
+A: {Yes}. Based on the given knowledge triplets and my knowledge, Viscount Yamaji Motoharu, who was a general in the early Imperial Japanese Army, belonged to the Empire of Japan. Therefore, the answer to the question is {Empire of Japan}.
+
+Q: Who is the coach of the team owned by Steve Bisciotti?
+Knowledge Triplets: psilocybin, described by source, Opium Law,
+psilocybin, found in taxon, Gymnopilus purpuratus,
+psilocybin, found in taxon, Gymnopilus spectabilis,
+Opium Law, part of, norcodeine (stereochemistry defined),
+Gymnopilus purpuratus, edibility, psychoactive mushroom,
+Gymnopilus spectabilis, parent taxon, Gymnopilus
+A: {No}. Based on the given knowledge triplets and my knowledge, the specific psychedelic compound found in the Psilocybin genus mushroom that is converted to psilocin by the body is not explicitly mentioned. Therefore, additional knowledge about the specific compounds and their conversion to psilocin is required to answer the question.
+
+Q: Which tennis player is younger, John Newcombe or Květa Peschke?
+Knowledge Triplets: Květa Peschke, date of birth, +1975-07-09T00:00:00Z,
+John Newcombe, date of birth, +1944-05-23T00:00:00Z,
+John Newcombe, country of citizenship, Australia
+A: {Yes}. Based on the given knowledge triplets and my knowledge, John Newcombe was born on May 23, 1944, and Květa Peschke was born on July 9, 1975. Therefore, {Květa Peschke} is younger than John Newcombe.
+
+Q: At what stadium did Mychal George Thompson play home games with the San Antonio Spurs?
+Knowledge Triplets: San Antonio Spurs, home venue, AT&T Center
+San Antonio Spurs, home venue, Alamodome
+San Antonio Spurs, home venue, Fort Worth Convention Center
+AT&T Center, occupant, San Antonio Spurs
+Fort Worth Convention Center, located in the administrative territorial entity, Texas
+Fort Worth Convention Center, occupant, San Antonio Spurs
+A: {Yes}. Based on the given knowledge triplets and my knowledge, Mychal George Thompson played home games with the San Antonio Spurs at the AT&T Center. Therefore, the answer to the question is {AT&T Center}.
+
+"""
+    result += f"Q: {prompt}\nKnowledge Triplets: "
+    for triplet in triplets:
+        result += f"{triplet[0]}, {triplet[1]}, {triplet[2]}\n"
+    result += "A: "
+    return result
+
+
+config: InstructionConfig = {
+    "system": {
+        "answer": lambda **_: system_message,
+        "reflect": lambda **_: system_message,
+        "pick_relationships": lambda **_: system_message,
+        "pick_triplets": lambda **_: system_message,
+        "pick_seed_entities": lambda **_: system_message,
+        "retrieve_queries": lambda **_: system_message,
+    },
+    "user": {
+        "answer": use_template_answer,
+        "reflect": use_template_reflect,
+        "pick_relationships": use_template_pick_relationships,
+        "pick_triplets": use_template_pick_triplets,
+        "pick_seed_entities": lambda **_: "",
+        "retrieve_queries": lambda **_: "",
+    },
+}
@@ -4,12 +4,16 @@ from errors import ToGException, AgentException, GraphException, InstructionErro
 from methods.common import (
     Response,
     get_default_result,
+    cap_fanout,
     filter_relationships,
+    relationship_filter,
+    run_calls,
     triplet_to_string,
 )
 from logging import Logger
 from logger import get_logger
 from typing import List
+from functools import partial
 import re
 import copy
 
@@ -24,8 +28,17 @@ def think_on_graph(
     max_depth: int,
     seed_entities: List[Entity] = None,
     log_path: str = "",
+    max_fanout: int = 0,
+    prune_workers: int = 1,
     **_,
 ) -> Response:
+    """Think on graph as in the original paper, pruning the relationships and
+    triplets of each path separately. Relationships expanding to more than
+    `max_fanout` triplets are skipped if the entity has others (`0` disables
+    the cap). The prune calls of one step are independent and run in up to
+    `prune_workers` threads, their results are merged in path order, so the
+    outcome is the same as with sequential calls (see `run_calls`).
+    """
     logger = get_logger(__name__, log_path)
     response = get_default_result()
     try:
@@ -42,63 +55,86 @@ def think_on_graph(
             logger.info(f"Iteration {current_iteration}")
             response["depth"] = current_iteration
 
-            # ---------------------------------------------------------------------------- #
-            logger.info(f"Relationship exploration initiated")
-            candidate_relationships = []
-            for index, entity in enumerate(current_entities):
-                logger.info(f"Checking entity {entity.get_label()} of path {index}")
-                relationships = relationship_search(
-                    entity, graph, paths[index], response, logger
+            with graph.session():
+                # ---------------------------------------------------------------------------- #
+                logger.info(f"Relationship exploration initiated")
+                candidate_relationships = []
+                relationships_per_path = relationship_search(
+                    current_entities, graph, paths, response, logger, max_fanout
                 )
-                parsed_relationship_picks = relationship_prune(
-                    entity,
-                    relationships,
-                    agent,
-                    prompt,
-                    max_paths,
-                    index,
+                picks_per_path = run_calls(
+                    [
+                        partial(
+                            relationship_prune,
+                            entity,
+                            relationships_per_path[index],
+                            agent,
+                            prompt,
+                            max_paths,
+                            index,
+                            logger=logger,
+                        )
+                        for index, entity in enumerate(current_entities)
+                    ],
                     response,
-                    logger,
+                    prune_workers,
                 )
-                candidate_relationships.extend(parsed_relationship_picks)
-
-            if len(candidate_relationships) == 0:
-                raise ToGException(
-                    "No relationships were selected", candidate_relationships
+                for parsed_relationship_picks in picks_per_path:
+                    candidate_relationships.extend(parsed_relationship_picks)
+
+                if len(candidate_relationships) == 0:
+                    raise ToGException(
+                        "No relationships were selected", candidate_relationships
+                    )
+                selected_relationships = sorted(
+                    candidate_relationships, key=lambda x: x["score"], reverse=True
+                )[:max_paths]
+
+                # ---------------------------------------------------------------------------- #
+                logger.info(f"Entity exploration initiated")
+                candidate_triplets = []
+                triplets_per_relationship = entity_search(
+                    selected_relationships, graph, response, logger
                 )
-            selected_relationships = sorted(
-                candidate_relationships, key=lambda x: x["score"], reverse=True
-            )[:max_paths]
-
-            # ---------------------------------------------------------------------------- #
-            logger.info(f"Entity exploration initiated")
-            candidate_triplets = []
-            for entity_relationship in selected_relationships:
-                triplets = entity_search(entity_relationship, graph, response, logger)
-                parsed_triplet_picks = entity_prune(
-                    entity_relationship, triplets, agent, prompt, response, logger
+                picks_per_relationship = run_calls(
+                    [
+                        partial(
+                            entity_prune,
+                            entity_relationship,
+                            triplets,
+                            agent,
+                            prompt,
+                            logger=logger,
+                        )
+                        for entity_relationship, triplets in zip(
+                            selected_relationships, triplets_per_relationship
+                        )
+                    ],
+                    response,
+                    prune_workers,
                 )
-                candidate_triplets.extend(parsed_triplet_picks)
-
-            if len(candidate_triplets) == 0:
-                raise ToGException("No triplets were selected", candidate_triplets)
-            selected_triplets = sorted(
-                candidate_triplets, key=lambda x: x["score"], reverse=True
-            )[:max_paths]
-
-            # ---------------------------------------------------------------------------- #
-            path_triplets = update_paths(paths, selected_triplets, logger)
-            if reasoning(agent, prompt, path_triplets, response, logger):
-                logger.info(f"Can answer with path triplets")
-                generate(agent, prompt, path_triplets, response)
-                return response
-
-            logger.info(
-                f"Answering with paths not possible at depth {current_iteration}"
-            )
-            current_entities = [
-                triplet["scored_entity"] for triplet in selected_triplets
-            ]
+                for parsed_triplet_picks in picks_per_relationship:
+                    candidate_triplets.extend(parsed_triplet_picks)
+
+                if len(candidate_triplets) == 0:
+                    raise ToGException("No triplets were selected", candidate_triplets)
+                selected_triplets = sorted(
+                    candidate_triplets, key=lambda x: x["score"], reverse=True
+                )[:max_paths]
+
+                # ---------------------------------------------------------------------------- #
+                path_triplets = update_paths(paths, selected_triplets, logger)
+                if reasoning(agent, prompt, path_triplets, response, logger):
+                    logger.info(f"Can answer with path triplets")
+                    generate(agent, prompt, path_triplets, response)
+                    return response
+
+                logger.info(
+                    f"Answering with paths not possible at depth {current_iteration}"
+                )
+                current_entities = [
+                    triplet["scored_entity"] for triplet in selected_triplets
+                ]
 
         # ---------------------------------------------------------------------------- #
         logger.info("Maximum depth reached")
@@ -140,20 +176,55 @@ def think_on_graph(
 
 
 def relationship_search(
-    entity: Entity, graph: Graph, path: Path, response: Response, logger: Logger
-):
+    entities: List[Entity],
+    graph: Graph,
+    paths: List[Path],
+    response: Response,
+    logger: Logger,
+    max_fanout: int = 0,
+) -> List[List[Relationship]]:
+    """Fetches the relationships of the current entity of every path with a
+    single graph call. The result is aligned with `entities`. With
+    `max_fanout`, the triplets of all relationships are counted with a second
+    call and hub relationships are removed.
+    """
     response["kg_calls"] += 1
-    relationships = graph.get_relationships(entity)
+    relationships_per_entity = graph.get_relationships_many(
+        entities, relationship_filter=relationship_filter
+    )
     logger.info("Filtering relationships")
-    relationships = filter_relationships(relationships)
-    if len(path) > 0:
-        relationships = [
-            relationship
+    results = []
+    for index, relationships in enumerate(relationships_per_entity):
+        relationships = filter_relationships(relationships)
+        path = paths[index]
+        if len(path) > 0:
+            relationships = [
+                relationship
+                for relationship in relationships
+                if path[-1][1] != relationship.get_label()
+            ]
+        logger.info(f"Found {len(relationships)} relationships for path {index}")
+        results.append(relationships)
+    if max_fanout:
+        tuples = [
+            (entity, relationship)
+            for entity, relationships in zip(entities, results)
             for relationship in relationships
-            if path[-1][1] != relationship.get_label()
         ]
-    logger.info(f"Found {len(relationships)} relationships")
-    return relationships
+        response["kg_calls"] += 1
+        counts = graph.count_triplets_many(tuples)
+        for index, (entity, relationships) in enumerate(zip(entities, results)):
+            capped_tuples = cap_fanout(
+                [(entity, relationship) for relationship in relationships],
+                counts[: len(relationships)],
+                max_fanout,
+            )
+            counts = counts[len(relationships) :]
+            logger.info(
+                f"Removed {len(relationships) - len(capped_tuples)} relationships with more than {max_fanout} triplets for path {index}"
+            )
+            results[index] = [relationship for _, relationship in capped_tuples]
+    return results
 
 
 def relationship_prune(
@@ -166,6 +237,7 @@ def relationship_prune(
     response: Response,
     logger: Logger,
 ):
+    logger.info(f"Checking entity {entity.get_label()} of path {index}")
     response["agent_calls"] += 1
     pick_relationships_response = agent.run(
         "pick_relationships",
@@ -198,17 +270,25 @@ def relationship_prune(
 
 
 def entity_search(
-    entity_relationship: dict, graph: Graph, response: Response, logger: Logger
-):
-    entity: Entity = entity_relationship["entity"]
-    entityString = entity.get_label()
-    relationship: Relationship = entity_relationship["relationship"]
+    entity_relationships: List[dict], graph: Graph, response: Response, logger: Logger
+) -> List[List[GraphTriplet]]:
+    """Fetches the triplets of all selected entity relationship pairs with a
+    single graph call. The result is aligned with `entity_relationships`.
+    """
     response["kg_calls"] += 1
-    triplets = graph.get_triplets(entity, relationship)
-    logger.info(
-        f"Choosing triplets containing {entityString}, {relationship.get_label()}"
+    triplets_per_relationship = graph.get_triplets_many(
+        [
+            (entity_relationship["entity"], entity_relationship["relationship"])
+            for entity_relationship in entity_relationships
+        ]
     )
-    return triplets
+    for entity_relationship in entity_relationships:
+        entity: Entity = entity_relationship["entity"]
+        relationship: Relationship = entity_relationship["relationship"]
+        logger.info(
+            f"Choosing triplets containing {entity.get_label()}, {relationship.get_label()}"
+        )
+    return triplets_per_relationship
 
 
 def entity_prune(
@@ -0,0 +1,402 @@
+from agents.Agent import Agent
+from graphs.Graph import Graph, Entity, Relationship, GraphTriplet
+from errors import ToGException, AgentException, GraphException, InstructionError
+from methods.common import Response, get_default_result
+from methods.tog import (
+    Path,
+    relationship_search,
+    entity_search,
+    update_paths,
+    generate,
+    parse_response_pick_triplets,
+)
+from logging import Logger
+from logger import get_logger
+from typing import Dict, List, Tuple
+import re
+
+
+def think_on_graph(
+    prompt: str,
+    agent: Agent,
+    graph: Graph,
+    max_paths: int,
+    max_depth: int,
+    seed_entities: List[Entity] = None,
+    log_path: str = "",
+    max_fanout: int = 0,
+    **_,
+) -> Response:
+    """Think on graph with one agent call per step instead of one per path.
+    The relationships of all paths are scored in one prompt, the entities of
+    all selected relationships in another, and the reflection answers the
+    question if the paths suffice. That is 3 agent calls per depth instead of
+    up to `2 * max_paths + 2`, the scoring and ranking are those of `tog`.
+    """
+    logger = get_logger(__name__, log_path)
+    response = get_default_result()
+    try:
+        if not len(seed_entities):
+            raise ToGException("No seed entities given.")
+        logger.info(f"Using seed entities {[e.get_label() for e in seed_entities]}")
+
+        paths: List[Path] = [[] for _ in range(max_paths)]
+        logger.info(f"Paths initialized with {len(paths)} empty paths")
+        current_entities: List[Entity] = seed_entities[:max_paths]
+
+        for iteration in range(max_depth):
+            current_iteration = iteration + 1
+            logger.info(f"Iteration {current_iteration}")
+            response["depth"] = current_iteration
+
+            with graph.session():
+                # ---------------------------------------------------------------------------- #
+                logger.info("Relationship exploration initiated")
+                relationships_per_path = relationship_search(
+                    current_entities, graph, paths, response, logger, max_fanout
+                )
+                candidate_relationships = relationship_prune(
+                    current_entities,
+                    relationships_per_path,
+                    agent,
+                    prompt,
+                    max_paths,
+                    response,
+                    logger,
+                )
+
+                if len(candidate_relationships) == 0:
+                    raise ToGException(
+                        "No relationships were selected", candidate_relationships
+                    )
+                selected_relationships = sorted(
+                    candidate_relationships, key=lambda x: x["score"], reverse=True
+                )[:max_paths]
+
+                # ---------------------------------------------------------------------------- #
+                logger.info("Entity exploration initiated")
+                triplets_per_relationship = entity_search(
+                    selected_relationships, graph, response, logger
+                )
+                candidate_triplets = entity_prune(
+                    selected_relationships,
+                    triplets_per_relationship,
+                    agent,
+                    prompt,
+                    response,
+                    logger,
+                )
+
+                if len(candidate_triplets) == 0:
+                    raise ToGException("No triplets were selected", candidate_triplets)
+                selected_triplets = sorted(
+                    candidate_triplets, key=lambda x: x["score"], reverse=True
+                )[:max_paths]
+
+                # ---------------------------------------------------------------------------- #
+                path_triplets = update_paths(paths, selected_triplets, logger)
+                if reasoning(agent, prompt, path_triplets, response, logger):
+                    logger.info("Can answer with path triplets")
+                    return response
+
+                logger.info(
+                    f"Answering with paths not possible at depth {current_iteration}"
+                )
+                current_entities = [
+                    triplet["scored_entity"] for triplet in selected_triplets
+                ]
+
+        # ---------------------------------------------------------------------------- #
+        logger.info("Maximum depth reached")
+    except AgentException as e:
+        response["has_err_agent"] = True
+        logger.warning(f"Agent Exception: {e}")
+    except GraphException as e:
+        response["has_err_graph"] = True
+        logger.warning(f"Graph Exception: {e}")
+    except ToGException as e:
+        response["has_err_tog"] = True
+        logger.warning(f"ToG Exception: {e}")
+    except InstructionError as e:
+        response["has_err_instruction"] = True
+        logger.warning(f"Instruction Error: {e}")
+    except Exception as e:
+        response["has_err_other"] = True
+        logger.error(f"Unexpected error: {e}")
+
+    logger.info("Using only agent knowledge to answer question")
+    response["is_kg_based_answer"] = False
+    try:
+        generate(agent, prompt, None, response)
+    except AgentException as e:
+        response["has_err_agent"] = True
+        logger.warning(f"Agent Exception: {e}")
+    except InstructionError as e:
+        response["has_err_instruction"] = True
+        logger.warning(f"Instruction Error: {e}")
+    except Exception as e:
+        response["has_err_other"] = True
+        logger.error(f"Unexpected error: {e}")
+    return response
+
+
+# ---------------------------------------------------------------------------- #
+#                                BATCHED TOG OPS                               #
+# ---------------------------------------------------------------------------- #
+
+
+def relationship_prune(
+    entities: List[Entity],
+    relationships_per_path: List[List[Relationship]],
+    agent: Agent,
+    prompt: str,
+    max_paths: int,
+    response: Response,
+    logger: Logger,
+) -> List[dict]:
+    """Scores the relationships of all paths with a single agent call. Paths
+    without relationships are left out of the prompt.
+    """
+    path_indices = [
+        index
+        for index, relationships in enumerate(relationships_per_path)
+        if len(relationships) > 0
+    ]
+    if len(path_indices) == 0:
+        return []
+    response["agent_calls"] += 1
+    pick_relationships_response = agent.run(
+        "pick_relationships",
+        prompt,
+        relationships=[
+            {
+                "entity": entities[index].get_label(),
+                "relationships": [
+                    rel.get_label() for rel in relationships_per_path[index]
+                ],
+            }
+            for index in path_indices
+        ],
+        amount=max_paths,
+    )
+    logger.info("parsing agent's pick_relationships response")
+    parsed_relationships = []
+    try:
+        parsed_relationships = parse_response_pick_relationships(
+            pick_relationships_response,
+            relationships_per_path,
+            entities,
+            path_indices,
+        )
+    except InstructionError as e:
+        logger.warning(f"Instruction Error while parsing: {e}")
+        logger.warning("Continueing despite error.")
+        response["has_err_instruction"] = True
+    except Exception as e:
+        raise Exception("Error while parsing", e)
+    return parsed_relationships
+
+
+def entity_prune(
+    entity_relationships: List[dict],
+    triplets_per_relationship: List[List[GraphTriplet]],
+    agent: Agent,
+    prompt: str,
+    response: Response,
+    logger: Logger,
+) -> List[dict]:
+    """Scores the entities of all selected relationships with a single agent
+    call. Relationships without triplets are left out of the prompt.
+    """
+    groups = [
+        (entity_relationship, triplets)
+        for entity_relationship, triplets in zip(
+            entity_relationships, triplets_per_relationship
+        )
+        if len(triplets) > 0
+    ]
+    if len(groups) == 0:
+        return []
+    response["agent_calls"] += 1
+    pick_triplets_response = agent.run(
+        "pick_triplets",
+        prompt,
+        triplets=[
+            {
+                "entity": entity_relationship["entity"].get_label(),
+                "relationship": entity_relationship["relationship"].get_label(),
+                "entities": [
+                    triplet[0].get_label()
+                    for triplet in triplets
+                    if triplet[0].get_label()
+                    != entity_relationship["entity"].get_label()
+                ]
+                + [
+                    triplet[2].get_label()
+                    for triplet in triplets
+                    if triplet[2].get_label()
+                    != entity_relationship["entity"].get_label()
+                ],
+            }
+            for entity_relationship, triplets in groups
+        ],
+    )
+
+    logger.info("parsing agent's pick_triplets response")
+    parsed_triplets = []
+    score_lines = split_response_pick_triplets(pick_triplets_response)
+    for number, (entity_relationship, triplets) in enumerate(groups):
+        try:
+            parsed_triplets += parse_response_pick_triplets(
+                score_lines.get(number + 1, ""),
+                triplets,
+                entity_relationship["entity"],
+                entity_relationship["relationship"],
+                entity_relationship["path_index"],
+            )
+        except InstructionError as e:
+            # only this relation loses its scores, like a single call of `tog`
+            logger.warning(
+                f"Instruction Error while parsing relation {number + 1}: {e}"
+            )
+            logger.warning("Continueing with equal scores for the relation.")
+            response["has_err_instruction"] = True
+            parsed_triplets += equal_scores(entity_relationship, triplets)
+        except Exception as e:
+            raise Exception("Error while parsing", e)
+    return parsed_triplets
+
+
+def reasoning(
+    agent: Agent,
+    prompt: str,
+    path_triplets: list,
+    response: Response,
+    logger: Logger,
+) -> bool:
+    """Reflects if the paths suffice and, if so, answers with the same call.
+    A positive reflection without a marked answer is answered separately.
+    """
+    logger.info("Reflecting if paths can be used for answer")
+    response["agent_calls"] += 1
+    agents_response = agent.run("reflect", prompt, triplets=path_triplets)
+    is_sufficient, answer = parse_response_reflect_answer(agents_response)
+    if not is_sufficient:
+        return False
+    if answer is None:
+        logger.info("Reflection contains no answer, generating it separately")
+        generate(agent, prompt, path_triplets, response)
+        return True
+    response["user_answer"] = agents_response
+    response["machine_answer"] = answer
+    return True
+
+
+# ---------------------------------------------------------------------------- #
+#                                    HELPERS                                   #
+# ---------------------------------------------------------------------------- #
+
+
+def parse_response_pick_relationships(
+    response: str,
+    relationships_per_path: List[List[Relationship]],
+    entities: List[Entity],
+    path_indices: List[int],
+) -> List[dict]:
+    """Like the parsing of `tog`, each relation is prefixed by the number of its
+    topic entity in the prompt. Relations of unknown topic entities or that
+    are not among their relationships are skipped.
+    """
+    pattern = r"{\s*(?P<number>\d+)\s*:\s*(?P<relation>[^()]+)\s+\(Score:\s+(?P<score>[0-9.]+)\)}"
+    relations = []
+    for match in re.finditer(pattern, response):
+        number = int(match.group("number"))
+        if number < 1 or number > len(path_indices):
+            continue
+        path_index = path_indices[number - 1]
+        relation = match.group("relation").strip()
+        relation = relation.replace("wiki.relation.", "").replace("_", " ")
+        if ";" in relation:
+            continue
+        relation = next(
+            (
+                relationship
+                for relationship in relationships_per_path[path_index]
+                if relationship.get_label() == relation
+            ),
+            None,
+        )
+        if not relation:
+            continue
+        try:
+            score = float(match.group("score"))
+        except ValueError:
+            raise InstructionError("Invalid score format", match.group("score"))
+        relations.append(
+            {
+                "entity": entities[path_index],
+                "relationship": relation,
+                "score": score,
+                "path_index": path_index,
+            }
+        )
+    if len(relations) == 0:
+        raise InstructionError(
+            "No relationships extracted or response format not as instructed."
+        )
+    return relations
+
+
+def split_response_pick_triplets(response: str) -> Dict[int, str]:
+    """Returns the score lines of the batched `pick_triplets` response by the
+    number of their relation. The prompt ends with the prefix of the first
+    line, which the response usually leaves out.
+    """
+    if not re.match(r"\s*Score\s*1\s*:", response):
+        response = "Score 1: " + response
+    lines = {}
+    for match in re.finditer(r"Score\s*(\d+)\s*:([^\n]*)", response):
+        lines.setdefault(int(match.group(1)), match.group(2))
+    return lines
+
+
+def equal_scores(entity_relationship: dict, triplets: List[GraphTriplet]) -> List[dict]:
+    """Scores the entities of a relation equally, for score lines that cannot
+    be parsed. The entities are those listed in the prompt.
+    """
+    entity: Entity = entity_relationship["entity"]
+    scored_entities = [
+        (triplet[0], False)
+        for triplet in triplets
+        if triplet[0].get_label() != entity.get_label()
+    ] + [
+        (triplet[2], True)
+        for triplet in triplets
+        if triplet[2].get_label() != entity.get_label()
+    ]
+    return [
+        {
+            "entity": entity,
+            "relationship": entity_relationship["relationship"],
+            "scored_entity": scored_entity,
+            "score": 1 / len(scored_entities),
+            "is_scored_tail": is_scored_tail,
+            "path_index": entity_relationship["path_index"],
+        }
+        for scored_entity, is_scored_tail in scored_entities
+    ]
+
+
+def parse_response_reflect_answer(response: str) -> Tuple[bool, str | None]:
+    """Returns if the reflection is positive and the marked answer following
+    the `{Yes}`, if any.
+    """
+    marked = re.findall(r"{([^{}]*)}", response)
+    if len(marked) == 0:
+        raise InstructionError("No marked answer found", response)
+    if marked[0].strip().lower() == "no":
+        return False, None
+    if marked[0].strip().lower() != "yes":
+        raise InstructionError("No {yes} or {no} included in reflection step.")
+    answer = marked[1].strip() if len(marked) > 1 else ""
+    return True, answer or None
@@ -0,0 +1,46 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """A thread-safe token bucket limiting requests to `rate` per second with
+    bursts of up to `burst` requests (`rate` of `0` disables the limit).
+
+    Callers take a token with `reserve` and wait for the returned delay, so the
+    limiter works for threads (`time.sleep`) as well as for coroutines
+    (`asyncio.sleep`). A server asking to back off (e.g. with `Retry-After`)
+    can `pause` all callers at once.
+    """
+
+    def __init__(self, rate: float = 0, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token and returns the seconds to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            wait = max(self.paused_until - now, 0)
+            if not self.rate:
+                return wait
+            elapsed = max(now - self.updated, 0)
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = max(self.updated, now)
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def pause(self, seconds: float):
+        """Delays all reservations until `seconds` from now. Tokens are not
+        refilled during the pause, so callers resume at the configured rate.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = min(self.tokens, 0)
+            self.updated = max(self.updated, self.paused_until)
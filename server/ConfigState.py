@@ -8,7 +8,7 @@ from typing import List, Literal
 class Config(BaseModel):
     agent_provider: Literal["ollama", "google"]
     model: str
-    graph_db: Literal["neo4j", "wikidata"]
+    graph_db: Literal["neo4j", "wikidata", "memory"]
     max_paths: int
     max_depth: int
     use_context: bool
@@ -0,0 +1,40 @@
+from graphs.Graph import Graph
+from graphs.GraphWikidata import Entity, Relationship
+
+# Germany -capital-> Berlin -head of government-> Kai Wegner, and Bonn
+ENTITIES = {
+    "Q1": Entity(qid="Q1", value="Germany"),
+    "Q2": Entity(qid="Q2", value="Berlin"),
+    "Q3": Entity(qid="Q3", value="Kai Wegner"),
+    "Q4": Entity(qid="Q4", value="Bonn"),
+}
+RELATIONSHIPS = {
+    "P36": Relationship(pid="P36", value="capital"),
+    "P6": Relationship(pid="P6", value="head of government"),
+}
+EDGES = [("Q1", "P36", "Q2"), ("Q1", "P36", "Q4"), ("Q2", "P6", "Q3")]
+
+
+class FakeGraph(Graph):
+    """The graph of `EDGES`, shared by the tests of the methods."""
+
+    def get_entities(self, entities, **kwargs):
+        return [ENTITIES[qid] for qid in entities]
+
+    def get_relationships(self, entity, **kwargs):
+        return [
+            RELATIONSHIPS[pid]
+            for pid in sorted(
+                {rel for head, rel, tail in EDGES if entity.qid in (head, tail)}
+            )
+        ]
+
+    def get_triplets(self, entity, relationship, **kwargs):
+        return [
+            (ENTITIES[head], RELATIONSHIPS[rel], ENTITIES[tail])
+            for head, rel, tail in EDGES
+            if rel == relationship.pid and entity.qid in (head, tail)
+        ]
+
+    def find(self, data_list, **kwargs):
+        return []
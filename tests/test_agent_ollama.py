@@ -0,0 +1,111 @@
+from agents.AgentOllama import AgentOllama
+from errors import AgentException
+from types import SimpleNamespace
+from methods.instructions.tog import config
+import asyncio
+import pytest
+
+
+class FakeClient:
+    """Records the messages of every chat and answers with a counter."""
+
+    def __init__(self):
+        self.chats = []
+
+    def chat(self, **kwargs):
+        self.chats.append(kwargs["messages"])
+        return SimpleNamespace(
+            message=SimpleNamespace(content=f"answer {len(self.chats)}")
+        )
+
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path):
+    monkeypatch.setenv("AGENT_CACHE_MODE", "off")
+    agent = AgentOllama(
+        "model", config, log_path=str(tmp_path / "history.log"), use_context=True
+    )
+    agent.client = FakeClient()
+    return agent
+
+
+def cached_agent(monkeypatch, tmp_path, mode: str, model: str = "model"):
+    monkeypatch.setenv("AGENT_CACHE_MODE", mode)
+    monkeypatch.setenv("AGENT_CACHE_PATH", str(tmp_path / "agent_cache.sqlite"))
+    agent = AgentOllama(model, config, log_path=str(tmp_path / "history.log"))
+    agent.client = FakeClient()
+    return agent
+
+
+def test_calls_are_sent_without_earlier_messages(agent):
+    assert agent.run("answer", "first question") == "answer 1"
+    assert agent.run("answer", "second question") == "answer 2"
+    assert [len(messages) for messages in agent.client.chats] == [2, 2]
+    assert [message["role"] for message in agent.client.chats[1]] == ["system", "user"]
+    assert agent.get_context() == []
+
+
+def test_async_calls_are_limited(agent):
+    agent.max_concurrency = 2
+    in_flight = []
+
+    class SlowClient:
+        async def chat(self, **kwargs):
+            in_flight.append(1)
+            peak = len(in_flight)
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return SimpleNamespace(message=SimpleNamespace(content=str(peak)))
+
+    agent.async_clients.create = SlowClient
+    agent.async_clients.close = lambda client: asyncio.sleep(0)
+
+    async def run():
+        return await asyncio.gather(
+            *[agent.arun("answer", f"question {index}") for index in range(6)]
+        )
+
+    peaks = asyncio.run(run())
+    assert max(int(peak) for peak in peaks) == 2
+
+
+def test_read_through_cache_answers_repeated_prompts(monkeypatch, tmp_path):
+    agent = cached_agent(monkeypatch, tmp_path, "read-through")
+    assert agent.run("answer", "first question") == "answer 1"
+    assert agent.run("answer", "second question") == "answer 2"
+    assert agent.run("answer", "first question") == "answer 1"
+    assert len(agent.client.chats) == 2
+
+    # the cache outlives the agent, but not a change of the model
+    agent = cached_agent(monkeypatch, tmp_path, "read-through")
+    assert agent.run("answer", "second question") == "answer 2"
+    assert agent.client.chats == []
+    agent = cached_agent(monkeypatch, tmp_path, "read-through", model="other")
+    assert agent.run("answer", "second question") == "answer 1"
+
+
+def test_cache_key_covers_sampling_options_and_exact_prompts(monkeypatch, tmp_path):
+    agent = cached_agent(monkeypatch, tmp_path, "read-through")
+    assert agent.run("answer", "question") == "answer 1"
+    assert agent.run("answer", "question ") == "answer 2"
+    assert agent.run("answer", "question") == "answer 1"
+
+    monkeypatch.setenv("OLLAMA_TEMPERATURE", "0.7")
+    agent = cached_agent(monkeypatch, tmp_path, "read-through")
+    assert agent.run("answer", "question") == "answer 1"
+    assert len(agent.client.chats) == 1
+
+
+def test_replay_only_cache_never_calls_the_llm(monkeypatch, tmp_path):
+    cached_agent(monkeypatch, tmp_path, "read-through").run("answer", "question")
+
+    agent = cached_agent(monkeypatch, tmp_path, "replay-only")
+    assert asyncio.run(agent.arun("answer", "question")) == "answer 1"
+    with pytest.raises(AgentException, match="Cache miss"):
+        agent.run("answer", "another question")
+    assert agent.client.chats == []
+
+
+def test_unknown_cache_mode_is_rejected(monkeypatch, tmp_path):
+    with pytest.raises(AgentException, match="Unknown cache mode"):
+        cached_agent(monkeypatch, tmp_path, "write-only")
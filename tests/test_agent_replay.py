@@ -0,0 +1,97 @@
+from agents.AgentOllama import AgentOllama
+from agents.AgentReplay import AgentReplay
+from errors import AgentException
+from methods.instructions.tog import config
+from types import SimpleNamespace
+import json
+import os
+import pytest
+import zipfile
+
+
+class ScriptedClient:
+    def __init__(self, answers):
+        self.answers = list(answers)
+
+    def chat(self, **kwargs):
+        return SimpleNamespace(message=SimpleNamespace(content=self.answers.pop(0)))
+
+
+def record(experiment, method, question, rep, calls, model="model"):
+    """Writes the history log of `calls` (prompt and answer) the way the
+    evaluation does, below `experiment/raw_data`.
+    """
+    os.makedirs(experiment, exist_ok=True)
+    with open(os.path.join(experiment, "meta.json"), "w") as f:
+        json.dump({"agent": model}, f)
+    directory = os.path.join(experiment, "raw_data", method, "logs", question)
+    os.makedirs(directory, exist_ok=True)
+    agent = AgentOllama(
+        model, config, log_path=os.path.join(directory, f"history_{rep}.log")
+    )
+    agent.client = ScriptedClient([answer for _, answer in calls])
+    for prompt, _ in calls:
+        agent.run("answer", prompt)
+    for handler in agent.logger.handlers:
+        handler.close()
+
+
+def replay_agent(path, method="tog", question="1", rep="1", model="model"):
+    log_path = os.path.join(
+        str(path), "replay", method, "logs", question, f"history_{rep}.log"
+    )
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    return AgentReplay(model, config, log_path=log_path)
+
+
+@pytest.fixture
+def results(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_CACHE_MODE", "off")
+    results = tmp_path / "results"
+    monkeypatch.setenv("AGENT_REPLAY_PATH", str(results))
+    record(str(results / "a"), "tog", "1", "1", [("q", "tog 1 1"), ("q", "again")])
+    record(str(results / "a"), "tog", "2", "1", [("q", "tog 2 1")])
+    record(str(results / "a"), "cot", "1", "1", [("q", "cot 1 1"), ("p", "cot p")])
+    return results
+
+
+def test_recordings_of_the_same_call_are_preferred(results, tmp_path):
+    agent = replay_agent(tmp_path, "tog", "1", "1")
+    # repeated prompts replay in their original order, then the last one
+    assert [agent.run("answer", "q") for _ in range(3)] == [
+        "tog 1 1",
+        "again",
+        "again",
+    ]
+    assert replay_agent(tmp_path, "tog", "2", "1").run("answer", "q") == "tog 2 1"
+    assert replay_agent(tmp_path, "cot", "2", "1").run("answer", "q") == "cot 1 1"
+    assert replay_agent(tmp_path, "io", "1", "1").run("answer", "p") == "cot p"
+
+
+def test_unknown_prompts_raise(results, tmp_path):
+    agent = replay_agent(tmp_path)
+    with pytest.raises(AgentException, match="No recorded response"):
+        agent.run("answer", "never asked")
+    with pytest.raises(AgentException, match="No recorded response"):
+        agent.run("answer", "q ")
+    with pytest.raises(AgentException):
+        replay_agent(tmp_path, model="other").run("answer", "q")
+
+
+def test_archives_are_indexed(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_CACHE_MODE", "off")
+    results = tmp_path / "archived"
+    monkeypatch.setenv("AGENT_REPLAY_PATH", str(results))
+    record(str(tmp_path / "b"), "tog", "1", "1", [("q", "zipped")])
+    os.makedirs(results / "b")
+    os.rename(tmp_path / "b" / "meta.json", results / "b" / "meta.json")
+    with zipfile.ZipFile(results / "b" / "data.zip", "w") as archive:
+        for directory, _, files in os.walk(tmp_path / "b"):
+            for name in files:
+                path = os.path.join(directory, name)
+                archive.write(path, os.path.relpath(path, tmp_path / "b"))
+    # archives that were not pulled from git LFS are skipped
+    (results / "b" / "lfs.zip").write_text("version https://git-lfs.github.com/spec/v1")
+
+    assert replay_agent(tmp_path).run("answer", "q") == "zipped"
+    assert replay_agent(tmp_path, model="*").run("answer", "q") == "zipped"
@@ -0,0 +1,105 @@
+from cache import LRUCache, SQLiteCache
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+import random
+import sqlite3
+import threading
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is LRUCache.MISSING
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_sqlite_cache_round_trip(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path)
+    cache.set("a", "value a")
+    cache.set_many({"b": "value b", "c": "ümlaut"})
+    assert cache.get("a") == "value a"
+    assert cache.get("missing") is None
+    assert cache.get_many(["b", "c", "missing"]) == {"b": "value b", "c": "ümlaut"}
+    cache.close()
+
+    # a new instance, e.g. of another job, sees the stored entries
+    assert SQLiteCache(path).get("c") == "ümlaut"
+
+
+def journal_mode(path: str) -> str:
+    with closing(sqlite3.connect(path)) as connection:
+        return connection.execute("PRAGMA journal_mode").fetchone()[0]
+
+
+def test_sqlite_cache_journal_mode(tmp_path, monkeypatch):
+    monkeypatch.delenv("CACHE_JOURNAL_MODE", raising=False)
+    SQLiteCache(str(tmp_path / "default.sqlite"))
+    assert journal_mode(str(tmp_path / "default.sqlite")) == "delete"
+    SQLiteCache(str(tmp_path / "wal.sqlite"), journal_mode="WAL")
+    assert journal_mode(str(tmp_path / "wal.sqlite")) == "wal"
+    monkeypatch.setenv("CACHE_JOURNAL_MODE", "WAL")
+    SQLiteCache(str(tmp_path / "env.sqlite"))
+    assert journal_mode(str(tmp_path / "env.sqlite")) == "wal"
+
+
+def write_entries(path: str, worker: int):
+    cache = SQLiteCache(path)
+    for index in range(50):
+        cache.set(f"{worker}-{index}", str(index))
+        assert cache.get(f"{worker}-{index}") == str(index)
+
+
+def test_sqlite_cache_shared_by_processes(tmp_path):
+    """Like the array tasks of an HPC job writing to one file."""
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteCache(path)
+    with ProcessPoolExecutor(4) as executor:
+        list(executor.map(write_entries, [path] * 4, range(4)))
+    keys = [f"{worker}-{index}" for worker in range(4) for index in range(50)]
+    assert len(SQLiteCache(path).get_many(keys)) == len(keys)
+
+
+def test_sqlite_cache_shared_by_threads(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+
+    def write(thread: int):
+        for index in range(50):
+            cache.set(f"{thread}-{index}", str(index))
+
+    threads = [threading.Thread(target=write, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    keys = [f"{t}-{i}" for t in range(4) for i in range(50)]
+    assert len(cache.get_many(keys)) == len(keys)
+
+
+def test_sqlite_cache_expires_and_evicts(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=-1)
+    cache.set("a", "value")
+    assert cache.get("a") is None
+
+    cache = SQLiteCache(
+        str(tmp_path / "evicting.sqlite"), max_bytes=2000, evict_every=10
+    )
+    for index in range(100):
+        cache.set(str(index), random.Random(index).randbytes(500).hex())
+    stored = cache.get_many([str(index) for index in range(100)])
+    assert 0 < len(stored) < 100
+    # the newest entries are kept
+    assert "99" in stored and "0" not in stored
+
+
+def test_hash_key_normalizes_whitespace():
+    assert SQLiteCache.hash_key("SELECT  ?a\n WHERE") == SQLiteCache.hash_key(
+        "SELECT ?a WHERE"
+    )
+    assert SQLiteCache.hash_key("a", "b") != SQLiteCache.hash_key("ab")
+    assert SQLiteCache.hash_key("a  b", normalize=False) != SQLiteCache.hash_key(
+        "a b", normalize=False
+    )
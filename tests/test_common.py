@@ -0,0 +1,58 @@
+from methods.common import get_default_result, run_calls
+import threading
+import pytest
+
+
+def counting_call(value, calls: list, fail: bool = False):
+    def call(response):
+        calls.append(value)
+        response["agent_calls"] += 1
+        if fail:
+            response["has_err_instruction"] = True
+            raise ValueError(value)
+        return [value]
+
+    return call
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_results_and_counts_are_merged_in_order(workers):
+    calls = []
+    response = get_default_result()
+    results = run_calls(
+        [counting_call(value, calls) for value in range(6)], response, workers
+    )
+    assert results == [[value] for value in range(6)]
+    assert sorted(calls) == list(range(6))
+    assert response["agent_calls"] == 6
+
+
+def test_calls_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def call(response):
+        barrier.wait()
+        response["kg_calls"] += 1
+        return []
+
+    response = get_default_result()
+    run_calls([call] * 3, response, workers=3)
+    assert response["kg_calls"] == 3
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_first_exception_is_raised_with_the_counts_of_calls_that_ran(workers):
+    calls = []
+    response = get_default_result()
+    with pytest.raises(ValueError, match="1"):
+        run_calls(
+            [
+                counting_call(0, calls),
+                counting_call(1, calls, fail=True),
+                counting_call(2, calls, fail=True),
+            ],
+            response,
+            workers,
+        )
+    assert response["agent_calls"] == len(calls)
+    assert response["has_err_instruction"]
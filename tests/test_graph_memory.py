@@ -0,0 +1,110 @@
+from graphs.GraphMemory import GraphMemory, Entity, Relationship
+from graphs.mapped import MappedGraph
+import pytest
+
+NODES = [("n0", "u-a", "Alpha"), ("n1", "u-b", "Beta"), ("n2", "u-c", "Alphabet")]
+EDGES = [
+    ("n0", "KNOWS", "n1"),
+    ("n2", "KNOWS", "n0"),
+    ("n0", "PART_OF", "n2"),
+    ("n1", "PART_OF", "n2"),
+]
+
+
+def write_graphml(path):
+    nodes = "".join(
+        f'<node id="{id}" labels=":NODE"><data key="labels">:NODE</data>'
+        f'<data key="uuid">{uuid}</data><data key="label">{label}</data></node>\n'
+        for id, uuid, label in NODES
+    )
+    edges = "".join(
+        f'<edge id="e{index}" source="{head}" target="{tail}" label="{rel}">'
+        f'<data key="label">{rel}</data></edge>\n'
+        for index, (head, rel, tail) in enumerate(EDGES)
+    )
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        '<graph id="G" edgedefault="directed">\n'
+        f"{nodes}{edges}</graph>\n</graphml>\n"
+    )
+
+
+def as_ids(triplets):
+    return [
+        (head.get_id(), relationship.get_id(), tail.get_id())
+        for head, relationship, tail in triplets
+    ]
+
+
+@pytest.fixture
+def graph_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("GRAPH_TRIPLET_LIMIT", "0")
+    monkeypatch.setenv("GRAPH_TRIPLET_ORDER", "id")
+    path = tmp_path / "graph.xml"
+    write_graphml(path)
+    return str(path)
+
+
+def check_lookups(graph: GraphMemory):
+    alpha = Entity(uuid="u-a", label="Alpha")
+    assert [rel.get_id() for rel in graph.get_relationships(alpha)] == [
+        "KNOWS",
+        "PART_OF",
+    ]
+    assert as_ids(graph.get_triplets(alpha, Relationship(type="KNOWS"))) == [
+        ("u-a", "KNOWS", "u-b"),
+        ("u-c", "KNOWS", "u-a"),
+    ]
+    assert as_ids(graph.get_triplets(alpha, Relationship(type="KNOWS"), limit=1)) == [
+        ("u-a", "KNOWS", "u-b")
+    ]
+    assert as_ids(
+        graph.get_triplets(alpha, Relationship(type="KNOWS"), limit=1, offset=1)
+    ) == [("u-c", "KNOWS", "u-a")]
+    assert as_ids(
+        graph.get_triplets(
+            Entity(uuid="u-c", label="Alphabet"), Relationship(type="PART_OF")
+        )
+    ) == [("u-a", "PART_OF", "u-c"), ("u-b", "PART_OF", "u-c")]
+    assert graph.count_triplets_many(
+        [
+            (alpha, Relationship(type="KNOWS")),
+            (alpha, Relationship(type="PART_OF")),
+            (alpha, Relationship(type="UNKNOWN")),
+            (Entity(uuid="u-x", label="X"), Relationship(type="KNOWS")),
+        ]
+    ) == [2, 1, 0, 0]
+    assert [entity.get_id() for entity in graph.get_entities(["u-b", "u-x"])] == ["u-b"]
+    # exact matches come before labels containing the query
+    assert [entity.get_id() for entity in graph.find(["alpha"])] == ["u-a", "u-c"]
+
+
+def test_graphml_is_loaded(graph_path):
+    check_lookups(GraphMemory(graph_path))
+
+
+def test_snapshot_round_trip(graph_path, tmp_path):
+    snapshot_path = str(tmp_path / "graph.snapshot")
+    stats = GraphMemory(graph_path).export_snapshot(snapshot_path)
+    assert stats == {"nodes": 3, "relationship types": 2, "edges": 4}
+    check_lookups(GraphMemory(snapshot_path))
+
+
+def test_snapshot_is_replaced(graph_path, tmp_path):
+    snapshot_path = str(tmp_path / "graph.snapshot")
+    MappedGraph.write(snapshot_path, ["u-x"], ["X"], [], [])
+    GraphMemory(graph_path).export_snapshot(snapshot_path)
+    with MappedGraph(snapshot_path) as snapshot:
+        assert snapshot.uuids.decode() == ["u-a", "u-b", "u-c"]
+        assert snapshot.rel_types.decode() == ["KNOWS", "PART_OF"]
+        assert sorted(snapshot.iter_edges()) == [
+            (0, 0, 1),
+            (0, 1, 2),
+            (1, 1, 2),
+            (2, 0, 0),
+        ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "graph.snapshot",
+        "graph.xml",
+    ]
@@ -0,0 +1,107 @@
+from graphs.GraphWikidata import GraphWikidata, Entity, Relationship
+from contextlib import closing
+import json
+import pytest
+import sqlite3
+
+rdflib = pytest.importorskip("rdflib")
+
+WD = "http://www.wikidata.org/entity/"
+WDT = "http://www.wikidata.org/prop/direct/"
+
+# Q1 and Q2 are linked by P1 in both directions, Q1 is linked to itself
+TRIPLES = [
+    ("Q1", "P1", "Q2"),
+    ("Q2", "P1", "Q1"),
+    ("Q1", "P1", "Q3"),
+    ("Q1", "P1", "Q1"),
+    ("Q4", "P1", "Q1"),
+    ("Q1", "P2", "Q2"),
+]
+LABELS = {"Q1": "one", "Q2": "two", "Q3": "three", "P1": "knows"}
+
+
+class LocalWikidata(GraphWikidata):
+    """Answers the queries from an in-memory RDF graph instead of the endpoint."""
+
+    def __init__(self):
+        super().__init__()
+        self.rdf = rdflib.Graph()
+        for head, rel, tail in TRIPLES:
+            self.rdf.add(
+                (
+                    rdflib.URIRef(WD + head),
+                    rdflib.URIRef(WDT + rel),
+                    rdflib.URIRef(WD + tail),
+                )
+            )
+        for id, label in LABELS.items():
+            self.rdf.add(
+                (
+                    rdflib.URIRef(WD + id),
+                    rdflib.RDFS.label,
+                    rdflib.Literal(label, lang="en"),
+                )
+            )
+
+    def query(self, query: str) -> dict:
+        result = self.rdf.query(
+            query, initNs={"wd": WD, "wdt": WDT, "rdfs": rdflib.RDFS}
+        )
+        return json.loads(result.serialize(format="json"))
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    monkeypatch.setenv("GRAPH_LABEL_PATH", "")
+    monkeypatch.setenv("GRAPH_CACHE_MODE", "off")
+    graph = LocalWikidata()
+    yield graph
+    graph.close()
+
+
+def test_counts_match_triplets(graph):
+    tuples = [
+        (Entity("Q1", "one"), Relationship("P1", "knows")),
+        (Entity("Q1", "one"), Relationship("P2", "P2")),
+        (Entity("Q3", "three"), Relationship("P2", "P2")),
+    ]
+    counts = graph.count_triplets_many(tuples)
+    triplets = [graph.get_triplets(entity, rel) for entity, rel in tuples]
+    assert counts == [len(found) for found in triplets] == [5, 1, 0]
+
+
+def test_unknown_entities_are_left_out(graph):
+    entities = graph.get_entities(["Q1", "Q404", "Q4"])
+    # Q4 exists but has no english label
+    assert [(entity.qid, entity.get_label()) for entity in entities] == [
+        ("Q1", "one"),
+        ("Q4", "Q4"),
+    ]
+
+
+def test_labels_are_stored(graph, tmp_path):
+    from cache import SQLiteCache
+
+    graph.label_store = SQLiteCache(str(tmp_path / "labels.sqlite"))
+    graph.get_entities(["Q1", "Q404"])
+    assert graph.label_store.get_many(["Q1", "Q404"]) == {"Q1": "one"}
+    # answered from the store, without the endpoint
+    graph.query = None
+    graph.label_memory.clear()
+    assert [entity.get_label() for entity in graph.get_entities(["Q1"])] == ["one"]
+
+
+def test_label_store_can_be_shared(monkeypatch, tmp_path):
+    """The store is shared by the array tasks of an HPC job, so it uses the
+    rollback journal, which is safe on network filesystems.
+    """
+    path = tmp_path / "labels.sqlite"
+    monkeypatch.setenv("GRAPH_LABEL_PATH", str(path))
+    monkeypatch.setenv("GRAPH_CACHE_MODE", "off")
+    monkeypatch.delenv("CACHE_JOURNAL_MODE", raising=False)
+    graph = LocalWikidata()
+    graph.get_entities(["Q1"])
+    graph.close()
+    with closing(sqlite3.connect(str(path))) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
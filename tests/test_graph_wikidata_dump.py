@@ -0,0 +1,97 @@
+from graphs.GraphWikidataDump import GraphWikidataDump
+from graphs.GraphWikidata import Entity, Relationship
+import gzip
+import pytest
+
+WD = "http://www.wikidata.org/entity/"
+WDT = "http://www.wikidata.org/prop/direct/"
+LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+
+# the graph of `test_graph_wikidata.py`, plus a literal and statements that
+# are not kept
+NTRIPLES = f"""<{WD}Q1> <{WDT}P1> <{WD}Q2> .
+<{WD}Q2> <{WDT}P1> <{WD}Q1> .
+<{WD}Q1> <{WDT}P1> <{WD}Q3> .
+<{WD}Q1> <{WDT}P1> <{WD}Q1> .
+<{WD}Q4> <{WDT}P1> <{WD}Q1> .
+<{WD}Q1> <{WDT}P2> <{WD}Q2> .
+<{WD}Q2> <{WDT}P3> "+1975-07-09T00:00:00Z"^^<http://www.w3.org/2001/XMLSchema#dateTime> .
+<{WD}Q1> <{LABEL}> "one" .
+<{WD}Q1> <{LABEL}> "one"@en .
+<{WD}Q1> <{LABEL}> "eins"@de .
+<{WD}Q2> <{LABEL}> "two"@en .
+<{WD}Q3> <{LABEL}> "\\"three\\" \\u00e9"@en .
+<{WD}P1> <{LABEL}> "knows"@en .
+<{WD}Q1> <http://schema.org/description> "first"@en .
+# a comment
+"""
+
+
+@pytest.fixture(params=[".nt", ".nt.gz"])
+def graph(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("GRAPH_TRIPLET_LIMIT", "0")
+    monkeypatch.setenv("GRAPH_TRIPLET_ORDER", "id")
+    source = tmp_path / f"dump{request.param}"
+    opener = gzip.open if request.param == ".nt.gz" else open
+    with opener(source, "wt", encoding="utf-8") as f:
+        f.write(NTRIPLES)
+    path = str(tmp_path / "wikidata_dump")
+    stats = GraphWikidataDump.convert(str(source), path)
+    assert stats == {"terms": 8, "labels": 4, "statements": 7}
+    graph = GraphWikidataDump(path)
+    yield graph
+    graph.close()
+
+
+def as_ids(triplets):
+    return [(head.qid, rel.pid, tail.qid) for head, rel, tail in triplets]
+
+
+def test_relationships(graph):
+    assert [
+        (rel.pid, rel.get_label())
+        for rel in graph.get_relationships(Entity("Q2", "two"))
+    ] == [("P1", "knows"), ("P2", "P2"), ("P3", "P3")]
+    assert graph.get_relationships(Entity("Q404", "Q404")) == []
+
+
+def test_triplets_match_counts(graph):
+    tuples = [
+        (Entity("Q1", "one"), Relationship("P1", "knows")),
+        (Entity("Q1", "one"), Relationship("P2", "P2")),
+        (Entity("Q3", "three"), Relationship("P2", "P2")),
+        (Entity("Q2", "two"), Relationship("P3", "P3")),
+    ]
+    triplets = [graph.get_triplets(entity, rel) for entity, rel in tuples]
+    assert graph.count_triplets_many(tuples) == [len(found) for found in triplets]
+    assert as_ids(triplets[0]) == [
+        ("Q1", "P1", "Q1"),
+        ("Q2", "P1", "Q1"),
+        ("Q1", "P1", "Q2"),
+        ("Q1", "P1", "Q3"),
+        ("Q4", "P1", "Q1"),
+    ]
+    assert triplets[3][0][2].get_label() == "+1975-07-09T00:00:00Z"
+
+
+def test_triplets_are_paged(graph):
+    entity, rel = Entity("Q1", "one"), Relationship("P1", "knows")
+    pages = [
+        as_ids(graph.get_triplets(entity, rel, limit=2, offset=offset))
+        for offset in [0, 2, 4]
+    ]
+    assert [triplet for page in pages for triplet in page] == as_ids(
+        graph.get_triplets(entity, rel)
+    )
+    assert [len(page) for page in pages] == [2, 2, 1]
+
+
+def test_labels_and_entities(graph):
+    entities = graph.get_entities(["Q1", "Q3", "Q4", "Q404"])
+    # Q4 is known but has no english label
+    assert [(entity.qid, entity.get_label()) for entity in entities] == [
+        ("Q1", "one"),
+        ("Q3", '"three" é'),
+        ("Q4", "Q4"),
+    ]
+    assert [entity.qid for entity in graph.find(["two", "knows", "eins"])] == ["Q2"]
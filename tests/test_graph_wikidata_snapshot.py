@@ -0,0 +1,123 @@
+from graphs.GraphWikidata import Entity, Relationship
+from graphs.GraphWikidataSnapshot import GraphWikidataSnapshot
+from errors import GraphException
+from contextlib import closing
+import pytest
+import sqlite3
+
+# a chain Q1 -> Q2 -> Q3 -> Q4, Q2 also has a date
+EDGES = [
+    ("Q1", "P1", "Q2"),
+    ("Q2", "P1", "Q3"),
+    ("Q3", "P1", "Q4"),
+    ("Q2", "P2", "+1975-07-09T00:00:00Z"),
+]
+LABELS = {"P1": "next", "P2": "date", "Q1": "one", "Q2": "two", "Q3": "three"}
+
+
+class FakeSource:
+    """The part of `GraphWikidata` used by the recorder, failing after
+    `fail_after` relationship lookups to interrupt a recording.
+    """
+
+    def __init__(self, fail_after: int = None):
+        self.fail_after = fail_after
+        self.lookups = []
+
+    def entity(self, qid: str) -> Entity:
+        return Entity(qid=qid, value=LABELS.get(qid, qid))
+
+    def get_entities(self, entities, **kwargs):
+        return [self.entity(qid) for qid in entities]
+
+    def get_relationships_many(self, entities, **kwargs):
+        if self.fail_after is not None and len(self.lookups) >= self.fail_after:
+            raise ConnectionError("interrupted")
+        self.lookups.append([entity.qid for entity in entities])
+        return [
+            [
+                Relationship(pid=pid, value=LABELS[pid])
+                for pid in sorted(
+                    {rel for head, rel, tail in EDGES if entity.qid in (head, tail)}
+                )
+            ]
+            for entity in entities
+        ]
+
+    def get_triplets_many(self, tuples, **kwargs):
+        return [
+            [
+                (self.entity(head), rel, self.entity(tail))
+                for head, pid, tail in EDGES
+                if pid == rel.pid and entity.qid in (head, tail)
+            ]
+            for entity, rel in tuples
+        ]
+
+    def count_triplets_many(self, tuples, **kwargs):
+        return [len(triplets) for triplets in self.get_triplets_many(tuples)]
+
+
+def recorded(snapshot: GraphWikidataSnapshot) -> list:
+    with closing(snapshot.connect()) as connection:
+        return sorted(qid for (qid,) in connection.execute("SELECT qid FROM entities"))
+
+
+def test_record_and_lookup(tmp_path):
+    snapshot = GraphWikidataSnapshot(str(tmp_path / "snapshot.sqlite"), create=True)
+    stats = snapshot.record(FakeSource(), ["Q1"], hops=3, batch_size=1)
+    assert stats == {"hop_0": 1, "hop_1": 1, "hop_2": 1}
+    assert recorded(snapshot) == ["Q1", "Q2", "Q3"]
+
+    two = snapshot.get_entities(["Q2"])[0]
+    assert two.get_label() == "two"
+    relationships = snapshot.get_relationships(two)
+    assert [rel.get_label() for rel in relationships] == ["next", "date"]
+    triplets = snapshot.get_triplets(two, relationships[0])
+    assert sorted(
+        (head.get_id(), rel.get_id(), tail.get_id()) for head, rel, tail in triplets
+    ) == [("Q1", "P1", "Q2"), ("Q2", "P1", "Q3")]
+    assert snapshot.count_triplets_many([(two, relationships[0])]) == [2]
+    # entities outside of the recorded neighborhoods have no relationships
+    assert snapshot.get_relationships(Entity(qid="Q4", value="Q4")) == []
+    # Q4 is known as a neighbor, Q404 not at all
+    assert [
+        (entity.qid, entity.get_label())
+        for entity in snapshot.get_entities(["Q4", "Q404", "Q1"])
+    ] == [("Q4", "Q4"), ("Q1", "one")]
+
+
+def test_missing_snapshot_raises(tmp_path):
+    with pytest.raises(GraphException, match="No snapshot found"):
+        GraphWikidataSnapshot(str(tmp_path / "mistyped.sqlite"))
+    assert not (tmp_path / "mistyped.sqlite").exists()
+
+    path = tmp_path / "cache.sqlite"
+    with closing(sqlite3.connect(str(path))) as connection:
+        connection.execute("CREATE TABLE entries (key TEXT PRIMARY KEY)")
+    with pytest.raises(GraphException, match="not a snapshot"):
+        GraphWikidataSnapshot(str(path))
+
+
+def test_resume_interrupted_recording(tmp_path):
+    path = str(tmp_path / "snapshot.sqlite")
+    snapshot = GraphWikidataSnapshot(path, create=True)
+    with pytest.raises(ConnectionError):
+        snapshot.record(FakeSource(fail_after=1), ["Q1"], hops=3, batch_size=1)
+    assert recorded(snapshot) == ["Q1"]
+
+    source = FakeSource()
+    stats = GraphWikidataSnapshot(path).record(source, ["Q1"], hops=3, batch_size=1)
+    assert stats == {"hop_0": 0, "hop_1": 1, "hop_2": 1}
+    assert recorded(snapshot) == ["Q1", "Q2", "Q3"]
+    # Q1 was not fetched again
+    assert source.lookups == [["Q2"], ["Q3"]]
+
+
+def test_extend_recording_to_more_hops(tmp_path):
+    snapshot = GraphWikidataSnapshot(str(tmp_path / "snapshot.sqlite"), create=True)
+    snapshot.record(FakeSource(), ["Q1"], hops=1)
+    assert recorded(snapshot) == ["Q1"]
+    stats = snapshot.record(FakeSource(), ["Q1"], hops=4)
+    assert stats == {"hop_0": 0, "hop_1": 1, "hop_2": 1, "hop_3": 1}
+    assert recorded(snapshot) == ["Q1", "Q2", "Q3", "Q4"]
@@ -0,0 +1,69 @@
+from loops import LoopResource
+import asyncio
+
+
+class Client:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+
+    async def aclose(self):
+        # closing needs the loop the client was created in
+        assert asyncio.get_running_loop() is self.loop
+        self.closed = True
+
+
+def make_resource(created: list) -> LoopResource:
+    def create():
+        client = Client()
+        created.append(client)
+        return client
+
+    return LoopResource(create, lambda client: client.aclose())
+
+
+def test_one_resource_per_loop_closed_with_the_loop():
+    created = []
+    resource = make_resource(created)
+
+    async def use():
+        assert resource.get() is resource.get()
+        return resource.get()
+
+    first = asyncio.run(use())
+    second = asyncio.run(use())
+    assert first is not second
+    assert created == [first, second]
+    assert first.closed and second.closed
+    assert len(resource) == 0
+
+
+def test_aclose_closes_the_resource_of_the_running_loop():
+    created = []
+    resource = make_resource(created)
+
+    async def use():
+        client = resource.get()
+        await resource.aclose()
+        assert client.closed
+        assert resource.get() is not client
+
+    asyncio.run(use())
+    assert len(created) == 2 and all(client.closed for client in created)
+
+
+def test_aclose_raises_close_errors():
+    async def fail(_):
+        raise ValueError("close failed")
+
+    resource = LoopResource(object, fail)
+
+    async def use():
+        resource.get()
+        try:
+            await resource.aclose()
+        except ValueError:
+            return True
+        return False
+
+    assert asyncio.run(use())
@@ -0,0 +1,88 @@
+from methods import tog
+from tests.fakes import ENTITIES, FakeGraph
+import threading
+import time
+
+
+class ScoringAgent:
+    """Answers from the prompt arguments alone, so the answers do not depend on
+    the order of concurrent calls. The first relationship of a list gets the
+    highest score.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def run(self, instruction, prompt, **kwargs):
+        with self.lock:
+            self.calls.append((instruction, repr(kwargs)))
+        if instruction == "pick_relationships":
+            relationships = kwargs["relationships"][0]["relationships"]
+            # finish the calls of the first paths last
+            time.sleep(0.01 / (len(self.calls) + 1))
+            return " ".join(
+                f"{{wiki.relation.{relationship.replace(' ', '_')} (Score: {1 / (index + 1):.2f})}}"
+                for index, relationship in enumerate(relationships)
+            )
+        if instruction == "pick_triplets":
+            entities = kwargs["triplets"][0]["entities"]
+            return ", ".join(f"{1 / len(entities):.2f}" for _ in entities)
+        if instruction == "reflect":
+            found = any("Kai Wegner" in triplet for triplet in kwargs["triplets"])
+            return "{Yes}" if found else "{No}"
+        return "{Kai Wegner}"
+
+
+def run(prune_workers: int):
+    agent = ScoringAgent()
+    response = tog.think_on_graph(
+        "Who is the mayor of the capital of Germany?",
+        agent,
+        FakeGraph(),
+        max_paths=2,
+        max_depth=3,
+        seed_entities=[ENTITIES["Q1"], ENTITIES["Q2"]],
+        prune_workers=prune_workers,
+    )
+    return response, agent.calls
+
+
+def test_concurrent_prune_calls_match_sequential_ones():
+    sequential, sequential_calls = run(prune_workers=1)
+    concurrent, concurrent_calls = run(prune_workers=4)
+    assert sequential["machine_answer"] == "Kai Wegner"
+    assert not any(
+        value for key, value in sequential.items() if key.startswith("has_err")
+    )
+    assert concurrent == sequential
+    assert sorted(concurrent_calls) == sorted(sequential_calls)
+    assert sequential["agent_calls"] == len(sequential_calls)
+
+
+def test_relationships_are_parsed():
+    relationships = FakeGraph().get_relationships(ENTITIES["Q2"])
+    picks = tog.parse_response_pick_relationships(
+        "1. {wiki.relation.head_of_government (Score: 0.7)}: the mayor.\n"
+        "2. {wiki.relation.capital (Score: 0.3)}: the country.",
+        relationships,
+        ENTITIES["Q2"],
+        path_index=1,
+    )
+    assert [(pick["relationship"].pid, pick["score"]) for pick in picks] == [
+        ("P6", 0.7),
+        ("P36", 0.3),
+    ]
+
+
+def test_unmatched_triplet_scores_are_equal():
+    triplets = FakeGraph().get_triplets(
+        ENTITIES["Q1"], FakeGraph().get_relationships(ENTITIES["Q1"])[0]
+    )
+    picks = tog.parse_response_pick_triplets(
+        "0.5", triplets, ENTITIES["Q1"], triplets[0][1], path_index=0
+    )
+    assert [(pick["scored_entity"].qid, pick["score"]) for pick in picks] == [
+        ("Q2", 0.5),
+        ("Q4", 0.5),
+    ]
@@ -0,0 +1,151 @@
+from graphs.GraphWikidata import Entity
+from tests.fakes import ENTITIES, RELATIONSHIPS, FakeGraph
+from errors import InstructionError
+from methods.common import get_default_result
+from methods import tog_batched
+from methods.instructions.tog_batched import config
+from logger import get_logger
+import pytest
+
+
+class FakeAgent:
+    """Answers each instruction with the next of its scripted responses."""
+
+    def __init__(self, responses: dict):
+        self.responses = {key: list(value) for key, value in responses.items()}
+        self.calls = []
+
+    def run(self, instruction: str, prompt: str, **kwargs):
+        self.calls.append(instruction)
+        return self.responses[instruction].pop(0)
+
+
+def test_pick_relationships_are_parsed_per_topic_entity():
+    entities = [ENTITIES["Q1"], ENTITIES["Q4"], ENTITIES["Q2"]]
+    relationships_per_path = [[RELATIONSHIPS["P36"]], [], [RELATIONSHIPS["P6"]]]
+    response = (
+        "1. {1: wiki.relation.capital (Score: 0.6)}: the capital.\n"
+        "2. {2: wiki.relation.head_of_government (Score: 0.3)}: the mayor.\n"
+        "3. {2: wiki.relation.capital (Score: 0.1)}: not a relation of entity 2.\n"
+        "4. {3: wiki.relation.capital (Score: 0.1)}: no topic entity 3."
+    )
+    relations = tog_batched.parse_response_pick_relationships(
+        response, relationships_per_path, entities, [0, 2]
+    )
+    assert [
+        (relation["relationship"].pid, relation["score"], relation["path_index"])
+        for relation in relations
+    ] == [("P36", 0.6, 0), ("P6", 0.3, 2)]
+
+    with pytest.raises(InstructionError):
+        tog_batched.parse_response_pick_relationships(
+            "capital (0.6)", relationships_per_path, entities, [0, 2]
+        )
+
+
+def test_pick_triplets_response_is_split_by_relation():
+    lines = tog_batched.split_response_pick_triplets(
+        "0.2, 0.8\nScore 2: 1.0\nScore 2: 0.5"
+    )
+    assert {number: line.strip() for number, line in lines.items()} == {
+        1: "0.2, 0.8",
+        2: "1.0",
+    }
+    lines = tog_batched.split_response_pick_triplets(" Score 1: 1.0")
+    assert {number: line.strip() for number, line in lines.items()} == {1: "1.0"}
+
+
+def test_malformed_score_line_falls_back_for_its_relation_only():
+    capital = {
+        "entity": ENTITIES["Q1"],
+        "relationship": RELATIONSHIPS["P36"],
+        "path_index": 0,
+    }
+    # neither side of the triplet is the topic entity, so two entities are
+    # listed for one triplet and its single score cannot be matched
+    mislabeled = {
+        "entity": Entity(qid="Q2", value="Berlin, Germany"),
+        "relationship": RELATIONSHIPS["P6"],
+        "path_index": 1,
+    }
+    triplets_per_relationship = [
+        FakeGraph().get_triplets(ENTITIES["Q1"], RELATIONSHIPS["P36"]),
+        FakeGraph().get_triplets(ENTITIES["Q2"], RELATIONSHIPS["P6"]),
+    ]
+    agent = FakeAgent({"pick_triplets": ["0.9, 0.1\nScore 2: 1.0"]})
+    response = get_default_result()
+
+    scored = tog_batched.entity_prune(
+        [capital, mislabeled],
+        triplets_per_relationship,
+        agent,
+        "?",
+        response,
+        get_logger(__name__),
+    )
+
+    assert [(triplet["scored_entity"].qid, triplet["score"]) for triplet in scored] == [
+        ("Q2", 0.9),
+        ("Q4", 0.1),
+        ("Q2", 0.5),
+        ("Q3", 0.5),
+    ]
+    assert response["has_err_instruction"]
+    assert response["agent_calls"] == 1
+
+
+@pytest.mark.parametrize(
+    "response, expected",
+    [
+        ("{Yes}. Therefore, the answer is {Kai Wegner}.", (True, "Kai Wegner")),
+        ("{Yes}. The triplets suffice.", (True, None)),
+        ("{No}. More knowledge is required.", (False, None)),
+    ],
+)
+def test_reflect_answer_is_parsed(response, expected):
+    assert tog_batched.parse_response_reflect_answer(response) == expected
+
+
+def test_reflect_answer_without_marks_raises():
+    with pytest.raises(InstructionError):
+        tog_batched.parse_response_reflect_answer("Yes, Kai Wegner.")
+
+
+def test_three_agent_calls_per_depth():
+    agent = FakeAgent(
+        {
+            "pick_relationships": [
+                "{1: wiki.relation.capital (Score: 1.0)}",
+                "{1: wiki.relation.head_of_government (Score: 1.0)}",
+            ],
+            "pick_triplets": ["1.0, 0.0", "1.0"],
+            "reflect": ["{No}.", "{Yes}. The mayor of Berlin is {Kai Wegner}."],
+        }
+    )
+
+    response = tog_batched.think_on_graph(
+        "Who is the mayor of the capital of Germany?",
+        agent,
+        FakeGraph(),
+        max_paths=1,
+        max_depth=3,
+        seed_entities=[ENTITIES["Q1"]],
+    )
+
+    assert response["machine_answer"] == "Kai Wegner"
+    assert response["is_kg_based_answer"]
+    assert response["depth"] == 2
+    assert response["agent_calls"] == 6
+    assert agent.calls == ["pick_relationships", "pick_triplets", "reflect"] * 2
+
+
+def test_pick_triplets_example_matches_the_generated_lines():
+    prompt = config["user"]["pick_triplets"](
+        prompt="Who is the mayor of the capital of Germany?",
+        triplets=[
+            {"entity": "Germany", "relationship": "capital", "entities": ["Berlin"]}
+        ],
+    )
+    labels = {line.split(":")[0].rstrip(" 0123456789") for line in prompt.splitlines()}
+    assert {"Relation", "Entities", "Score"} <= labels
+    assert "Entites" not in labels
@@ -3,7 +3,7 @@ import { useEffect, useState } from "react";
 export type Config = {
   agent_provider: "ollama" | "google";
   model: string;
-  graph_db: "neo4j" | "wikidata";
+  graph_db: "neo4j" | "wikidata" | "memory";
   max_paths: number;
   max_depth: number;
   use_context: boolean;
@@ -71,6 +71,7 @@ export const Settings = () => {
             <SelectContent>
               <SelectItem value="neo4j">Neo4j</SelectItem>
               <SelectItem value="wikidata">Wikidata</SelectItem>
+              <SelectItem value="memory">In-memory (GraphML)</SelectItem>
             </SelectContent>
           </Select>
         </Label>
@@ -8,7 +8,9 @@ purposes only.
 
 At the end of the script the graph is exported to the configured import volume.
 If a file with the name `graph.xml` is already in that volume it will attempt
-to import the file instead and refrain from the scraping procedure.
+to import the file instead and refrain from the scraping procedure. A binary
+snapshot `graph.snapshot` of the graph (see `use_case/graph_snapshot.py`) is
+imported in its place, which is considerably faster.
 """
 
 import os
@@ -30,15 +32,33 @@ if __name__ == "__main__":
     load_dotenv()
     GRAPH_IMPORT_VOLUME = os.getenv("GRAPH_IMPORT_VOL")
     GRAPH_FILE = "graph.xml"
+    SNAPSHOT_DIR = "graph.snapshot"
     BASE_URL = "https://www.langenachtderwissenschaften.de/programm"
     TMP_FILE = "./use_case/event_urls.tmp"
     graph = GraphNeo4j()
 
+    # Labels, constraints and indexes used by all queries
+    try:
+        graph.ensure_schema()
+    except Exception as e:
+        graph.close()
+        sys.exit(f"Something went wrong while setting up the schema: {e}")
+
     # Import if possible
     try:
+        start = time.perf_counter()
+        if os.path.isdir(f"{GRAPH_IMPORT_VOLUME}/{SNAPSHOT_DIR}"):
+            stats = graph.import_snapshot(f"{GRAPH_IMPORT_VOLUME}/{SNAPSHOT_DIR}")
+            print(
+                f"Graph imported from {SNAPSHOT_DIR} in {time.perf_counter() - start:.1f}s ({stats["nodes"]} entities, {stats["edges"]} relationships)."
+            )
+            graph.close()
+            sys.exit(0)
         if os.path.exists(f"{GRAPH_IMPORT_VOLUME}/{GRAPH_FILE}"):
             graph.import_graphml(GRAPH_FILE)
-            print("Graph imported.")
+            print(
+                f"Graph imported from {GRAPH_FILE} in {time.perf_counter() - start:.1f}s."
+            )
             graph.close()
             sys.exit(0)
     except Exception as e:
@@ -47,6 +67,9 @@ if __name__ == "__main__":
 
     driver = webdriver.Chrome(options=Options())
 
+    # Entities and links are collected and written in batched transactions
+    loader = graph.bulk_loader()
+
     # ---------------------------------------------------------------------------- #
     #                               INITIAL CREATION                               #
     # ---------------------------------------------------------------------------- #
@@ -80,7 +103,7 @@ if __name__ == "__main__":
         type_organizer,
         type_description,
         type_person,
-    ) = graph.create(
+    ) = loader.create(
         [
             "Lange Nacht der Wissenschaften 2025",
             "LNDW",
@@ -110,7 +133,7 @@ if __name__ == "__main__":
             "Person",
         ]
     )
-    graph.link(
+    loader.link(
         [
             (core.uuid, "IST_TYP", type_event.uuid),
             (abbr.uuid, "IST_ABKUERZUNG_FUER", core.uuid),
@@ -238,7 +261,7 @@ if __name__ == "__main__":
                 facility_descr_entity,
                 event_link_entity,
                 event_desc_entity,
-            ) = graph.create(
+            ) = loader.create(
                 [
                     title,
                     event_duration,
@@ -248,7 +271,7 @@ if __name__ == "__main__":
                     event_desc,
                 ]
             )
-            graph.link(
+            loader.link(
                 [
                     (facility_entity.uuid, "IST_TYP", type_facility.uuid),
                     (facility_entity.uuid, "IST_EINRICHTUNG_IN", berlin.uuid),
@@ -275,8 +298,8 @@ if __name__ == "__main__":
                 area = event_block.find_element(By.CLASS_NAME, "tag-ort").get_attribute(
                     "innerHTML"
                 )
-                area_entity = graph.create([area])[0]
-                graph.link(
+                area_entity = loader.create([area])[0]
+                loader.link(
                     [
                         (area_entity.uuid, "IST_TYP", type_place.uuid),
                         (event_entity.uuid, "FINDET_STATT_IN", area_entity.uuid),
@@ -303,8 +326,8 @@ if __name__ == "__main__":
                     elif "Speisen" in icon_descr:
                         relationship = "HAT_VORHANDEN"
                     if relationship:
-                        icon_entity = graph.create([icon_descr])[0]
-                        graph.link(
+                        icon_entity = loader.create([icon_descr])[0]
+                        loader.link(
                             [(event_entity.uuid, relationship, icon_entity.uuid)]
                         )
             except NoSuchElementException:
@@ -320,8 +343,8 @@ if __name__ == "__main__":
                     .split(",")
                 ]
                 for tag in tags:
-                    tag_entity = graph.create([tag])[0]
-                    graph.link(
+                    tag_entity = loader.create([tag])[0]
+                    loader.link(
                         [
                             (tag_entity.uuid, "IST_TYP", type_category.uuid),
                             (
@@ -343,14 +366,14 @@ if __name__ == "__main__":
                     .get_attribute("innerText")
                     .split("\n")[1:]
                 )
-                time_entities = graph.create(times)
-                graph.link(
+                time_entities = loader.create(times)
+                loader.link(
                     [
                         (event_entity.uuid, "HAT_VERANSTALTUNG_UM", time_entity.uuid)
                         for time_entity in time_entities
                     ]
                 )
-                graph.link(
+                loader.link(
                     [
                         (time_entity.uuid, "IST_TYP", type_time.uuid)
                         for time_entity in time_entities
@@ -365,8 +388,8 @@ if __name__ == "__main__":
                     .find_element(By.XPATH, "following-sibling::*[1]")
                     .get_attribute("innerText")
                 )
-                address_entity = graph.create([address])[0]
-                graph.link(
+                address_entity = loader.create([address])[0]
+                loader.link(
                     [
                         (address_entity.uuid, "IST_TYP", type_address.uuid),
                         (event_entity.uuid, "FINDET_STATT_IN", address_entity.uuid),
@@ -378,13 +401,23 @@ if __name__ == "__main__":
 
             time.sleep(1)
 
+        loader.flush()
+        print(
+            f"Wrote {loader.stats["nodes"]} entities and {loader.stats["edges"]} relationships in {loader.stats["transactions"]} transactions."
+        )
         os.remove(TMP_FILE)
         print("Exporting graph to file.")
         meta = graph.export_graphml("graph.xml")[0]
         print(f"Entities: {meta["nodes"]}\nRelationships: {meta["relationships"]}")
+        graph.export_snapshot(f"{GRAPH_IMPORT_VOLUME}/{SNAPSHOT_DIR}")
 
     except Exception as e:
         print(e)
+        # keep what was scraped so far, like the previous unbatched writes did
+        try:
+            loader.flush()
+        except Exception as e:
+            print(e)
 
     time.sleep(5)
     graph.close()
@@ -0,0 +1,121 @@
+"""
+# ---------------------------------------------------------------------------- #
+#                                GRAPH SNAPSHOT                                #
+# ---------------------------------------------------------------------------- #
+
+Converts the GraphML export of the graph (`graph.xml` in the import volume)
+into a compact binary snapshot (`graph.snapshot`, see `MappedGraph`), which
+`use_case/generate_graph.py` and the `memory` graph load instead of the GraphML.
+
+```
+python -m use_case.graph_snapshot
+python -m use_case.graph_snapshot --from_neo4j
+python -m use_case.graph_snapshot --benchmark
+```
+
+The benchmark reports the load times of the `memory` graph from both formats.
+With `--neo4j` it also imports both formats into Neo4j, which DELETES all data
+of the configured database before each import.
+"""
+
+from graphs.GraphMemory import GraphMemory
+from graphs.GraphNeo4j import GraphNeo4j
+from dotenv import load_dotenv
+import argparse
+import os
+import statistics
+import time
+
+
+def timed(function, repeat: int, setup=None) -> list:
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(name: str, times: list, baseline: list = None):
+    line = f"{name:>18}: min {min(times):.3f}s, mean {statistics.mean(times):.3f}s"
+    if baseline:
+        line += f", speedup {min(baseline) / min(times):.1f}x"
+    print(line)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--from_neo4j",
+        action="store_true",
+        help="Export the graph of the running Neo4j database instead of converting graph.xml",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Report the import times of graph.xml and the snapshot",
+    )
+    parser.add_argument(
+        "--neo4j",
+        action="store_true",
+        help="Also benchmark imports into Neo4j. DELETES all data of the database!",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Imports per format in the benchmark",
+    )
+    args = parser.parse_args()
+
+    import_volume = os.getenv("GRAPH_IMPORT_VOL", "./use_case")
+    graphml_path = os.path.join(import_volume, "graph.xml")
+    snapshot_path = os.path.join(import_volume, "graph.snapshot")
+
+    if not args.benchmark or not os.path.isdir(snapshot_path):
+        start = time.perf_counter()
+        if args.from_neo4j:
+            graph = GraphNeo4j()
+            try:
+                stats = graph.export_snapshot(snapshot_path)
+            finally:
+                graph.close()
+        else:
+            stats = GraphMemory(graphml_path).export_snapshot(snapshot_path)
+        for name, count in stats.items():
+            print(f"{name:>18}: {count}")
+        print(f"Wrote {snapshot_path} in {time.perf_counter() - start:.2f}s")
+
+    if args.benchmark:
+        print(f"\nIn-process ({args.repeat}x)")
+        graphml_times = timed(lambda: GraphMemory(graphml_path), args.repeat)
+        report("GraphML", graphml_times)
+        report(
+            "snapshot",
+            timed(lambda: GraphMemory(snapshot_path), args.repeat),
+            graphml_times,
+        )
+
+    if args.benchmark and args.neo4j:
+        print(f"\nNeo4j ({args.repeat}x)")
+        graph = GraphNeo4j()
+        try:
+            # an empty database with the schema, like a fresh HPC job
+            def reset():
+                graph.clear()
+                graph.ensure_schema()
+
+            graphml_times = timed(
+                lambda: graph.import_graphml("graph.xml"), args.repeat, reset
+            )
+            report("GraphML", graphml_times)
+            report(
+                "snapshot",
+                timed(lambda: graph.import_snapshot(snapshot_path), args.repeat, reset),
+                graphml_times,
+            )
+        finally:
+            graph.close()